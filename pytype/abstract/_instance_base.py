@@ -12,6 +12,10 @@ from pytype.errors import error_types
 log = logging.getLogger(__name__)
 _isinstance = abstract_utils._isinstance  # pylint: disable=protected-access
 
+# Mirrors MAX_VAR_SIZE in typegraph/typegraph.h: once a variable has this many
+# bindings minus one, the typegraph replaces any new data with Any.
+_MAX_VAR_SIZE = 64
+
 
 class SimpleValue(_base.BaseValue):
   """A basic abstract value that represents instances.
@@ -44,6 +48,9 @@ class SimpleValue(_base.BaseValue):
     # The latter caches the result of get_type_key. This is a recursive function
     # that has the potential to generate too many calls for large definitions.
     self._type_key = None
+    # The per-parameter components of _type_key, so that
+    # merge_instance_type_parameter can update the key incrementally.
+    self._type_key_params = None
     self._fullhash = None
     self._cached_changestamps = self._get_changestamps()
 
@@ -104,10 +111,36 @@ class SimpleValue(_base.BaseValue):
     """
     name = abstract_utils.full_type_name(self, name)
     log.info("Modifying type param %s", name)
-    if name in self.instance_type_parameters:
-      self.instance_type_parameters[name].PasteVariable(value, node)
+    params = self.instance_type_parameters
+    # If the cached type key is up to date, we update it below with just the
+    # new data rather than letting get_type_key recompute it from scratch.
+    update_type_key = (
+        self._type_key is not None
+        and self._cached_changestamps == self._get_changestamps()
+    )
+    if name in params:
+      params[name].PasteVariable(value, node)
     else:
-      self.instance_type_parameters[name] = value
+      params[name] = value
+    # A variable that has reached the maximum size may have received Any
+    # instead of the new data, in which case we let the key be recomputed.
+    if update_type_key and len(params[name].data) < _MAX_VAR_SIZE - 1:
+      self._update_type_key(params.aliases.find_by_name(name), value)
+
+  def _update_type_key(self, name, value):
+    """Adds the data in `value` to the type key entry for parameter `name`."""
+    params = self._type_key_params
+    # Mark the caches as current but the key as in progress, so that recursive
+    # references to this value get the default type key.
+    self._fullhash = None
+    self._type_key = None
+    self._cached_changestamps = self._get_changestamps()
+    subkey = frozenset(v.get_type_key({self}) for v in value.data)
+    if name in params:
+      subkey |= params[name]
+    params[name] = subkey
+    self._type_key_params = params
+    self._type_key = frozenset([self.cls, *params.items()])
 
   def _call_helper(self, node, obj, binding, args):
     obj_binding = binding if obj == binding.data else obj.to_binding(node)
@@ -172,6 +205,7 @@ class SimpleValue(_base.BaseValue):
       return
     self._fullhash = None
     self._type_key = None
+    self._type_key_params = None
     self._cached_changestamps = cur_changestamps
 
   def get_fullhash(self, seen=None):
@@ -198,11 +232,11 @@ class SimpleValue(_base.BaseValue):
       elif self in seen:
         return self.get_default_type_key()
       seen.add(self)
-      key = {self.cls}
+      params = {}
       for name, var in self.instance_type_parameters.items():
-        subkey = frozenset(value.get_type_key(seen) for value in var.data)
-        key.add((name, subkey))
-      self._type_key = frozenset(key)
+        params[name] = frozenset(value.get_type_key(seen) for value in var.data)
+      self._type_key_params = params
+      self._type_key = frozenset([self.cls, *params.items()])
     return self._type_key
 
   def _unique_parameters(self):
@@ -6,6 +6,7 @@ import hashlib
 import itertools
 import logging
 
+from pytype import metrics
 from pytype.abstract import _classes
 from pytype.abstract import _function_base
 from pytype.abstract import _instance_base
@@ -22,6 +23,10 @@ from pytype.typegraph import cfg_utils
 log = logging.getLogger(__name__)
 _isinstance = abstract_utils._isinstance  # pylint: disable=protected-access
 
+# Per-function call cache statistics. Keys are "<function name>:<outcome>",
+# where outcome is one of "hit", "subsumed", "miss" and "uncacheable".
+_call_cache_counter = metrics.MapCounter("interpreter_function_call_cache")
+
 
 def _matches_generator_helper(type_obj, allowed_types):
   """Check if type_obj matches a Generator/AsyncGenerator type."""
@@ -61,6 +66,14 @@ def _hash_all_dicts(*hash_args):
   ).digest()
 
 
+def _get_arg_data_hashes(callargs):
+  """Maps each argument name to the set of full hashes of its data."""
+  return {
+      name: frozenset(v.get_fullhash() for v in var.data)
+      for name, var in callargs.items()
+  }
+
+
 def _check_classes(var, check):
   """Check whether the cls of each value in `var` is a class and passes `check`.
 
@@ -210,6 +223,10 @@ class InterpreterFunction(_function_base.SignedFunction):
     self.kw_defaults = kw_defaults
     self.closure = closure
     self._call_cache = {}
+    # Maps an environment key to a list of (argument data hashes, return value,
+    # remaining depth) tuples, used to find earlier calls that subsume a new
+    # call when the reuse_subsumed_calls option is set.
+    self._subsumable_calls = collections.defaultdict(list)
     self._call_records = []
     # TODO(b/78034005): Combine this and PyTDFunction.signatures into a single
     # way to handle multiple signatures that SignedFunction can also use.
@@ -493,24 +510,30 @@ class InterpreterFunction(_function_base.SignedFunction):
     )
     return function.Args(posargs=(args.posargs[0], arg1, arg2, arg3))
 
-  def _hash_call(self, callargs, frame):
+  def _can_cache_call(self, callargs):
     # Note that we ignore caching in __init__ calls, so that attributes are
     # set correctly.
+    return self.ctx.options.skip_repeat_calls and (
+        "self" not in callargs
+        or not self.ctx.callself_stack
+        or callargs["self"].data != self.ctx.callself_stack[-1].data
+    )
+
+  def _get_local_members(self, frame):
+    if frame.f_locals == self.ctx.convert.unsolvable:
+      return {}
+    else:
+      return frame.f_locals.members
+
+  def _hash_call(self, callargs, frame):
     if self.cache_return:
       # cache-return is a pragma, and overrides any other heuristics
       # Return a fixed key that is unlikely to collide with the call-specific
       # key computed in the next branch.
       log.info("cache-return set for function %s", self.name)
       callkey = 0x12345678
-    elif self.ctx.options.skip_repeat_calls and (
-        "self" not in callargs
-        or not self.ctx.callself_stack
-        or callargs["self"].data != self.ctx.callself_stack[-1].data
-    ):
-      if frame.f_locals == self.ctx.convert.unsolvable:
-        local_members = {}
-      else:
-        local_members = frame.f_locals.members
+    elif self._can_cache_call(callargs):
+      local_members = self._get_local_members(frame)
       callkey = _hash_all_dicts(
           (callargs, None),
           (frame.f_globals.members, set(self.code.names)),
@@ -522,6 +545,51 @@ class InterpreterFunction(_function_base.SignedFunction):
       callkey = len(self._call_cache)
     return callkey
 
+  def _hash_call_environment(self, callargs, frame):
+    """Hashes everything that affects a call except the argument data."""
+    local_members = self._get_local_members(frame)
+    return (
+        frozenset(callargs),
+        _hash_all_dicts(
+            (frame.f_globals.members, set(self.code.names)),
+            (local_members, set(local_members) - set(self.code.varnames)),
+        ),
+    )
+
+  def _find_subsuming_call(self, callargs, frame):
+    """Finds an earlier call whose arguments are a superset of callargs.
+
+    A call subsumes another if it was made in the same environment, with the
+    same argument names, and each of its arguments has at least the data of the
+    corresponding new argument. Its result is then a sound (if possibly less
+    precise) result for the new call.
+
+    Args:
+      callargs: The new call's arguments.
+      frame: The new call's frame.
+
+    Returns:
+      A (return value, remaining depth) tuple, or None.
+    """
+    entries = self._subsumable_calls.get(
+        self._hash_call_environment(callargs, frame)
+    )
+    if not entries:
+      return None
+    arg_hashes = _get_arg_data_hashes(callargs)
+    for old_arg_hashes, old_ret, old_remaining_depth in entries:
+      if all(
+          arg_hashes[name] <= old_hashes
+          for name, old_hashes in old_arg_hashes.items()
+      ):
+        return old_ret, old_remaining_depth
+    return None
+
+  def _record_subsumable_call(self, callargs, frame, ret):
+    self._subsumable_calls[self._hash_call_environment(callargs, frame)].append(
+        (_get_arg_data_hashes(callargs), ret, self.ctx.vm.remaining_depth())
+    )
+
   def _paramspec_signature(self, callable_type, substs):
     # Unpack the paramspec substitution we have created in the matcher.
     rhs = callable_type.formal_type_parameters[0]
@@ -684,10 +752,26 @@ class InterpreterFunction(_function_base.SignedFunction):
       )
       frame.check_return = check_return
     callkey_pre = self._hash_call(callargs, frame)
+    can_cache = self.cache_return or self._can_cache_call(callargs)
+    reuse_subsumed_calls = (
+        self.ctx.options.reuse_subsumed_calls
+        and can_cache
+        and not self.cache_return
+    )
     if callkey_pre in self._call_cache:
-      old_ret, old_remaining_depth = self._call_cache[callkey_pre]
+      cached, cache_outcome = self._call_cache[callkey_pre], "hit"
+    elif reuse_subsumed_calls:
+      cached, cache_outcome = (
+          self._find_subsuming_call(callargs, frame),
+          "subsumed",
+      )
+    else:
+      cached, cache_outcome = None, None
+    if cached:
+      old_ret, old_remaining_depth = cached
       # Optimization: This function has already been called, with the same
-      # environment and arguments, so recycle the old return value.
+      # environment and arguments (or with arguments that subsume the current
+      # ones), so recycle the old return value.
       # We would want to skip this optimization and reanalyze the call if we can
       # traverse the function deeper.
       if self.ctx.vm.remaining_depth() > old_remaining_depth:
@@ -704,11 +788,18 @@ class InterpreterFunction(_function_base.SignedFunction):
         )
       else:
         log.info("Skipping call to %r and using cached return", self.name)
+        if metrics.is_enabled():
+          _call_cache_counter.inc(f"{self.name}:{cache_outcome}")
         ret = typeguard_return or old_ret.AssignToNewVariable(node)
         if self._store_call_records:
           # Even if the call is cached, we might not have been recording it.
           self._call_records.append((callargs, ret, node))
         return node, ret
+    if metrics.is_enabled():
+      # Only build the key when it is used, since this is a hot path.
+      _call_cache_counter.inc(
+          f"{self.name}:{'miss' if can_cache else 'uncacheable'}"
+      )
     if self.code.has_generator():
       generator = _instances.Generator(frame, self.ctx)
       # Run the generator right now, even though the program didn't call it,
@@ -750,6 +841,8 @@ class InterpreterFunction(_function_base.SignedFunction):
     # Recompute the calllkey so that side effects are taken into account.
     callkey_post = self._hash_call(callargs, frame)
     self._call_cache[callkey_post] = ret, self.ctx.vm.remaining_depth()
+    if reuse_subsumed_calls:
+      self._record_subsumable_call(callargs, frame, ret)
     if self._store_call_records:
       self._call_records.append((callargs, ret, node_after_call))
     self.last_frame = frame
@@ -761,8 +854,11 @@ class InterpreterFunction(_function_base.SignedFunction):
     signature_data = set()
     for callargs, ret, node_after_call in self._call_records:
       try:
-        combinations = cfg_utils.variable_product_dict(callargs)
-      except cfg_utils.TooComplexError:
+        combinations = cfg_utils.variable_product_dict(
+            callargs, self.ctx.options.binding_product_limit
+        )
+      except cfg_utils.TooComplexError as e:
+        log.info("Falling back to Any for calls to %s: %s", self.name, e)
         combination = {
             name: self.ctx.convert.unsolvable.to_binding(node_after_call)
             for name in callargs
@@ -301,6 +301,23 @@ class PyTDTest(AbstractTestBase):
     self.assertEqual("builtins.list", pytd_type.name)
     self.assertSequenceEqual((pytd.NothingType(),), pytd_type.parameters)
 
+  def test_cache_types(self):
+    convert = self._ctx.pytd_convert
+    instance = self._ctx.convert.primitive_instances[int]
+    param = abstract.TypeParameter("T", self._ctx)
+    node = self._ctx.root_node
+    self.assertIsNot(instance.to_pytd_type(node), instance.to_pytd_type(node))
+    with convert.cache_types():
+      typ = instance.to_pytd_type(node)
+      self.assertIs(typ, instance.to_pytd_type(node))
+      self.assertEqual(typ, instance.to_pytd_type(self._node))
+      self.assertEqual(param.to_pytd_type(node), pytd.AnythingType())
+      with convert.set_output_mode(convert.OutputMode.DETAILED):
+        detailed = param.to_pytd_type(node)
+    self.assertEqual(typ, pytd.NamedType("builtins.int"))
+    self.assertEqual(detailed, pytd.NamedType("typing.TypeVar"))
+    self.assertIsNot(typ, instance.to_pytd_type(node))
+
   def test_typing_container(self):
     cls = self._ctx.convert.list_type
     container = abstract.AnnotationContainer("List", self._ctx, cls)
@@ -1295,6 +1312,33 @@ class AbstractTest(AbstractTestBase):
     self.assertIsNot(v2, v3)
     self.assertIs(v3, v4)
 
+  def test_incremental_type_key(self):
+    lst = abstract.List([], self._ctx)
+    int_instance = self._ctx.convert.primitive_instances[int]
+    str_instance = self._ctx.convert.primitive_instances[str]
+    lst.merge_instance_type_parameter(
+        self._node, abstract_utils.T, self.new_var(int_instance)
+    )
+    key1 = lst.get_type_key()
+    lst.merge_instance_type_parameter(
+        self._node, abstract_utils.T, self.new_var(str_instance)
+    )
+    key2 = lst.get_type_key()
+    self.assertNotEqual(key1, key2)
+    lst.update_caches(force=True)
+    self.assertEqual(key2, lst.get_type_key())
+
+  def test_incremental_type_key_full_variable(self):
+    lst = abstract.List([], self._ctx)
+    for i in range(70):
+      cls = abstract.InterpreterClass(f"X{i}", [], {}, None, None, (), self._ctx)
+      lst.merge_instance_type_parameter(
+          self._node, abstract_utils.T, cls.instantiate(self._node)
+      )
+      key = lst.get_type_key()
+    lst.update_caches(force=True)
+    self.assertEqual(key, lst.get_type_key())
+
   def test_set_module_on_module(self):
     # A module's 'module' attribute should always remain None, and no one
     # should attempt to set it to something besides the module's name or None.
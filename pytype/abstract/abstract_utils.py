@@ -7,6 +7,7 @@ import logging
 from typing import Any
 
 from pytype import datatypes
+from pytype import metrics
 from pytype.pyc import opcodes
 from pytype.pyc import pyc
 from pytype.pytd import pytd
@@ -16,6 +17,11 @@ from pytype.typegraph import cfg_utils
 
 log = logging.getLogger(__name__)
 
+# Diagnostics for binding products taken by get_views(): how many combinations
+# each product had, and how often each CFG node hit the complexity limit.
+_view_count = metrics.Distribution("get_views_combinations")
+_too_complex_counter = metrics.MapCounter("get_views_too_complex")
+
 # Type aliases
 _ArgsDictType = dict[str, cfg.Variable]
 
@@ -309,7 +315,7 @@ def match_atomic_python_constant(variable, typ=None):
   return True
 
 
-def get_views(variables, node):
+def get_views(variables, node, limit=cfg_utils.DEEP_VARIABLE_LIMIT):
   """Get all possible views of the given variables at a particular node.
 
   For performance reasons, this method uses node.CanHaveCombination for
@@ -333,23 +339,31 @@ def get_views(variables, node):
   Args:
     variables: The variables.
     node: The node.
+    limit: How many binding combinations to generate before falling back to
+      unsolvable.
 
   Yields:
     A datatypes.AcessTrackingDict mapping variables to bindings.
   """
   try:
-    combinations = cfg_utils.deep_variable_product(variables)
-  except cfg_utils.TooComplexError:
+    combinations = cfg_utils.deep_variable_product(variables, limit, node)
+  except cfg_utils.TooComplexError as e:
     log.info(
         "get_views: too many binding combinations to generate accurate "
-        "views, falling back to unsolvable"
+        "views at node <%d>%s, falling back to unsolvable: %s",
+        node.id,
+        node.name,
+        e,
     )
+    _too_complex_counter.inc(node.name)
     combinations = (
         (
             var.AddBinding(node.program.default_data, [], node)
             for var in variables
         ),
     )
+  else:
+    _view_count.add(len(combinations))
   seen = []  # the accessed subsets of previously seen views
   for combination in combinations:
     view = {value.variable: value for value in combination}
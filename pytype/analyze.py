@@ -26,6 +26,8 @@ class Analysis:
   context: context.Context
   ast: pytd.TypeDeclUnit | None
   ast_deps: pytd.TypeDeclUnit | None
+  # The names in the module's __all__, if it is a constant list or tuple.
+  exports: tuple[str, ...] = ()
 
 
 def check_types(
@@ -88,6 +90,7 @@ def infer_types(
   ctx.exitpoint = ctx.vm.analyze(loc, defs, maximum_depth)
   snapshotter.take_snapshot("analyze:infer_types:post")
   ast = ctx.vm.compute_types(defs)
+  exports = _get_exports(defs)
   ast = ctx.loader.resolve_ast(ast)
   if ctx.vm.has_unknown_wildcard_imports or any(
       a in defs for a in abstract_utils.DYNAMIC_ATTRIBUTE_MARKERS
@@ -115,7 +118,32 @@ def infer_types(
     # Remove "~list" etc.:
     ast = convert_structural.extract_local(ast)
   _maybe_output_debug(options, ctx.program)
-  return Analysis(ctx, ast, deps_pytd)
+  return Analysis(ctx, ast, deps_pytd, exports)
+
+
+def _get_exports(defs):
+  """Returns the names in a module's __all__, or () if it isn't constant.
+
+  The pytd for __all__ only records its type, so the names are read from the
+  module's definitions for use by serialize_ast.PruneToInterface().
+
+  Args:
+    defs: The module's definitions, a dict of name to cfg.Variable.
+
+  Returns:
+    A tuple of names.
+  """
+  if "__all__" not in defs:
+    return ()
+  try:
+    names = abstract_utils.get_atomic_python_constant(
+        defs["__all__"], (list, tuple)
+    )
+    return tuple(
+        abstract_utils.get_atomic_python_constant(name, str) for name in names
+    )
+  except abstract_utils.ConversionError:
+    return ()
 
 
 def _maybe_output_debug(options, program):
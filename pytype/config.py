@@ -6,6 +6,7 @@ an Options class.
 
 import argparse
 import contextlib
+import json
 import logging
 import os
 import sys
@@ -140,6 +141,49 @@ def make_parser():
   return o
 
 
+def read_batch_manifest(argv, manifest):
+  """Reads the options of each module in a --batch-manifest file.
+
+  Args:
+    argv: Command line arguments, which apply to every module.
+    manifest: The path to the manifest, a JSON lines file.
+
+  Returns:
+    A list of Options objects, one per module.
+
+  Raises:
+    utils.UsageError: If a line of the manifest isn't a JSON object with an
+      "input" key.
+  """
+  parser = make_parser()
+  module_options = []
+  with open(manifest) as f:
+    for lineno, line in enumerate(f, 1):
+      if not line.strip():
+        continue
+      try:
+        entry = json.loads(line)
+      except json.JSONDecodeError as e:
+        raise utils.UsageError(
+            f"{manifest}:{lineno}: Invalid JSON in batch manifest: {e}"
+        ) from e
+      if not isinstance(entry, dict) or "input" not in entry:
+        raise utils.UsageError(
+            f'{manifest}:{lineno}: Batch manifest entry must be a JSON object '
+            'with an "input" key'
+        )
+      args = parser.parse_args(argv)
+      args.batch_manifest = None
+      args.batch_cycle = False
+      args.input = [entry["input"]]
+      args.output = entry.get("output")
+      args.module_name = entry.get("module_name")
+      args.imports_map = entry.get("imports_info")
+      args.report_errors = entry.get("report_errors", args.report_errors)
+      module_options.append(Options(args))
+  return module_options
+
+
 def base_parser():
   """Use argparse to make a parser for configuration options."""
   parser = argparse.ArgumentParser(
@@ -304,6 +348,12 @@ EXPERIMENTAL_FLAGS = [
         False,
         "Infer precise return types even for invalid function calls.",
     ),
+    _flag(
+        "--reuse-subsumed-calls",
+        False,
+        "Reuse the result of an earlier function call whose argument types "
+        "are a superset of a new call's argument types.",
+    ),
     _flag(
         "--protocols",
         False,
@@ -369,6 +419,19 @@ PICKLE_OPTIONS = [
             "file to the destination filename in the --output parameter."
         ),
     ),
+    _Arg(
+        "--pickle-interface",
+        action="store_true",
+        default=False,
+        dest="pickle_interface",
+        help=(
+            "With --pickle-output, only pickle the public interface of the "
+            "module: private top-level definitions that no public one uses "
+            "are left out. A hash of the interface is saved in the pickle "
+            "metadata, to detect when dependent modules need to be "
+            "reanalyzed."
+        ),
+    ),
     _Arg(
         "--use-pickled-files",
         action="store_true",
@@ -440,6 +503,41 @@ INFRASTRUCTURE_OPTIONS = [
             "E.g. 'foo.bar.mymodule' and 'foo.bar.__init__'"
         ),
     ),
+    _Arg(
+        "--batch-manifest",
+        type=str,
+        action="store",
+        dest="batch_manifest",
+        default=None,
+        help=(
+            "File with one JSON object per line, each describing a module to "
+            "process with the keys 'input', 'output', 'module_name' and "
+            "'imports_info', and optionally 'report_errors'. The modules are "
+            "processed one after another in this process, and all other "
+            "options apply to each of them."
+        ),
+    ),
+    _Arg(
+        "--batch-cycle",
+        action="store_true",
+        dest="batch_cycle",
+        default=False,
+        help=(
+            "The modules in --batch-manifest import each other. Infer them "
+            "repeatedly, keeping their pyi files in memory, until the pyi "
+            "files stop changing."
+        ),
+    ),
+    _Arg(
+        "--intern-pytd-types",
+        action="store_true",
+        dest="intern_pytd_types",
+        default=False,
+        help=(
+            "Share a single instance between equal types in the modules "
+            "loaded from pyi files and pickles, to reduce memory use."
+        ),
+    ),
     # TODO(b/68306233): Get rid of nofail.
     _Arg(
         "--nofail",
@@ -561,6 +659,18 @@ DEBUG_OPTIONS = [
         default=True,
         help="Don't reuse the results of previous function calls.",
     ),
+    _Arg(
+        "--binding-product-limit",
+        type=int,
+        action="store",
+        dest="binding_product_limit",
+        default=cfg_utils.DEEP_VARIABLE_LIMIT,
+        help=(
+            "Maximum number of binding combinations to enumerate for a set of "
+            "variables before falling back to Any. Use with --metrics to see "
+            "where the limit is hit."
+        ),
+    ),
     _Arg(
         "-T",
         "--no-typeshed",
@@ -888,6 +998,10 @@ class Postprocessor:
         )
     self.output_options.pickle_output = pickle_output
 
+  @uses(["+pickle_output"])
+  def _store_pickle_interface(self, pickle_interface):
+    self.output_options.pickle_interface = pickle_interface
+
   @uses(["output", "+pickle_output"])
   def _store_verify_pickle(self, verify_pickle):
     if not verify_pickle:
@@ -897,7 +1011,9 @@ class Postprocessor:
           file_utils.PICKLE_EXT, ".pyi"
       )
 
-  @uses(["-input", "show_config", "-pythonpath", "version"])
+  @uses(
+      ["-input", "show_config", "-pythonpath", "version", "batch_manifest"]
+  )
   def _store_generate_builtins(self, generate_builtins):
     """Store the generate-builtins option."""
     if generate_builtins:
@@ -907,10 +1023,19 @@ class Postprocessor:
         not self.output_options.input
         and not self.output_options.show_config
         and not self.output_options.version
+        and not self.output_options.batch_manifest
     ):
       self.error("Need a filename.")
     self.output_options.generate_builtins = generate_builtins
 
+  @uses(["-input", "-output", "-imports_map"])
+  def _store_batch_manifest(self, batch_manifest):
+    self.output_options.batch_manifest = batch_manifest
+
+  @uses(["+batch_manifest"])
+  def _store_batch_cycle(self, batch_cycle):
+    self.output_options.batch_cycle = batch_cycle
+
   @uses(["precompiled_builtins"])
   def _store_typeshed(self, typeshed):
     if typeshed is not None:
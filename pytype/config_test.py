@@ -5,6 +5,7 @@ import types
 
 from pytype import config
 from pytype import utils
+from pytype.tests import test_utils
 
 import unittest
 
@@ -85,9 +86,44 @@ class ConfigTest(unittest.TestCase):
         ("--check", "--output=foo"),
         ("--output-errors-csv=foo", "--no-report-errors"),
         ("--pythonpath=foo", "--imports_info=bar"),
+        ("--batch-manifest=foo", "--output=bar"),
     ]:
       self._test_arg_conflict(arg1, arg2)
 
+  def test_batch_cycle_requires_manifest(self):
+    with self.assertRaises(SystemExit):
+      config.Options(["--batch-cycle", "test.py"], command_line=True)
+
+  def test_read_batch_manifest(self):
+    with test_utils.Tempdir() as d:
+      manifest = d.create_file(
+          "manifest",
+          '{"input": "a.py", "output": "a.pyi", "module_name": "a"}\n'
+          '{"input": "b.py", "module_name": "b", "report_errors": false}\n',
+      )
+      a, b = config.read_batch_manifest(["--quick"], manifest)
+    self.assertEqual((a.input, a.output, a.module_name), ("a.py", "a.pyi", "a"))
+    self.assertTrue(a.report_errors)
+    self.assertEqual((b.input, b.module_name), ("b.py", "b"))
+    self.assertFalse(b.report_errors)
+    self.assertTrue(a.quick and b.quick)
+
+  def test_read_batch_manifest_invalid_json(self):
+    with test_utils.Tempdir() as d:
+      manifest = d.create_file(
+          "manifest", '{"input": "a.py"}\n\n{"input": "b.py"\n'
+      )
+      with self.assertRaisesRegex(utils.UsageError, f"{manifest}:3: "):
+        config.read_batch_manifest([], manifest)
+
+  def test_read_batch_manifest_missing_input(self):
+    with test_utils.Tempdir() as d:
+      manifest = d.create_file(
+          "manifest", '{"input": "a.py"}\n{"output": "b.pyi"}\n'
+      )
+      with self.assertRaisesRegex(utils.UsageError, f"{manifest}:2: .*input"):
+        config.read_batch_manifest([], manifest)
+
   def test_bad_construction(self):
     with self.assertRaises(TypeError):
       # To prevent accidental misuse, command_line must be explicitly set when
@@ -255,6 +291,10 @@ class PostprocessorTest(unittest.TestCase):
           imports_map="/foo/bar", imports_map_items=[("foo", "/dev/null")]
       )
 
+  def test_pickle_interface_requires_pickle_output(self):
+    with self.assertRaises(config.PostprocessingError):
+      config.Options.create(pickle_interface=True)
+
   def test_pickle_metadata(self):
     input_options = types.SimpleNamespace(
         pickle_metadata="meta,data",
@@ -2,6 +2,9 @@
 
 import contextlib
 import logging
+import os
+import pickle
+import sys
 
 from pytype import annotation_utils
 from pytype import attribute
@@ -23,6 +26,34 @@ from pytype.typegraph import cfg_utils
 
 log = logging.getLogger(__name__)
 
+# Options that may differ between modules analyzed with the same template.
+# They either only affect which modules can be imported, which the loader is
+# pointed at per module, or are only read once the module's Context exists.
+_PER_MODULE_OPTIONS = frozenset({
+    "analyze_annotated",
+    "check",
+    "disable",
+    "enable_only",
+    "exec_log",
+    "imports_map",
+    "input",
+    "metrics",
+    "module_name",
+    "nofail",
+    "output",
+    "output_debug",
+    "output_errors_csv",
+    "pickle_interface",
+    "pickle_output",
+    "profile",
+    "pythonpath",
+    "report_errors",
+    "timeout",
+    "touch",
+    "unused_imports_info_files",
+    "verify_pickle",
+})
+
 
 class Context:
   """An abstract context."""
@@ -188,3 +219,98 @@ class Context:
           match.error_details,
           details,
       )
+
+
+class ContextTemplate:
+  """A prewarmed starting point for analyzing many modules in one worker.
+
+  Before running any user code, every module pays for parsing and resolving
+  builtins and typing and for converting the classes and instances that a
+  Context needs. A template pays this cost once, by building a throwaway
+  Context. The loader it leaves behind can then be handed to the next module,
+  which only has to build its own, now cheap, Context.
+
+  Since a loader accumulates the imports of the module that uses it, each
+  process can take the prewarmed loader once. A worker that analyzes many
+  modules builds a template and then analyzes each module in a forked child
+  (see run_in_fork), so that every module starts from a copy of the warm state.
+  """
+
+  def __init__(self, options: config.Options):
+    self.options = options
+    self._loader = load_pytd.create_loader(options)
+    Context(options, self._loader, src="")
+    self._loader_taken = False
+
+  def matches(self, options: config.Options) -> bool:
+    """Whether a module with the given options can start from this template."""
+    mine = self.options.as_dict()
+    theirs = options.as_dict()
+    return all(
+        mine.get(k) == theirs.get(k)
+        for k in mine.keys() | theirs.keys()
+        if k not in _PER_MODULE_OPTIONS
+    )
+
+  def loader_for(
+      self, options: config.Options
+  ) -> load_pytd.Loader | None:
+    """Returns the prewarmed loader for a module, if it can be used.
+
+    Args:
+      options: The module's options.
+
+    Returns:
+      The template's loader, pointed at the module's options, or None if the
+      options don't match the template or the loader has already been taken in
+      this process.
+    """
+    if self._loader_taken or not self.matches(options):
+      return None
+    self._loader_taken = True
+    self._loader.set_options(options)
+    return self._loader
+
+  def run_in_fork(self, f, *args):
+    """Calls f(*args) in a forked child process and returns its result.
+
+    The child starts from a copy of this process, in which the template's
+    loader has not been taken yet. The result must be picklable, and exceptions
+    raised by f are re-raised in the parent. Where fork is unavailable, f is
+    called directly.
+
+    Args:
+      f: The function to call.
+      *args: The arguments to f.
+
+    Returns:
+      The return value of f.
+    """
+    if not hasattr(os, "fork") or self._loader_taken:
+      return f(*args)
+    read_fd, write_fd = os.pipe()
+    pid = os.fork()
+    if not pid:
+      os.close(read_fd)
+      try:
+        result = pickle.dumps((True, f(*args)))
+      except BaseException as e:  # pylint: disable=broad-except
+        try:
+          result = pickle.dumps((False, e))
+        except Exception:  # pylint: disable=broad-except
+          result = pickle.dumps((False, RuntimeError(repr(e))))
+      with os.fdopen(write_fd, "wb") as out:
+        out.write(result)
+      sys.stdout.flush()
+      sys.stderr.flush()
+      os._exit(0)  # pylint: disable=protected-access
+    os.close(write_fd)
+    with os.fdopen(read_fd, "rb") as result_in:
+      result = result_in.read()
+    _, status = os.waitpid(pid, 0)
+    if not result:
+      raise RuntimeError(f"Forked analysis exited with status {status}")
+    ok, value = pickle.loads(result)
+    if not ok:
+      raise value
+    return value
@@ -171,7 +171,9 @@ class MonitorDict(dict[_K, _V]):
 
   @property
   def changestamp(self):
-    return len(self) + sum(len(var.bindings) for var in self.values())
+    # Variable.data is cheaper to build than Variable.bindings, and has one entry
+    # per binding.
+    return len(self) + sum(len(var.data) for var in self.values())
 
   @property
   def data(self):
@@ -3,6 +3,7 @@
 from collections.abc import Callable, Iterable, Sequence
 import contextlib
 import csv
+import functools
 import io
 import logging
 import sys
@@ -30,6 +31,11 @@ _ERROR_NAMES = set()
 # The current error name, managed by the error_name decorator.
 _CURRENT_ERROR_NAME = utils.DynamicVar()
 
+# Errors that are logged even when errors are discarded. They are about the
+# module's imports rather than the values being analyzed, and are cheap to
+# build, so runs that don't report errors keep them in the log.
+_KEPT_WHEN_DISCARDING = frozenset({"import-error", "pyi-error"})
+
 # Max number of calls in the traceback string.
 MAX_TRACEBACK_LENGTH = 3
 
@@ -54,6 +60,9 @@ def _error_name(name) -> Callable[[_FuncT], _FuncT]:
   def wrap(func):
     def invoke(*args, **kwargs):
       with _CURRENT_ERROR_NAME.bind(name):
+        if args and isinstance(args[0], ErrorLog) and args[0].discarding:
+          # Skip building an error that would be thrown away.
+          return None
         return func(*args, **kwargs)
 
     return invoke
@@ -79,8 +88,19 @@ def _maybe_truncate_traceback(traceback):
     return traceback
 
 
-def _make_traceback_str(frames):
-  """Turn a stack of frames into a traceback string."""
+def _get_traceback_entries(frames):
+  """Get the (line, method name) pairs for a stack's traceback.
+
+  The frames' opcodes change as the VM runs, so the entries need to be
+  extracted when the error is recorded, whereas formatting can wait.
+
+  Args:
+    frames: A stack of frames.
+
+  Returns:
+    A list of (line, method name) pairs, possibly with an _ELLIPSIS, or None if
+    no traceback should be shown.
+  """
   if len(frames) < 2 or (
       frames[-1].f_code and not frames[-1].f_code.get_arg_count()
   ):
@@ -90,22 +110,38 @@ def _make_traceback_str(frames):
     return None
   frames = frames[:-1]
   frames = _maybe_truncate_traceback(frames)
+  return [
+      frame
+      if frame is _ELLIPSIS
+      else (frame.current_opcode.line, frame.current_opcode.code.name)
+      for frame in frames
+  ]
+
+
+def _format_traceback(entries):
+  """Turn traceback entries into a traceback string."""
   traceback = []
   format_line = "line %d, in %s"
-  for frame in frames:
-    if frame is _ELLIPSIS:
+  for entry in entries:
+    if entry is _ELLIPSIS:
       line = "..."
-    elif frame.current_opcode.code.name == "<module>":
-      line = format_line % (frame.current_opcode.line, "current file")
     else:
-      line = format_line % (
-          frame.current_opcode.line,
-          frame.current_opcode.code.name,
-      )
+      lineno, name = entry
+      if name == "<module>":
+        name = "current file"
+      line = format_line % (lineno, name)
     traceback.append(line)
   return TRACEBACK_MARKER + "\n  " + "\n  ".join(traceback)
 
 
+def _make_traceback(frames):
+  """Turn a stack of frames into a deferred traceback string."""
+  entries = _get_traceback_entries(frames)
+  if entries is None:
+    return None
+  return lambda: _format_traceback(entries)
+
+
 def _dedup_opcodes(stack):
   """Dedup the opcodes in a stack of frames."""
   deduped_stack = []
@@ -168,6 +204,17 @@ def _function_name(name, capitalize=False):
     return ret
 
 
+def _render(text):
+  """Returns the text, calling it first if its rendering was deferred."""
+  return text() if callable(text) else text
+
+
+def _deferred(render):
+  """Splits a function returning (message, details) into deferred texts."""
+  render = functools.cache(render)
+  return (lambda: render()[0]), (lambda: render()[1])
+
+
 class CheckPoint:
   """Represents a position in an error log."""
 
@@ -203,6 +250,11 @@ class Error:
       doesn't exist on.
     traceback: Optionally, an error traceback.
     opcode_name: Optionally, the name of the opcode that raised the error.
+
+  The message, details and traceback may also be passed as functions that take
+  no arguments and return the text. They are called at most once, when the
+  text is first needed, so errors that end up filtered or discarded never pay
+  for formatting.
   """
 
   def __init__(
@@ -229,11 +281,11 @@ class Error:
     ), "Errors must be created from a caller annotated with @error_name."
     # Required for every Error.
     self._severity = severity
-    self._message = message
+    self._raw_message = message
     self._name = name
     self._src = src
     # Optional information about the error.
-    self._details = details
+    self._raw_details = details
     # Optional information about error position.
     self._filename = filename
     self._line = line or 0
@@ -241,7 +293,7 @@ class Error:
     self._col = col or 0
     self._endcol = endcol or 0
     self._methodname = methodname
-    self._traceback = traceback
+    self._raw_traceback = traceback
     self._keyword_context = keyword_context
     self._keyword = keyword
     self._bad_call = bad_call
@@ -275,7 +327,7 @@ class Error:
           endcol=opcode.endcol,
           methodname=opcode.code.name,
           opcode_name=opcode.__class__.__name__,
-          traceback=_make_traceback_str(stack),
+          traceback=_make_traceback(stack),
           **kwargs,
       )
 
@@ -285,6 +337,25 @@ class Error:
     with _CURRENT_ERROR_NAME.bind(name):
       return cls(severity, message, **kwargs)
 
+  @property
+  def _message(self):
+    self._raw_message = _render(self._raw_message)
+    return self._raw_message
+
+  @property
+  def _details(self):
+    self._raw_details = _render(self._raw_details)
+    return self._raw_details
+
+  @property
+  def _traceback(self):
+    self._raw_traceback = _render(self._raw_traceback)
+    return self._raw_traceback
+
+  def render(self):
+    """Formats any text whose rendering was deferred."""
+    _ = self._message, self._details, self._traceback
+
   @property
   def name(self):
     return self._name
@@ -463,14 +534,14 @@ class Error:
     with _CURRENT_ERROR_NAME.bind(self._name):
       return self.__class__(
           severity=self._severity,
-          message=self._message,
+          message=self._raw_message,
           filename=self._filename,
           line=self._line,
           endline=self._endline,
           col=self._col,
           endcol=self._endcol,
           methodname=self._methodname,
-          details=self._details,
+          details=self._raw_details,
           keyword=self._keyword,
           traceback=None,
           src=self._src,
@@ -485,6 +556,11 @@ class ErrorLog:
     # An error filter (initially None)
     self._filter = None
     self._src = src
+    # Errors are normally rendered as soon as they are added, since the values
+    # they describe may change later. Errors added inside a checkpoint are
+    # usually discarded, so their rendering is deferred.
+    self._checkpoint_depth = 0
+    self._discard_errors = False
 
   def __len__(self):
     return len(self._errors)
@@ -523,6 +599,27 @@ class ErrorLog:
     """
     self._filter = filt
 
+  def set_discard_errors(self, discard):
+    """Set whether to discard errors instead of logging them.
+
+    This is for runs whose errors are never reported. Errors added inside a
+    checkpoint are still logged, since the code that set the checkpoint may
+    look at them, and so are import and pyi errors.
+
+    Args:
+      discard: Whether to discard errors.
+    """
+    self._discard_errors = discard
+
+  @property
+  def discarding(self):
+    """Whether errors added right now are discarded."""
+    return (
+        self._discard_errors
+        and not self._checkpoint_depth
+        and _CURRENT_ERROR_NAME.get() not in _KEPT_WHEN_DISCARDING
+    )
+
   def has_error(self):
     """Return true iff an Error with SEVERITY_ERROR is present."""
     # pylint: disable=protected-access
@@ -533,9 +630,13 @@ class ErrorLog:
       _log.info("Added error to log: %s\n%s", error.name, error)
       if _log.isEnabledFor(logging.DEBUG):
         _log.debug(debug.stack_trace(limit=1).rstrip())
+      if not self._checkpoint_depth:
+        error.render()
       self._errors.append(error)
 
   def warn(self, stack, message, *args):
+    if self.discarding:
+      return
     self._add(
         Error.with_stack(stack, SEVERITY_WARNING, message % args, src=self._src)
     )
@@ -550,6 +651,8 @@ class ErrorLog:
       keyword_context=None,
       line=None,
   ):
+    if self.discarding:
+      return
     err = Error.with_stack(
         stack,
         SEVERITY_ERROR,
@@ -569,9 +672,11 @@ class ErrorLog:
     """Record errors without adding them to the errorlog."""
     _log.info("Checkpointing errorlog at %d errors", len(self._errors))
     checkpoint = CheckPoint(self._errors)
+    self._checkpoint_depth += 1
     try:
       yield checkpoint
     finally:
+      self._checkpoint_depth -= 1
       checkpoint.revert()
     _log.info(
         "Restored errorlog to checkpoint: %d errors reverted",
@@ -663,11 +768,14 @@ class VmErrorLog(ErrorLog):
   def _attribute_error(self, stack, binding, obj_repr, attr_name):
     """Log an attribute error."""
     if len(binding.variable.bindings) > 1:
-      # Joining the printed types rather than merging them before printing
-      # ensures that we print all of the options when 'Any' is among them.
-      details = "In %s" % self._pp.join_printed_types(
-          self._pp.print_type(v) for v in binding.variable.data
-      )
+
+      def details():
+        # Joining the printed types rather than merging them before printing
+        # ensures that we print all of the options when 'Any' is among them.
+        return "In %s" % self._pp.join_printed_types(
+            self._pp.print_type(v) for v in binding.variable.data
+        )
+
     else:
       details = None
     self.error(
@@ -697,6 +805,8 @@ class VmErrorLog(ErrorLog):
     )
 
   def attribute_error(self, stack, binding, attr_name):
+    if self.discarding:
+      return
     ep = error_printer.AttributeErrorPrinter(self._pp)
     recv = ep.print_receiver(binding.data, attr_name)
     if recv.obj_type == error_printer.BadAttrType.SYMBOL:
@@ -733,18 +843,22 @@ class VmErrorLog(ErrorLog):
 
   def _invalid_parameters(self, stack, message, bad_call):
     """Log an invalid parameters error."""
-    ret = error_printer.BadCallPrinter(self._pp, bad_call).print_call_details()
-    details = "".join(
-        [
-            "       Expected: (",
-            ret.expected,
-            ")\n",
-            "Actually passed: (",
-            ret.actual,
-            ")",
-        ]
-        + ret.error_details
-    )
+
+    def details():
+      printer = error_printer.BadCallPrinter(self._pp, bad_call)
+      ret = printer.print_call_details()
+      return "".join(
+          [
+              "       Expected: (",
+              ret.expected,
+              ")\n",
+              "Actually passed: (",
+              ret.actual,
+              ")",
+          ]
+          + ret.error_details
+      )
+
     self.error(stack, message, details, bad_call=bad_call)
 
   @_error_name("wrong-arg-count")
@@ -784,6 +898,8 @@ class VmErrorLog(ErrorLog):
 
   def wrong_arg_types(self, stack, name, bad_call):
     """Log [wrong-arg-types]."""
+    if self.discarding:
+      return
     operation = self._get_binary_operation(name, bad_call)
     if operation:
       operator, left_operand, right_operand = operation
@@ -936,22 +1052,25 @@ class VmErrorLog(ErrorLog):
   def bad_return_type(self, stack, node, bad):
     """Logs a [bad-return-type] error."""
 
-    ret = error_printer.MatcherErrorPrinter(self._pp).print_return_types(
-        node, bad
-    )
-    if ret.full_actual == ret.bad_actual:
-      message = "bad return type"
-    else:
-      message = f"bad option {ret.bad_actual!r} in return type"
-    details = [
-        "         Expected: ",
-        ret.expected,
-        "\n",
-        "Actually returned: ",
-        ret.full_actual,
-    ]
-    details.extend(ret.error_details)
-    self.error(stack, message, "".join(details))
+    def render():
+      ret = error_printer.MatcherErrorPrinter(self._pp).print_return_types(
+          node, bad
+      )
+      if ret.full_actual == ret.bad_actual:
+        message = "bad return type"
+      else:
+        message = f"bad option {ret.bad_actual!r} in return type"
+      details = [
+          "         Expected: ",
+          ret.expected,
+          "\n",
+          "Actually returned: ",
+          ret.full_actual,
+      ]
+      details.extend(ret.error_details)
+      return message, "".join(details)
+
+    self.error(stack, *_deferred(render))
 
   @_error_name("bad-return-type")
   def any_return_type(self, stack):
@@ -976,24 +1095,28 @@ class VmErrorLog(ErrorLog):
 
   @_error_name("bad-concrete-type")
   def bad_concrete_type(self, stack, node, bad, details=None):
-    ret = error_printer.MatcherErrorPrinter(self._pp).print_return_types(
-        node, bad
-    )
-    full_details = [
-        "       Expected: ",
-        ret.expected,
-        "\n",
-        "Actually passed: ",
-        ret.bad_actual,
-    ]
-    if details:
-      full_details.append("\n" + details)
-    full_details.extend(ret.error_details)
-    self.error(
-        stack, "Invalid instantiation of generic class", "".join(full_details)
-    )
+
+    def full_details():
+      ret = error_printer.MatcherErrorPrinter(self._pp).print_return_types(
+          node, bad
+      )
+      full_details = [
+          "       Expected: ",
+          ret.expected,
+          "\n",
+          "Actually passed: ",
+          ret.bad_actual,
+      ]
+      if details:
+        full_details.append("\n" + details)
+      full_details.extend(ret.error_details)
+      return "".join(full_details)
+
+    self.error(stack, "Invalid instantiation of generic class", full_details)
 
   def unsupported_operands(self, stack, operator, var1, var2):
+    if self.discarding:
+      return
     left = self._pp.show_variable(var1)
     right = self._pp.show_variable(var2)
     details = f"No attribute {operator!r} on {left}"
@@ -1254,31 +1377,36 @@ class VmErrorLog(ErrorLog):
     """Invalid combination of annotation and assignment."""
     if annot is None:
       return
-    annot_string = self._pp.print_type_of_instance(annot)
-    literal = "Literal[" in annot_string
-    actual_string = self._pp.print_type(binding.data, literal=literal)
-    if actual_string == "None":
-      annot_string += f" (Did you mean '{annot_string} | None'?)"
-    additional_details = f"\n\n{details}" if details else ""
-    pp = error_printer.MatcherErrorPrinter(self._pp)
-    additional_details += "".join(pp.print_error_details(error_details))
-    details = (
-        f"Annotation: {annot_string}\n"
-        + f"Assignment: {actual_string}"
-        + additional_details
-    )
-    if len(binding.variable.bindings) > 1:
-      # Joining the printed types rather than merging them before printing
-      # ensures that we print all of the options when 'Any' is among them.
-      # We don't need to print this if there is only 1 unique type.
-      print_types = {
-          self._pp.print_type(v, literal=literal) for v in binding.variable.data
-      }
-      if len(print_types) > 1:
-        details += (
-            "\nIn assignment of type: "
-            f"{self._pp.join_printed_types(print_types)}"
-        )
+
+    def full_details():
+      annot_string = self._pp.print_type_of_instance(annot)
+      literal = "Literal[" in annot_string
+      actual_string = self._pp.print_type(binding.data, literal=literal)
+      if actual_string == "None":
+        annot_string += f" (Did you mean '{annot_string} | None'?)"
+      additional_details = f"\n\n{details}" if details else ""
+      pp = error_printer.MatcherErrorPrinter(self._pp)
+      additional_details += "".join(pp.print_error_details(error_details))
+      full_details = (
+          f"Annotation: {annot_string}\n"
+          + f"Assignment: {actual_string}"
+          + additional_details
+      )
+      if len(binding.variable.bindings) > 1:
+        # Joining the printed types rather than merging them before printing
+        # ensures that we print all of the options when 'Any' is among them.
+        # We don't need to print this if there is only 1 unique type.
+        print_types = {
+            self._pp.print_type(v, literal=literal)
+            for v in binding.variable.data
+        }
+        if len(print_types) > 1:
+          full_details += (
+              "\nIn assignment of type: "
+              f"{self._pp.join_printed_types(print_types)}"
+          )
+      return full_details
+
     if typed_dict is not None:
       suffix = f" for key {name} in TypedDict {typed_dict.class_name}"
     elif name is not None:
@@ -1286,7 +1414,7 @@ class VmErrorLog(ErrorLog):
     else:
       suffix = ""
     err_msg = f"Type annotation{suffix} does not match type of assignment"
-    self.error(stack, err_msg, details=details)
+    self.error(stack, err_msg, details=full_details)
 
   @_error_name("container-type-mismatch")
   def container_type_mismatch(self, stack, cls, mutations, name):
@@ -1298,28 +1426,32 @@ class VmErrorLog(ErrorLog):
       mutations: a dict of {parameter name: (annotated types, new types)}
       name: the variable name (or None)
     """
-    details = f"Container: {self._pp.print_generic_type(cls)}\n"
-    allowed_contained = ""
-    new_contained = ""
-    for formal in cls.formal_type_parameters.keys():
-      if formal in mutations:
-        params, values, _ = mutations[formal]
-        allowed_content = self._pp.print_type_of_instance(
-            cls.get_formal_type_parameter(formal)
-        )
-        new_content = self._pp.join_printed_types(
-            sorted(
-                self._pp.print_type(v)
-                for v in set(values.data) - set(params.data)
-            )
-        )
-        allowed_contained += f"  {formal}: {allowed_content}\n"
-        new_contained += f"  {formal}: {new_content}\n"
-    annotation = self._pp.print_type_of_instance(cls)
-    details += (
-        "Allowed contained types (from annotation %s):\n%s"
-        "New contained types:\n%s"
-    ) % (annotation, allowed_contained, new_contained)
+
+    def details():
+      details = f"Container: {self._pp.print_generic_type(cls)}\n"
+      allowed_contained = ""
+      new_contained = ""
+      for formal in cls.formal_type_parameters.keys():
+        if formal in mutations:
+          params, values, _ = mutations[formal]
+          allowed_content = self._pp.print_type_of_instance(
+              cls.get_formal_type_parameter(formal)
+          )
+          new_content = self._pp.join_printed_types(
+              sorted(
+                  self._pp.print_type(v)
+                  for v in set(values.data) - set(params.data)
+              )
+          )
+          allowed_contained += f"  {formal}: {allowed_content}\n"
+          new_contained += f"  {formal}: {new_content}\n"
+      annotation = self._pp.print_type_of_instance(cls)
+      details += (
+          "Allowed contained types (from annotation %s):\n%s"
+          "New contained types:\n%s"
+      ) % (annotation, allowed_contained, new_contained)
+      return details
+
     suffix = "" if name is None else " for " + name
     err_msg = f"New container type{suffix} does not match type annotation"
     self.error(stack, err_msg, details=details)
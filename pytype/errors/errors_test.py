@@ -239,6 +239,49 @@ class ErrorLogTest(unittest.TestCase):
     self.assertEqual(e._name, _TEST_ERROR)
     self.assertEqual("foo.py", e._filename)
 
+  @errors._error_name(_TEST_ERROR)
+  def test_render_on_add(self):
+    errorlog = make_errorlog()
+    details = mock.Mock(return_value="details")
+    errorlog.error(None, "My message", details)
+    details.assert_called_once()
+    self.assertEqual("details", errorlog[0].details)
+    details.assert_called_once()
+
+  @errors._error_name(_TEST_ERROR)
+  def test_filtered_error_not_rendered(self):
+    errorlog = make_errorlog()
+    errorlog.set_error_filter(lambda error: False)
+    details = mock.Mock(return_value="details")
+    errorlog.error(None, "My message", details)
+    self.assertFalse(errorlog)
+    details.assert_not_called()
+
+  @errors._error_name(_TEST_ERROR)
+  def test_checkpoint_defers_rendering(self):
+    errorlog = make_errorlog()
+    details = mock.Mock(return_value="details")
+    with errorlog.checkpoint() as record:
+      errorlog.error(None, "My message", details)
+    details.assert_not_called()
+    self.assertEqual("My message\ndetails", record.errors[0].message)
+    details.assert_called_once()
+
+  def test_discard_errors(self):
+    errorlog = make_errorlog()
+    errorlog.set_discard_errors(True)
+    errorlog.name_error(None, "x")
+    self.assertFalse(errorlog)
+    with errorlog.checkpoint() as record:
+      errorlog.name_error(None, "y")
+    self.assertEqual(["name-error"], [e.name for e in record.errors])
+    errorlog.import_error(None, "foo")
+    errorlog.pyi_error(None, "bar", "error")
+    self.assertEqual(["import-error", "pyi-error"], [e.name for e in errorlog])
+    errorlog.set_discard_errors(False)
+    errorlog.name_error(None, "z")
+    self.assertEqual(3, len(errorlog))
+
   @errors._error_name(_TEST_ERROR)
   def test_has_error(self):
     errorlog = make_errorlog()
@@ -48,12 +48,23 @@ class LoadPickleError(Exception):
     super().__init__(msg)
 
 
+class _Metadata(msgspec.Struct):
+  """The metadata of a serialized SerializableAst, without the AST."""
+
+  metadata: list[str]
+
+
 Encoder = msgspec.msgpack.Encoder(order="deterministic")
 AstDecoder = msgspec.msgpack.Decoder(type=serialize_ast.SerializableAst)
 BuiltinsDecoder = msgspec.msgpack.Decoder(type=serialize_ast.ModuleBundle)
+# msgspec skips the fields that _Metadata doesn't declare without decoding them.
+MetadataDecoder = msgspec.msgpack.Decoder(type=_Metadata)
 
 _DecT = TypeVar(
-    "_DecT", serialize_ast.SerializableAst, serialize_ast.ModuleBundle
+    "_DecT",
+    serialize_ast.SerializableAst,
+    serialize_ast.ModuleBundle,
+    _Metadata,
 )
 _Dec = msgspec.msgpack.Decoder
 _Serializable = Union[serialize_ast.SerializableAst, serialize_ast.ModuleBundle]
@@ -106,6 +117,13 @@ def LoadAst(
   return _Load(AstDecoder, filename, compress, open_function)
 
 
+def LoadMetadata(
+    filename: Path, compress: bool = False, open_function=open
+) -> list[str]:
+  """Loads the metadata of a pickled AST, e.g., its interface hash."""
+  return _Load(MetadataDecoder, filename, compress, open_function).metadata
+
+
 def DecodeBuiltins(data: bytes) -> serialize_ast.ModuleBundle:
   return BuiltinsDecoder.decode(data)
 
@@ -1,19 +1,21 @@
 """Public interface to top-level pytype functions."""
 
 import contextlib
+import copy
 import dataclasses
 import logging
 import os
 import sys
 import traceback
 
-import libcst
 from pytype import __version__
 from pytype import analyze
 from pytype import config
 from pytype import constant_folding
 from pytype import context
 from pytype import load_pytd
+from pytype import metrics
+from pytype import module_utils
 from pytype import utils
 from pytype.directors import directors
 from pytype.imports import builtin_stubs as pytd_builtins
@@ -25,7 +27,6 @@ from pytype.pytd import pytd
 from pytype.pytd import pytd_utils
 from pytype.pytd import serialize_ast
 from pytype.pytd import visitors
-from pytype.rewrite import analyze as rewrite_analyze
 
 
 log = logging.getLogger(__name__)
@@ -34,6 +35,12 @@ log = logging.getLogger(__name__)
 # Webpage explaining the pytype error codes
 ERROR_DOC_URL = "https://google.github.io/pytype/errors.html"
 
+# How often process_cycle() infers the modules of a cycle at most.
+MAX_CYCLE_ITERATIONS = 5
+
+_cycle_iterations = metrics.Distribution("cycle_iterations")
+_cycle_convergence = metrics.MapCounter("cycle_convergence")
+
 
 @dataclasses.dataclass
 class AnalysisResult:
@@ -42,6 +49,7 @@ class AnalysisResult:
   context: context.Context
   ast: pytd.TypeDeclUnit | None
   pyi: str | None
+  exports: tuple[str, ...] = ()
 
 
 def read_source_file(input_filename, open_function=open):
@@ -76,6 +84,21 @@ def _set_verbosity_from(posarg):
   return decorator
 
 
+def _rewrite_analyze():
+  # The rewrite is experimental, so it is only imported when requested.
+  from pytype.rewrite import analyze as rewrite_analyze  # pylint: disable=g-import-not-at-top
+
+  return rewrite_analyze
+
+
+def _libcst_syntax_error():
+  """Returns libcst's syntax error class if libcst is loaded, else ()."""
+  # libcst is slow to import, and its errors can only be raised once something
+  # else has imported it.
+  libcst = sys.modules.get("libcst")
+  return libcst.ParserSyntaxError if libcst else ()
+
+
 @_set_verbosity_from(posarg=2)
 def _call(analyze_types, src, options, loader):
   """Helper function to call analyze.check/infer_types."""
@@ -87,7 +110,7 @@ def check_py(src, options=None, loader=None):
   """Check the types of a string of source code."""
   options = options or config.Options.create()
   if options.use_rewrite:
-    check_types = rewrite_analyze.check_types
+    check_types = _rewrite_analyze().check_types
   else:
     check_types = analyze.check_types
   with config.verbosity_from(options):
@@ -115,7 +138,7 @@ def generate_pyi_ast(
   """
   options = options or config.Options.create()
   if options.use_rewrite:
-    infer_types = rewrite_analyze.infer_types
+    infer_types = _rewrite_analyze().infer_types
   else:
     infer_types = analyze.infer_types
   with config.verbosity_from(options):
@@ -182,28 +205,37 @@ def generate_pyi(src, options=None, loader=None):
 
 
 @_set_verbosity_from(posarg=0)
-def check_or_generate_pyi(options) -> AnalysisResult:
+def check_or_generate_pyi(
+    options, loader=None, *, print_pyi=True
+) -> AnalysisResult:
   """Returns results from running pytype.
 
   Args:
     options: config.Options object.
+    loader: A load_pytd.Loader instance.
+    print_pyi: Whether to print the generated pyi into the result. If False,
+      the result's pyi is None unless the analysis failed, and the caller
+      prints the result's ast itself, e.g. with write_pyi().
 
   Returns:
     An AnalysisResult.
   """
-  loader = load_pytd.create_loader(options)
+  loader = loader or load_pytd.create_loader(options)
   compiler_error = None
   other_error_info = ""
   src = ""
   try:
     src = read_source_file(options.input, options.open_function)
+    exports = ()
     if options.check:
       ctx = check_py(src=src, options=options, loader=loader).context
       ast, result = None, None
     else:
-      ret, result = generate_pyi(src=src, options=options, loader=loader)
+      ret = generate_pyi_ast(src=src, options=options, loader=loader)
       ctx = ret.context
       ast = ret.ast
+      exports = ret.exports
+      result = _output_ast(ast, options) if print_pyi else None
   except utils.UsageError:
     raise
   except pyc.CompileError as e:
@@ -212,7 +244,7 @@ def check_or_generate_pyi(options) -> AnalysisResult:
     compiler_error = (options.input, e.lineno, e.message)
   except IndentationError as e:
     compiler_error = (options.input, e.lineno, e.msg)
-  except libcst.ParserSyntaxError as e:
+  except _libcst_syntax_error() as e:
     # TODO(rechen): We can get rid of this branch once we delete
     # directors.parser_libcst.
     compiler_error = (options.input, e.raw_line, e.message)
@@ -235,7 +267,7 @@ def check_or_generate_pyi(options) -> AnalysisResult:
       e.args = (f"{prefix}\nFile: {options.input}",) + e.args[1:]
       raise
   else:
-    return AnalysisResult(ctx, ast, result)
+    return AnalysisResult(ctx, ast, result, exports)
 
   # check_py/generate_pyi has raised an exception.
   ctx = context.Context(options, loader, src=src)
@@ -258,12 +290,40 @@ def _write_pyi_output(options, contents, filename):
       fi.write(contents)
 
 
+def write_pyi(ast, options, out):
+  """Prints an AST to a file object in pyi format.
+
+  Writes the same text as _output_ast() returns, without holding the whole pyi
+  in memory.
+
+  Args:
+    ast: pytd.TypeDeclUnit to output in pyi format.
+    options: config.Options object.
+    out: A writable text file object.
+  """
+  if options.quick:
+    out.write("# (generated with --quick)\n\n")
+  pytd_utils.Write(ast, out)
+  out.write("\n")
+
+
+def _write_pyi_ast_output(options, ast, filename):
+  assert filename
+  if filename == "-":
+    write_pyi(ast, options, sys.stdout)
+  else:
+    log.info("write pyi %r => %r", options.input, filename)
+    with options.open_function(filename, "w") as fi:
+      write_pyi(ast, options, fi)
+
+
 @_set_verbosity_from(posarg=0)
-def process_one_file(options):
+def process_one_file(options, loader=None):
   """Check a .py file or generate a .pyi for it, according to options.
 
   Args:
     options: config.Options object.
+    loader: A load_pytd.Loader instance, e.g. from a context.ContextTemplate.
 
   Returns:
     An error code (0 means no error).
@@ -271,11 +331,25 @@ def process_one_file(options):
 
   log.info("Process %s => %s", options.input, options.output)
   try:
-    ret = check_or_generate_pyi(options)
+    # Large pyis are written straight to the output file instead of being
+    # printed into a string first.
+    ret = check_or_generate_pyi(options, loader, print_pyi=False)
   except utils.UsageError:
     logging.exception("")
     return 1
+  return _write_outputs_and_report_errors(options, ret)
+
+
+def _write_outputs_and_report_errors(options, ret):
+  """Writes the outputs of an analysis and reports its errors.
+
+  Args:
+    options: config.Options object.
+    ret: The AnalysisResult.
 
+  Returns:
+    An error code (0 means no error).
+  """
   if not options.check:
     if options.pickle_output:
       pyi_output = options.verify_pickle
@@ -283,11 +357,14 @@ def process_one_file(options):
       pyi_output = options.output
     # Write out the pyi file.
     if pyi_output:
-      _write_pyi_output(options, ret.pyi, pyi_output)
+      if ret.pyi is None:
+        _write_pyi_ast_output(options, ret.ast, pyi_output)
+      else:
+        _write_pyi_output(options, ret.pyi, pyi_output)
     # Write out the pickle file.
     if options.pickle_output:
       log.info("write pickle %r => %r", options.input, options.output)
-      write_pickle(ret.ast, options, ret.context.loader)
+      write_pickle(ret.ast, options, ret.context.loader, ret.exports)
 
   if options.unused_imports_info_files:
     if options.use_rewrite:
@@ -318,9 +395,123 @@ def process_one_file(options):
   return exit_status
 
 
+def process_batch(module_options):
+  """Process several modules one after another in this process.
+
+  Every module gets its own Context, but the loader is reused from the
+  previous module if it resolves the module's imports the same way, which
+  saves loading their common dependencies again.
+
+  Args:
+    module_options: An iterable of config.Options objects, one per module.
+
+  Returns:
+    An error code (0 means no error in any module).
+  """
+  loader = None
+  exit_status = 0
+  for options in module_options:
+    # The unused imports are the ones the module's loader didn't access, which
+    # only a new loader can tell.
+    if (
+        loader
+        and not options.unused_imports_info_files
+        and loader.can_reuse_for(options)
+    ):
+      loader.set_options(options)
+    else:
+      loader = load_pytd.create_loader(options)
+    exit_status = process_one_file(options, loader) or exit_status
+  return exit_status
+
+
+def process_cycle(
+    module_options, loader=None, max_iterations=MAX_CYCLE_ITERATIONS
+):
+  """Process modules that import each other, in this process.
+
+  The modules are inferred one after another, each against the latest pyi of
+  the others, until an iteration no longer changes any pyi. The pyis are only
+  kept in memory until then, and only the last iteration's outputs are
+  written and its errors reported. Errors are not collected in the first
+  iteration, which can't be the last.
+
+  Args:
+    module_options: A sequence of config.Options objects, one per module. They
+      have to resolve imports the same way, and their imports map must not
+      include the modules.
+    loader: A load_pytd.Loader instance for the modules.
+    max_iterations: The maximum number of iterations, at least 2.
+
+  Returns:
+    An error code (0 means no error in any module).
+  """
+  assert max_iterations >= 2, max_iterations
+  loader = loader or load_pytd.create_loader(module_options[0])
+  pyis = {}  # module name -> pyi from the previous iteration
+  overrides = {}  # name to import the module by -> (filename, ast)
+  for iteration in range(1, max_iterations + 1):
+    results = []
+    changed = False
+    for options in module_options:
+      if iteration == 1:
+        run_options = copy.copy(options)
+        run_options.tweak(report_errors=False)
+      else:
+        run_options = options
+      # The loader resolves relative imports against its module name.
+      if loader.can_reuse_for(run_options):
+        loader.set_options(run_options)
+      else:
+        loader = load_pytd.create_loader(run_options)
+        loader.override_modules(overrides)
+      ret = check_or_generate_pyi(run_options, loader)
+      # Free the program early, since the whole cycle stays in memory.
+      ret.context.program = None
+      results.append((options, ret))
+      if pyis.get(options.module_name) != ret.pyi:
+        changed = True
+        pyis[options.module_name] = ret.pyi
+        import_name = ".".join(
+            module_utils.strip_init_suffix(options.module_name.split("."))
+        )
+        overrides[import_name] = (
+            options.output,
+            parser.parse_string(
+                ret.pyi,
+                filename=options.output,
+                name=import_name,
+                options=parser.PyiOptions.from_toplevel_options(options),
+            ),
+        )
+        loader.override_modules(overrides)
+    if iteration > 1 and not changed:
+      break
+  _cycle_iterations.add(iteration)
+  _cycle_convergence.inc("unchanged" if not changed else "iteration_limit")
+  log.info(
+      "Inferred a cycle of %d modules in %d iterations%s",
+      len(module_options),
+      iteration,
+      "" if not changed else " (pyi files still changing)",
+  )
+  exit_status = 0
+  for options, ret in results:
+    exit_status = _write_outputs_and_report_errors(options, ret) or exit_status
+  return exit_status
+
+
 @_set_verbosity_from(posarg=1)
-def write_pickle(ast, options, loader=None):
-  """Dump a pickle of the ast to a file."""
+def write_pickle(ast, options, loader=None, exports=None):
+  """Dump a pickle of the ast to a file.
+
+  Args:
+    ast: The pytd.TypeDeclUnit to pickle.
+    options: config.Options object.
+    loader: A load_pytd.Loader instance.
+    exports: The names in the module's __all__, used to prune the pickle with
+      --pickle-interface. If None, they are read from the ast.
+  """
   loader = loader or load_pytd.create_loader(options)
   try:
     ast = serialize_ast.PrepareForExport(options.module_name, ast, loader)
@@ -339,11 +530,16 @@ def write_pickle(ast, options, loader=None):
     ast2 = ast2.Visit(visitors.ClearClassPointers())
     if not pytd_utils.ASTeq(ast1, ast2):
       raise AssertionError()
-  pickle_utils.SerializeAndSave(
-      ast,
+  if options.pickle_interface:
+    ast = serialize_ast.PruneToInterface(ast, exports)
+  serializable_ast = serialize_ast.SerializeAst(
+      ast, src_path=options.input, metadata=options.pickle_metadata
+  )
+  if options.pickle_interface:
+    serializable_ast = serialize_ast.AddInterfaceHash(serializable_ast)
+  pickle_utils.Save(
+      serializable_ast,
       filename=options.output,
-      src_path=options.input,
-      metadata=options.pickle_metadata,
       open_function=options.open_function,
   )
 
@@ -415,7 +611,7 @@ def wrap_pytype_exceptions(exception_type, filename=""):
     raise exception_type(
         "Error reading file %s at line %s: %s" % (filename, e.line, e.error)
     ) from e
-  except libcst.ParserSyntaxError as e:
+  except _libcst_syntax_error() as e:
     # TODO(rechen): We can get rid of this branch once we delete
     # directors.parser_libcst.
     raise exception_type(
@@ -5,13 +5,17 @@ import io as builtins_io
 import sys
 import textwrap
 import traceback
+from unittest import mock
 
 from pytype import config
+from pytype import context
 from pytype import file_utils
 from pytype import io
+from pytype.imports import pickle_utils
 from pytype.platform_utils import path_utils
 from pytype.platform_utils import tempfile as compatible_tempfile
 from pytype.pytd import pytd
+from pytype.pytd import serialize_ast
 from pytype.tests import test_utils
 
 import unittest
@@ -134,6 +138,39 @@ class IOTest(unittest.TestCase):
     ret = io.check_or_generate_pyi(options)
     self.assertEqual(ret.pyi, "x: float\n")
 
+  def test_process_one_file__writes_pyi(self):
+    with test_utils.Tempdir() as d:
+      src = d.create_file("m.py", "x = 0.0\ndef f(y): return y")
+      output = path_utils.join(d.path, "m.pyi")
+      options = config.Options.create(src, output=output, quick=True)
+      self.assertEqual(io.process_one_file(options), 0)
+      with open(output) as f:
+        pyi = f.read()
+      self.assertEqual(pyi, io.check_or_generate_pyi(options).pyi)
+      self.assertIn("x: float\n", pyi)
+
+  def test_context_template(self):
+    with test_utils.Tempdir() as d:
+      d.create_file("foo/dep.pyi", "x: int")
+      d.create_file("bar/dep.pyi", "x: str")
+      src = d.create_file("m.py", "import dep\ny = dep.x")
+      template = context.ContextTemplate(config.Options.create())
+
+      def infer(pythonpath):
+        options = config.Options.create(
+            src, check=False, pythonpath=path_utils.join(d.path, pythonpath)
+        )
+        loader = template.loader_for(options)
+        return loader is not None, io.check_or_generate_pyi(options, loader).pyi
+
+      used_template, pyi = template.run_in_fork(infer, "foo")
+      self.assertTrue(used_template)
+      self.assertIn("y: int", pyi)
+      used_template, pyi = template.run_in_fork(infer, "bar")
+      self.assertTrue(used_template)
+      self.assertIn("y: str", pyi)
+      self.assertFalse(template.matches(config.Options.create(quick=True)))
+
   def test_write_pickle(self):
     ast = pytd.TypeDeclUnit(None, (), (), (), (), ())
     options = config.Options.create(
@@ -141,6 +178,89 @@ class IOTest(unittest.TestCase):
     )
     io.write_pickle(ast, options)  # just make sure we don't crash
 
+  def test_write_pickle_verify_pickle(self):
+    with test_utils.Tempdir() as d:
+      src = textwrap.dedent("""
+        import os
+        class A:
+          def f(self, x: int) -> str:
+            return str(x)
+        def g(*args, **kwargs):
+          return os.path.join("a")
+      """)
+      filename = d.create_file("foo.py", src)
+      options = config.Options.create(
+          filename,
+          module_name="foo",
+          output=path_utils.join(d.path, "foo.pickled"),
+          pickle_output=True,
+          verify_pickle=True,
+      )
+      ast = io.generate_pyi_ast(src, options).ast
+      with open(options.verify_pickle, "w") as f:
+        io.write_pyi(ast, options, f)
+      io.write_pickle(ast, options)
+      self.assertTrue(path_utils.isfile(options.output))
+
+  def test_write_pickle_interface(self):
+    with test_utils.Tempdir() as d:
+      src = textwrap.dedent("""
+        class _Base:
+          pass
+        class A(_Base):
+          pass
+        def _helper():
+          return 42
+      """)
+      filename = d.create_file("foo.py", src)
+      options = config.Options.create(
+          filename,
+          module_name="foo",
+          output=path_utils.join(d.path, "foo.pickled"),
+          pickle_output=True,
+          pickle_interface=True,
+          pickle_metadata="meta",
+      )
+      ast = io.generate_pyi_ast(src, options).ast
+      io.write_pickle(ast, options)
+      loaded = pickle_utils.LoadAst(options.output)
+      metadata = pickle_utils.LoadMetadata(options.output)
+    self.assertCountEqual(
+        [c.name for c in loaded.ast.classes], ["foo.A", "foo._Base"]
+    )
+    self.assertFalse(loaded.ast.functions)
+    self.assertEqual(metadata, loaded.metadata)
+    self.assertEqual(metadata[0], "meta")
+    self.assertEqual(
+        serialize_ast.GetInterfaceHash(metadata),
+        serialize_ast.InterfaceHash(loaded),
+    )
+
+  def test_write_pickle_interface_all(self):
+    with test_utils.Tempdir() as d:
+      src = textwrap.dedent("""
+        __all__ = ["public", "_exported"]
+        def public():
+          return 0
+        def _exported():
+          return 42
+        def _private():
+          return 42
+      """)
+      filename = d.create_file("foo.py", src)
+      options = config.Options.create(
+          filename,
+          module_name="foo",
+          output=path_utils.join(d.path, "foo.pickled"),
+          pickle_output=True,
+          pickle_interface=True,
+      )
+      self.assertFalse(io.process_one_file(options))
+      loaded = pickle_utils.LoadAst(options.output)
+    self.assertCountEqual(
+        [f.name for f in loaded.ast.functions], ["foo.public", "foo._exported"]
+    )
+
   def test_unused_imports_info_files(self):
     with test_utils.Tempdir() as d, file_utils.cd(d.path):
       d.create_file("common/foo.pyi", "from common import bar\nx: bar.Bar")
@@ -176,6 +296,120 @@ class IOTest(unittest.TestCase):
           file_utils.replace_separator("aaa/other.pyi\ncommon/baz.pyi\n"),
       )
 
+  def test_process_batch(self):
+    with test_utils.Tempdir() as d:
+      dep = d.create_file("dep.pyi", "x: int")
+      a = d.create_file("a.py", "import dep\ny = dep.x")
+      b = d.create_file("b.py", "import dep\nz = dep.x")
+      c = d.create_file("c.py", "import dep\nw = dep.x")
+      module_options = [
+          config.Options.create(
+              a,
+              module_name="a",
+              output=path_utils.join(d.path, "a.pyi"),
+              imports_map_items=[("dep", dep)],
+          ),
+          config.Options.create(
+              b,
+              module_name="b",
+              output=path_utils.join(d.path, "b.pyi"),
+              imports_map_items=[("dep", dep), ("a", d["a.pyi"])],
+          ),
+          # Doesn't list dep, so it can't use the previous loader.
+          config.Options.create(
+              c, module_name="c", output=path_utils.join(d.path, "c.pyi")
+          ),
+      ]
+      with mock.patch.object(
+          io.load_pytd, "create_loader", wraps=io.load_pytd.create_loader
+      ) as create_loader:
+        self.assertEqual(1, io.process_batch(module_options))
+      self.assertEqual(2, create_loader.call_count)
+      with open(d["b.pyi"]) as f:
+        self.assertIn("z: int", f.read())
+
+  def test_process_cycle(self):
+    with test_utils.Tempdir() as d:
+      dep = d.create_file("dep.pyi", "x: int")
+      a = d.create_file("a.py", """
+        import b
+        def f():
+          return b.g()
+        def err():
+          return b.g() + ""
+      """)
+      b = d.create_file("b.py", """
+        import a
+        import dep
+        def g():
+          return dep.x
+        def h():
+          return a.f()
+      """)
+      module_options = [
+          config.Options.create(
+              a,
+              module_name="a",
+              output=d["a.pyi"],
+              imports_map_items=[("dep", dep)],
+          ),
+          config.Options.create(
+              b,
+              module_name="b",
+              output=d["b.pyi"],
+              imports_map_items=[("dep", dep)],
+              report_errors=False,
+          ),
+      ]
+      stderr = builtins_io.StringIO()
+      with contextlib.redirect_stderr(stderr):
+        self.assertEqual(1, io.process_cycle(module_options))
+      with open(d["a.pyi"]) as f:
+        self.assertIn("def f() -> int: ...", f.read())
+      with open(d["b.pyi"]) as f:
+        self.assertIn("def h() -> int: ...", f.read())
+    # Errors from the iterations before the types of the cycle were known, like
+    # import errors, aren't reported.
+    self.assertIn("unsupported-operands", stderr.getvalue())
+    self.assertNotIn("import-error", stderr.getvalue())
+
+  def test_process_cycle_relative_imports(self):
+    with test_utils.Tempdir() as d:
+      c = d.create_file("pkg/c.pyi", "x: int")
+      sub = d.create_file("pkg/sub/__init__.pyi")
+      a = d.create_file("pkg/a.py", """
+        from . import c
+        from .sub import b
+        def f():
+          return c.x
+        def g():
+          return b.h()
+      """)
+      b = d.create_file("pkg/sub/b.py", """
+        from .. import a
+        def h():
+          return a.f()
+      """)
+      module_options = [
+          config.Options.create(
+              a,
+              module_name="pkg.a",
+              output=d["pkg/a.pyi"],
+              imports_map_items=[("pkg/c", c), ("pkg/sub/__init__", sub)],
+          ),
+          config.Options.create(
+              b,
+              module_name="pkg.sub.b",
+              output=d["pkg/sub/b.pyi"],
+              imports_map_items=[("pkg/c", c), ("pkg/sub/__init__", sub)],
+          ),
+      ]
+      self.assertEqual(0, io.process_cycle(module_options))
+      with open(d["pkg/a.pyi"]) as f:
+        self.assertIn("def g() -> int: ...", f.read())
+      with open(d["pkg/sub/b.pyi"]) as f:
+        self.assertIn("def h() -> int: ...", f.read())
+
 
 if __name__ == "__main__":
   unittest.main()
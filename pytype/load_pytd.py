@@ -143,6 +143,9 @@ class _ModuleMap:
 
   def __init__(self, options, modules):
     self.options = options
+    # Canonical instances of the types in the loaded modules, shared between
+    # them if --intern-pytd-types is set.
+    self._type_table = {} if options.intern_pytd_types else None
     self._modules: dict[str, Module] = modules or self._base_modules()
     if self._modules["builtins"].needs_unpickling():
       self._unpickle_module(self._modules["builtins"])
@@ -226,6 +229,7 @@ class _ModuleMap:
       loaded_ast = pickle_utils.DecodeAst(m.pickle)
       deps = [d for d, _ in loaded_ast.dependencies if d != loaded_ast.ast.name]
       loaded_ast = serialize_ast.EnsureAstName(loaded_ast, m.module_name)
+      loaded_ast = loaded_ast.Replace(ast=self.intern_types(loaded_ast.ast))
       assert m.module_name in self._modules
       for dependency in deps:
         module_prefix = dependency
@@ -252,6 +256,12 @@ class _ModuleMap:
       serialize_ast.FillLocalReferences(loaded_ast, module_map)
     assert module.ast
 
+  def intern_types(self, ast: _AST) -> _AST:
+    """Replaces types in the ast with the instances shared between modules."""
+    if self._type_table is None:
+      return ast
+    return ast.Visit(visitors.InternTypes(self._type_table))
+
   def concat_all(self):
     if not self._concatenated:
       self._concatenated = pytd_utils.Concat(*self.defined_asts(), name="<all>")
@@ -426,10 +436,69 @@ class Loader:
     self._import_name_cache = {}  # performance cache
     self._aliases = collections.defaultdict(dict)
     self._prefixes = set()
+    self._overrides = {}
     # Paranoid verification that pytype.main properly checked the flags:
     if options.imports_map is not None:
       assert options.pythonpath == [""], options.pythonpath
 
+  def can_reuse_for(self, options):
+    """Whether the loader can be used for a module with different options.
+
+    Builtins and typing are the same for every module. Any other module that
+    the loader has already imported must resolve to the same file under the
+    new options. This holds when the new imports map agrees with the old one on
+    every path in the old one, and none of the paths it adds could shadow a
+    module that was found somewhere else.
+
+    Args:
+      options: A config.Options object.
+
+    Returns:
+      True if the loader can switch to the options with set_options().
+    """
+    if (
+        parser.PyiOptions.from_toplevel_options(options) != self._pyi_options
+        or options.typeshed != self.options.typeshed
+        or options.use_pickled_files != self.options.use_pickled_files
+        or options.open_function is not self.options.open_function
+    ):
+      return False
+    # Modules in a precompiled bundle that haven't been unpickled yet are the
+    # same in a new loader.
+    imported = set(self._import_name_cache)
+    imported.update(name for name, m in self._modules.items() if m.ast)
+    imported -= {"builtins", "typing"}
+    if not imported:
+      return True
+    old_map, new_map = self.options.imports_map, options.imports_map
+    if old_map is None or new_map is None:
+      return False
+    if any(new_map.items.get(k) != v for k, v in old_map.items.items()):
+      return False
+    added = new_map.items.keys() - old_map.items.keys()
+    for module_name in imported:
+      path = path_utils.join(*module_name.split("."))
+      if path in added or path_utils.join(path, "__init__") in added:
+        return False
+    return True
+
+  def set_options(self, options):
+    """Point the loader at the options of a different module.
+
+    Args:
+      options: A config.Options object, for which can_reuse_for() is true.
+    """
+    assert self.can_reuse_for(options), (
+        "Cannot switch to options that resolve imports differently"
+    )
+    if options.imports_map is not None:
+      assert options.pythonpath == [""], options.pythonpath
+    self.options = options
+    self._modules.options = options
+    self._module_loader = module_loader.ModuleLoader(options)
+    for attr in ("_pyi_options", "_typeshed_loader", "_builtin_loader"):
+      self.__dict__.pop(attr, None)
+
   @functools.cached_property
   def _typeshed_loader(self):
     return typeshed.TypeshedLoader(self._pyi_options, self._missing_modules)
@@ -521,6 +590,7 @@ class Loader:
       # Now that any imported TypeVar instances have been resolved, adjust type
       # parameters in classes and functions.
       module.ast = module.ast.Visit(visitors.AdjustTypeParameters())
+      module.ast = self._modules.intern_types(module.ast)
       # Now we can fill in internal cls pointers to ClassType nodes in the
       # module. This code executes when the module is first loaded, which
       # happens before any others use it to resolve dependencies, so there are
@@ -542,6 +612,21 @@ class Loader:
     if module_name in self._import_name_cache:
       del self._import_name_cache[module_name]
 
+  def override_modules(self, modules):
+    """Imports the given modules instead of looking them up.
+
+    Previously loaded versions of the overridden modules are dropped. Only the
+    overridden modules themselves may import them, since other modules would
+    keep pointing into the old versions.
+
+    Args:
+      modules: A mapping from module names to (filename, ast) pairs, with
+        unresolved ASTs like the ones the pyi parser produces.
+    """
+    for module_name in self._overrides.keys() | modules.keys():
+      self.remove_name(module_name)
+    self._overrides = dict(modules)
+
   def _try_import_prefix(self, name: str) -> _AST | None:
     """Try importing all prefixes of name, returning the first valid module."""
     prefix = name
@@ -781,6 +866,10 @@ class Loader:
     if existing:
       return existing
 
+    if module_name in self._overrides:
+      filename, mod_ast = self._overrides[module_name]
+      return self.load_module(ModuleInfo(module_name, filename), mod_ast=mod_ast)
+
     assert path_utils.sep not in module_name, (path_utils.sep, module_name)
     log.debug("Trying to import %r", module_name)
     # Builtin modules (but not standard library modules!) take precedence
@@ -889,6 +978,9 @@ class PickledPyiLoader(Loader):
         if d != loaded_ast.ast.name
     }
     loaded_ast = serialize_ast.EnsureAstName(loaded_ast, module_name, fix=True)
+    loaded_ast = loaded_ast.Replace(
+        ast=self._modules.intern_types(loaded_ast.ast)
+    )
     self._modules[module_name] = Module(
         module_name,
         mod_info.filename,
@@ -14,6 +14,7 @@ from pytype import load_pytd
 from pytype import module_utils
 from pytype.imports import pickle_utils
 from pytype.platform_utils import path_utils
+from pytype.pyi import parser
 from pytype.pytd import pytd
 from pytype.pytd import pytd_utils
 from pytype.pytd import visitors
@@ -356,6 +357,72 @@ class ImportPathsTest(_LoaderTest):
       with self.assertRaisesRegex(load_pytd.BadDependencyError, "bar"):
         loader.import_name("foo")
 
+  def test_set_options(self):
+    with test_utils.Tempdir() as d:
+      d.create_file("foo/bar.pyi", "class Bar: ...")
+      d.create_file("baz/bar.pyi", "class Baz: ...")
+      loader = load_pytd.Loader(
+          config.Options.create(
+              python_version=self.python_version,
+              pythonpath=path_utils.join(d.path, "foo"),
+          )
+      )
+      loader.set_options(
+          config.Options.create(
+              python_version=self.python_version,
+              pythonpath=path_utils.join(d.path, "baz"),
+          )
+      )
+      self.assertTrue(loader.import_name("bar").Lookup("bar.Baz"))
+      with self.assertRaises(AssertionError):
+        loader.set_options(loader.options)
+
+  def test_can_reuse_for(self):
+    with test_utils.Tempdir() as d:
+      foo_path = d.create_file("foo.pyi", "class Foo: ...")
+      bar_path = d.create_file("bar.pyi", "class Bar: ...")
+
+      def make_options(**items):
+        return config.Options.create(
+            python_version=self.python_version,
+            imports_map_items=list(items.items()),
+        )
+
+      loader = load_pytd.Loader(make_options(foo=foo_path))
+      self.assertTrue(loader.can_reuse_for(make_options()))
+      loader.import_name("foo")
+      loader.import_name("bar")  # not found
+      self.assertTrue(loader.can_reuse_for(make_options(foo=foo_path)))
+      self.assertFalse(loader.can_reuse_for(make_options()))
+      self.assertFalse(loader.can_reuse_for(make_options(foo=bar_path)))
+      self.assertFalse(
+          loader.can_reuse_for(make_options(foo=foo_path, bar=bar_path))
+      )
+      baz_options = make_options(foo=foo_path, baz=bar_path)
+      self.assertTrue(loader.can_reuse_for(baz_options))
+      loader.set_options(baz_options)
+      self.assertTrue(loader.import_name("baz").Lookup("baz.Bar"))
+
+  def test_override_modules(self):
+    loader = load_pytd.Loader(
+        config.Options.create(python_version=self.python_version)
+    )
+
+    def override(src):
+      ast = parser.parse_string(src, name="foo")
+      loader.override_modules({"foo": ("foo.pyi", ast)})
+
+    override("x: int")
+    self.assertEqual(
+        "builtins.int", loader.import_name("foo").Lookup("foo.x").type.name
+    )
+    override("x: str")
+    self.assertEqual(
+        "builtins.str", loader.import_name("foo").Lookup("foo.x").type.name
+    )
+    loader.override_modules({})
+    self.assertIsNone(loader.import_name("foo"))
+
   def test_relative(self):
     with test_utils.Tempdir() as d:
       d.create_file("__init__.pyi", "base = ...  # type: str")
@@ -997,6 +1064,29 @@ class ImportPathsTest(_LoaderTest):
     )
 
 
+class InternTypesTest(test_base.UnitTest):
+
+  def test_share_types_between_modules(self):
+    src = """
+      from typing import Any, Literal
+      def f(x: Literal[1, 2]) -> Any: ...
+    """
+    with test_utils.Tempdir() as d:
+      d.create_file("foo.pyi", src)
+      d.create_file("bar.pyi", src)
+      loader = load_pytd.Loader(
+          config.Options.create(
+              python_version=self.python_version,
+              pythonpath=d.path,
+              intern_pytd_types=True,
+          )
+      )
+      (foo,) = loader.import_name("foo").Lookup("foo.f").signatures
+      (bar,) = loader.import_name("bar").Lookup("bar.f").signatures
+    self.assertIs(foo.params[0].type, bar.params[0].type)
+    self.assertIs(foo.return_type, bar.return_type)
+
+
 class ImportTypeMacroTest(_LoaderTest):
 
   def test_container(self):
@@ -1448,6 +1538,19 @@ class NestedClassTest(_LoaderTest):
         pytd_utils.Print(actual_c).rstrip(), "class a.A.C(a.A.B): ..."
     )
 
+  def test_cache_member_lookups(self):
+    ast = self._import(a="""
+      class A:
+        class B:
+          def f(self) -> int: ...
+      class C(A.B): ...
+    """)
+    f = pytd.LookupItemRecursive(ast, "A.B.f")
+    self.assertIs(pytd.LookupItemRecursive(ast, "A.B.f"), f)
+    # Lookups through base classes depend on ClassType pointers.
+    self.assertEqual(pytd.LookupItemRecursive(ast, "C.f"), f)
+    self.assertNotIn("C.f", ast._member_index)
+
   @test_base.skip("This does not work yet")
   def test_shadowing(self):
     ast = self._import(a="""
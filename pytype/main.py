@@ -6,6 +6,7 @@ Usage:
   pytype [flags] file.py
 """
 
+import contextlib
 import cProfile
 import logging
 import signal
@@ -103,11 +104,54 @@ def _fix_spaces(argv):
   return escaped_argv
 
 
+@contextlib.contextmanager
+def run_context(options, argv):
+  """Sets up a pytype-single run: the exec log, timeout, profile and metrics.
+
+  Used by main() and by the fork server of analyze_project, which runs each
+  module in a forked child instead of a new process.
+
+  Args:
+    options: config.Options object.
+    argv: The command line of the run, for --exec-log.
+
+  Yields:
+    None.
+  """
+  if options.exec_log:
+    with options.open_function(options.exec_log, "w") as f:
+      f.write(" ".join(argv))
+
+  # TODO(mdemello): timeout is temporarily unavailable under win32
+  timeout = options.timeout is not None and sys.platform != "win32"
+  if timeout:
+    signal.alarm(options.timeout)
+  try:
+    with contextlib.ExitStack() as stack:
+      stack.enter_context(_ProfileContext(options.profile))
+      stack.enter_context(
+          metrics.MetricsContext(options.metrics, options.open_function)
+      )
+      stack.enter_context(metrics.StopWatch("total_time"))
+      stack.enter_context(metrics.WallStopWatch("wall_time"))
+      stack.enter_context(metrics.PeakMemory("peak_memory"))
+      stack.enter_context(
+          metrics.Snapshot("memory", enabled=options.memory_snapshots)
+      )
+      yield
+  finally:
+    if timeout:
+      signal.alarm(0)
+
+
 def main():
+  argv = _fix_spaces(_expand_args(sys.argv[1:]))
   try:
-    options = config.Options(
-        _fix_spaces(_expand_args(sys.argv[1:])), command_line=True
-    )
+    options = config.Options(argv, command_line=True)
+    if options.batch_manifest:
+      module_options = config.read_batch_manifest(argv, options.batch_manifest)
+    else:
+      module_options = None
   except utils.UsageError as e:
     print(str(e), file=sys.stderr)
     sys.exit(1)
@@ -120,28 +164,30 @@ def main():
     print(io.get_pytype_version())
     sys.exit(0)
 
-  if options.exec_log:
-    with options.open_function(options.exec_log, "w") as f:
-      f.write(" ".join(sys.argv))
+  with run_context(options, sys.argv):
+    return _run_pytype(options, module_options)
 
-  # TODO(mdemello): timeout is temporarily unavailable under win32
-  if options.timeout is not None and sys.platform != "win32":
-    signal.alarm(options.timeout)
 
-  with _ProfileContext(options.profile):
-    with metrics.MetricsContext(options.metrics, options.open_function):
-      with metrics.StopWatch("total_time"):
-        with metrics.Snapshot("memory", enabled=options.memory_snapshots):
-          return _run_pytype(options)
+def _run_pytype(options, module_options=None):
+  """Run pytype with the given configuration options.
 
+  Args:
+    options: config.Options object.
+    module_options: With --batch-manifest, the options of each module, from
+      config.read_batch_manifest().
 
-def _run_pytype(options):
-  """Run pytype with the given configuration options."""
+  Returns:
+    An error code (0 means no error).
+  """
   if options.generate_builtins:
     return _generate_builtins_pickle(options)
   elif options.parse_pyi:
     unused_ast = io.parse_pyi(options)
     return 0
+  elif options.batch_cycle:
+    return io.process_cycle(module_options)
+  elif options.batch_manifest:
+    return io.process_batch(module_options)
   else:
     return io.process_one_file(options)
 
@@ -1,12 +1,15 @@
 """Integration test for pytype."""
 
+import contextlib
 import csv
 import hashlib
+import io
 import os
 import shutil
 import subprocess
 import sys
 import textwrap
+from unittest import mock
 
 from pytype import config
 from pytype import file_utils
@@ -219,6 +222,21 @@ class PytypeTest(test_base.UnitTest):
     pytype_main._run_pytype(options)
     self.assertTrue(path_utils.isfile(outfile))
 
+  def test_bad_batch_manifest(self):
+    manifest = self._tmp_path("manifest")
+    with open(manifest, "w") as f:
+      f.write('{"input": "a.py"\n')
+    argv = ["pytype", f"--batch-manifest={manifest}"]
+    stderr = io.StringIO()
+    with mock.patch.object(sys, "argv", argv), contextlib.redirect_stderr(
+        stderr
+    ):
+      with self.assertRaises(SystemExit) as e:
+        pytype_main.main()
+    self.assertEqual(e.exception.code, 1)
+    self.assertIn(f"{manifest}:1: Invalid JSON", stderr.getvalue())
+    self.assertNotIn("Traceback", stderr.getvalue())
+
   @test_base.skip("flaky; see b/195678773")
   def test_pickled_file_stableness(self):
     # Tests that the pickled format is stable under a constant PYTHONHASHSEED.
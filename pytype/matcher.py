@@ -245,6 +245,9 @@ class AbstractMatcher(utils.ContextWeakrefMixin):
   def _get_bad_type(
       self, name: str | None, expected: types.BaseValue
   ) -> error_types.BadType:
+    if not self.ctx.options.report_errors:
+      # The substituted type and the details only go into error messages.
+      return error_types.BadType(name=name, typ=expected)
     return error_types.BadType(
         name=name,
         typ=self.ctx.annotation_utils.sub_one_annotation(
@@ -341,7 +344,9 @@ class AbstractMatcher(utils.ContextWeakrefMixin):
     """
     bad_matches = []
     good_matches = _UniqueMatches(self._node, keep_all_views)
-    views = abstract_utils.get_views([var], self._node)
+    views = abstract_utils.get_views(
+        [var], self._node, self.ctx.options.binding_product_limit
+    )
     skip_future = None
     while True:
       try:
@@ -1234,7 +1239,9 @@ class AbstractMatcher(utils.ContextWeakrefMixin):
   def _match_all_bindings(self, var, other_type, subst, view):
     """Matches all of var's bindings against other_type."""
     new_substs = []
-    for new_view in abstract_utils.get_views([var], self._node):
+    for new_view in abstract_utils.get_views(
+        [var], self._node, self.ctx.options.binding_product_limit
+    ):
       # When new_view and view have entries in common, we want to use the
       # entries from the old view.
       new_view.update(view)
@@ -1901,7 +1908,9 @@ class AbstractMatcher(utils.ContextWeakrefMixin):
     # Every binding of left_attribute needs to match at least one binding of
     # protocol_attribute_var.
     new_substs = []
-    for new_view in abstract_utils.get_views([left_attribute], self._node):
+    for new_view in abstract_utils.get_views(
+        [left_attribute], self._node, self.ctx.options.binding_product_limit
+    ):
       new_view.update(view)
       bad_matches = []
       for protocol_attribute in protocol_attribute_var.data:
@@ -1928,6 +1937,8 @@ class AbstractMatcher(utils.ContextWeakrefMixin):
       else:
         # This binding of left_attribute has not matched any binding of
         # protocol_attribute_var.
+        if not self.ctx.options.report_errors:
+          return None
         bad_left, bad_right = zip(*bad_matches)
         self._protocol_error = error_types.ProtocolTypeError(
             left.cls,
@@ -22,9 +22,16 @@ import json
 import math
 import os
 import re
+import sys
 import time
 import types
 
+try:
+  import resource  # pylint: disable=g-import-not-at-top
+except ImportError:
+  # Not available on Windows
+  resource: types.ModuleType = None
+
 try:
   import tracemalloc  # pylint: disable=g-import-not-at-top
 except ImportError:
@@ -54,6 +61,17 @@ def reset():
   _enabled = False
 
 
+def is_enabled():
+  """Whether metrics are being collected.
+
+  Callers on hot paths can check this before building a metric's arguments.
+
+  Returns:
+    True if metrics are enabled.
+  """
+  return _enabled
+
+
 class _RegistryMeta(type):
   """Metaclass that registers subclasses in _METRIC_TYPES."""
 
@@ -226,6 +244,45 @@ class StopWatch(Metric):
     self._total += other._total
 
 
+class WallStopWatch(StopWatch):
+  """A StopWatch that measures wall time instead of CPU time."""
+
+  def __enter__(self):
+    self._start_time = time.perf_counter()
+
+  def __exit__(self, exc_type, exc_value, traceback):
+    self._total = time.perf_counter() - self._start_time
+    del self._start_time
+
+
+class PeakMemory(Metric):
+  """The peak resident set size of the process at the end of a "with"."""
+
+  def __init__(self, name):
+    super().__init__(name)
+    self._kilobytes = None  # None if the platform can't tell.
+
+  def __enter__(self):
+    pass
+
+  def __exit__(self, exc_type, exc_value, traceback):
+    if resource is None:
+      return
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes elsewhere.
+    self._kilobytes = max_rss // 1024 if sys.platform == "darwin" else max_rss
+
+  def _summary(self):
+    return "unknown" if self._kilobytes is None else f"{self._kilobytes} KB"
+
+  def _merge(self, other):
+    # pylint: disable=protected-access
+    self._kilobytes = max(
+        (k for k in (self._kilobytes, other._kilobytes) if k is not None),
+        default=None,
+    )
+
+
 class ReentrantStopWatch(Metric):
   """A watch that supports being called multiple times and recursively."""
 
@@ -58,6 +58,11 @@ class MetricsTest(unittest.TestCase):
     c.inc()
     self.assertEqual(0, c._total)
 
+  def test_is_enabled(self):
+    self.assertTrue(metrics.is_enabled())
+    metrics._prepare_for_test(enabled=False)
+    self.assertFalse(metrics.is_enabled())
+
   def test_merge_from(self):
     # Create a counter, increment it, and dump it.
     c1 = metrics.Counter("foo")
@@ -149,6 +154,51 @@ class StopWatchTest(unittest.TestCase):
     self.assertIsInstance(str(c1), str)
 
 
+class WallStopWatchTest(unittest.TestCase):
+  """Tests for WallStopWatch."""
+
+  def setUp(self):
+    super().setUp()
+    metrics._prepare_for_test()
+
+  def test_stopwatch(self):
+    c = metrics.WallStopWatch("foo")
+    with c:
+      pass
+    self.assertGreaterEqual(c._total, 0)
+
+
+class PeakMemoryTest(unittest.TestCase):
+  """Tests for PeakMemory."""
+
+  def setUp(self):
+    super().setUp()
+    metrics._prepare_for_test()
+
+  def test_peak_memory(self):
+    c = metrics.PeakMemory("foo")
+    with c:
+      pass
+    if metrics.resource:
+      self.assertGreater(c._kilobytes, 0)
+    else:
+      self.assertIsNone(c._kilobytes)
+    self.assertIsInstance(c._summary(), str)
+
+  def test_merge(self):
+    c1 = metrics.PeakMemory("foo")
+    c2 = metrics.PeakMemory("bar")
+    c3 = metrics.PeakMemory("baz")
+    c1._kilobytes = 10
+    c2._kilobytes = 20
+    c1._merge(c2)
+    self.assertEqual(c1._kilobytes, 20)
+    c1._merge(c3)
+    self.assertEqual(c1._kilobytes, 20)
+    c3._merge(metrics.PeakMemory("qux"))
+    self.assertIsNone(c3._kilobytes)
+
+
 class MapCounterTest(unittest.TestCase):
   """Tests for MapCounter."""
 
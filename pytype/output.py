@@ -47,6 +47,8 @@ class Converter(utils.ContextWeakrefMixin):
     self._output_mode = Converter.OutputMode.NORMAL
     self._optimize_literals = False
     self._scopes = []
+    self._type_cache = None
+    self._join_cache = None
 
   @contextlib.contextmanager
   def set_output_mode(self, mode):
@@ -78,6 +80,34 @@ class Converter(utils.ContextWeakrefMixin):
     yield
     self._optimize_literals = old
 
+  @contextlib.contextmanager
+  def cache_types(self):
+    """Cache the pytd types of values for the duration of one conversion.
+
+    While a module's pyi is generated, the same values are converted many times,
+    e.g. attribute values shared by all instances of a class. The analysis is
+    finished by then, so a value's type at a given node does not change. The
+    unions built from these types are cached as well, see join_types(). Nested
+    uses share the caches of the outermost one.
+
+    Yields:
+      None.
+    """
+    if self._type_cache is not None:
+      yield
+      return
+    old = self._type_cache, self._join_cache
+    self._type_cache = {}
+    self._join_cache = {}
+    try:
+      yield
+    finally:
+      self._type_cache, self._join_cache = old
+
+  def join_types(self, types):
+    """Joins pytd types, reusing the unions built during this conversion."""
+    return pytd_utils.JoinTypes(types, self._join_cache)
+
   @property
   def _detailed(self):
     return self._output_mode >= Converter.OutputMode.DETAILED
@@ -96,6 +126,16 @@ class Converter(utils.ContextWeakrefMixin):
     else:
       return var.data
 
+  def _filter_variables(self, variables):
+    """Filters the bindings of many variables at the exitpoint."""
+    if not variables:
+      # Converting a value outside of a full analysis, e.g. in a unit test,
+      # leaves the exitpoint unset, which FilterVariables does not accept.
+      return []
+    return self.ctx.program.FilterVariables(
+        variables, self.ctx.exitpoint, strict=False
+    )
+
   def _is_tuple(self, v, instance):
     return isinstance(v, abstract.TupleClass) or isinstance(
         instance, abstract.Tuple
@@ -167,7 +207,11 @@ class Converter(utils.ContextWeakrefMixin):
             param_values = {val: None for val in param_var.data}
           else:
             param_values = {}
-            for new_view in abstract_utils.get_views([param_var], param_node):
+            for new_view in abstract_utils.get_views(
+                [param_var],
+                param_node,
+                self.ctx.options.binding_product_limit,
+            ):
               new_view.update(view)
               param_values[new_view[param_var].data] = new_view
         else:
@@ -188,7 +232,7 @@ class Converter(utils.ContextWeakrefMixin):
               node, formal_param, None, seen, view
           )
         else:
-          arg = pytd_utils.JoinTypes(
+          arg = self.join_types(
               self.value_to_pytd_type(node, p, seen, param_view)
               for p, param_view in param_values.items()
           )
@@ -313,12 +357,12 @@ class Converter(utils.ContextWeakrefMixin):
     elif v.instance.get_instance_type_parameter(v.full_name).bindings:
       # The type parameter was initialized. Set the view to None, since we
       # don't include v.instance in the view.
-      return pytd_utils.JoinTypes(
+      return self.join_types(
           self.value_to_pytd_type(node, p, seen, None)
           for p in v.instance.get_instance_type_parameter(v.full_name).data
       )
     elif v.param.constraints:
-      return pytd_utils.JoinTypes(
+      return self.join_types(
           self.value_instance_to_pytd_type(node, p, None, seen, view)
           for p in v.param.constraints
       )
@@ -341,6 +385,26 @@ class Converter(utils.ContextWeakrefMixin):
     Returns:
       A PyTD type.
     """
+    if self._type_cache is None or seen is not None or view is not None:
+      return self._value_to_pytd_type(node, v, seen, view)
+    # Values are keyed by identity, since some of them (e.g. tuples) compare
+    # equal to values that contain different bindings. The cached entry keeps
+    # the value alive so that its id is not reused.
+    key = (
+        id(v),
+        node,
+        self._output_mode,
+        self._optimize_literals,
+        tuple(self._scopes),
+    )
+    if key in self._type_cache:
+      return self._type_cache[key][1]
+    typ = self._value_to_pytd_type(node, v, seen, view)
+    self._type_cache[key] = (v, typ)
+    return typ
+
+  def _value_to_pytd_type(self, node, v, seen, view):
+    """Computes value_to_pytd_type() without caching."""
     if isinstance(v, (abstract.Empty, typing_overlay.Never)):
       return pytd.NothingType()
     elif isinstance(v, abstract.TYPE_VARIABLE_INSTANCES):
@@ -350,7 +414,7 @@ class Converter(utils.ContextWeakrefMixin):
     elif isinstance(v, dataclass_overlay.FieldInstance):
       if not v.default:
         return pytd.AnythingType()
-      return pytd_utils.JoinTypes(
+      return self.join_types(
           self.value_to_pytd_type(node, d, seen, view) for d in v.default.data
       )
     elif isinstance(v, attr_overlay.AttribInstance):
@@ -403,7 +467,7 @@ class Converter(utils.ContextWeakrefMixin):
       )
       return ret
     elif isinstance(v, abstract.Union):
-      return pytd_utils.JoinTypes(
+      return self.join_types(
           self.value_to_pytd_type(node, o, seen, view) for o in v.options
       )
     elif isinstance(v, special_builtins.SuperInstance):
@@ -831,17 +895,23 @@ class Converter(utils.ContextWeakrefMixin):
     inner_class_names = {x.name for x in classes}
 
     class_type_params = {t.name for t in v.template}
+    full_name = v.official_name or v.name
+    self_type_re = re.compile(rf"{full_name}(\[.*\])?")
 
     # class-level attributes
-    for name, member in v.members.items():
-      if (
-          name in abstract_utils.CLASS_LEVEL_IGNORE
-          or name in annotated_names
-          or (v.is_enum and name in ("__new__", "__eq__"))
-          or name in inner_class_names
-      ):
-        continue
-      for value in member.FilteredData(self.ctx.exitpoint, strict=False):
+    members = {
+        name: member
+        for name, member in v.members.items()
+        if not (
+            name in abstract_utils.CLASS_LEVEL_IGNORE
+            or name in annotated_names
+            or (v.is_enum and name in ("__new__", "__eq__"))
+            or name in inner_class_names
+        )
+    }
+    filtered = self._filter_variables(list(members.values()))
+    for (name, member), bindings in zip(members.items(), filtered):
+      for value in (b.data for b in bindings):
         if isinstance(value, special_builtins.PropertyInstance):
           # For simplicity, output properties as constants, since our parser
           # turns them into constants anyway.
@@ -877,8 +947,7 @@ class Converter(utils.ContextWeakrefMixin):
               self_type_name = self_type.name
             if not self_type_name:
               return sig
-            full_name = v.official_name or v.name
-            if not re.fullmatch(rf"{full_name}(\[.*\])?", self_type_name):
+            if not self_type_re.fullmatch(self_type_name):
               return None
             # Remove any outer class prefixes from the type name.
             if "." in full_name:
@@ -966,10 +1035,15 @@ class Converter(utils.ContextWeakrefMixin):
     canonical_attributes = set()
 
     def add_attributes_from(instance):
-      for name, member in instance.members.items():
-        if name in abstract_utils.CLASS_LEVEL_IGNORE or name in ignore:
-          continue
-        for value in member.FilteredData(self.ctx.exitpoint, strict=False):
+      members = {
+          name: member
+          for name, member in instance.members.items()
+          if name not in abstract_utils.CLASS_LEVEL_IGNORE
+          and name not in ignore
+      }
+      filtered = self._filter_variables(list(members.values()))
+      for name, bindings in zip(members, filtered):
+        for value in (b.data for b in bindings):
           typ = value.to_pytd_type(node)
           if pytd_utils.GetTypeParameters(typ):
             # This attribute's type comes from an annotation that contains a
@@ -1038,7 +1112,7 @@ class Converter(utils.ContextWeakrefMixin):
           bases.append(b.to_pytd_type_of_instance(node))
       else:
         bases.append(
-            pytd_utils.JoinTypes(
+            self.join_types(
                 b.to_pytd_type_of_instance(node) for b in basevar.data
             )
         )
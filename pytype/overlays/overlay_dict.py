@@ -5,50 +5,51 @@ has some built-in overlays, and additional overlays may be added to the overlays
 dictionary. See overlay.py for the overlay interface and the files under
 overlays/ for examples.
 
-Each entry in overlays maps the module name to the overlay object
+Each entry in overlays maps the module name to the overlay object. The
+built-in overlays are imported the first time they are constructed, so that
+importing pytype doesn't pay for overlays that a program never uses.
 """
 
-from pytype.overlays import abc_overlay
-from pytype.overlays import asyncio_types_overlay
-from pytype.overlays import attr_overlay
-from pytype.overlays import chex_overlay
-from pytype.overlays import collections_overlay
-from pytype.overlays import dataclass_overlay
-from pytype.overlays import enum_overlay
-from pytype.overlays import fiddle_overlay
-from pytype.overlays import flax_overlay
-from pytype.overlays import functools_overlay
-from pytype.overlays import future_overlay
-from pytype.overlays import pytype_extensions_overlay
-from pytype.overlays import six_overlay
-from pytype.overlays import subprocess_overlay
-from pytype.overlays import sys_overlay
-from pytype.overlays import typing_extensions_overlay
-from pytype.overlays import typing_overlay
+import importlib
+
+
+def _lazy(module_name, class_name):
+  """Returns an overlay constructor that imports its module when called."""
+
+  def load(ctx):
+    module = importlib.import_module(f"pytype.overlays.{module_name}")
+    return getattr(module, class_name)(ctx)
+
+  return load
+
 
 # Collection of module overlays, used by the vm to fetch an overlay
 # instead of the module itself. Memoized in the vm itself.
 overlays = {
-    "abc": abc_overlay.ABCOverlay,
-    "asyncio": asyncio_types_overlay.AsyncioOverlay,
-    "attr": attr_overlay.AttrOverlay,
-    "attrs": attr_overlay.AttrsOverlay,
-    "chex": chex_overlay.ChexOverlay,
-    "collections": collections_overlay.CollectionsOverlay,
-    "collections.abc": collections_overlay.ABCOverlay,
-    "dataclasses": dataclass_overlay.DataclassOverlay,
-    "enum": enum_overlay.EnumOverlay,
-    "fiddle": fiddle_overlay.FiddleOverlay,
-    "flax.struct": flax_overlay.DataclassOverlay,
-    "flax.linen": flax_overlay.LinenOverlay,
-    "flax.linen.module": flax_overlay.LinenModuleOverlay,
-    "functools": functools_overlay.FunctoolsOverlay,
-    "future.utils": future_overlay.FutureUtilsOverlay,
-    "pytype_extensions": pytype_extensions_overlay.PytypeExtensionsOverlay,
-    "six": six_overlay.SixOverlay,
-    "subprocess": subprocess_overlay.SubprocessOverlay,
-    "sys": sys_overlay.SysOverlay,
-    "types": asyncio_types_overlay.TypesOverlay,
-    "typing": typing_overlay.TypingOverlay,
-    "typing_extensions": typing_extensions_overlay.TypingExtensionsOverlay,
+    "abc": _lazy("abc_overlay", "ABCOverlay"),
+    "asyncio": _lazy("asyncio_types_overlay", "AsyncioOverlay"),
+    "attr": _lazy("attr_overlay", "AttrOverlay"),
+    "attrs": _lazy("attr_overlay", "AttrsOverlay"),
+    "chex": _lazy("chex_overlay", "ChexOverlay"),
+    "collections": _lazy("collections_overlay", "CollectionsOverlay"),
+    "collections.abc": _lazy("collections_overlay", "ABCOverlay"),
+    "dataclasses": _lazy("dataclass_overlay", "DataclassOverlay"),
+    "enum": _lazy("enum_overlay", "EnumOverlay"),
+    "fiddle": _lazy("fiddle_overlay", "FiddleOverlay"),
+    "flax.struct": _lazy("flax_overlay", "DataclassOverlay"),
+    "flax.linen": _lazy("flax_overlay", "LinenOverlay"),
+    "flax.linen.module": _lazy("flax_overlay", "LinenModuleOverlay"),
+    "functools": _lazy("functools_overlay", "FunctoolsOverlay"),
+    "future.utils": _lazy("future_overlay", "FutureUtilsOverlay"),
+    "pytype_extensions": _lazy(
+        "pytype_extensions_overlay", "PytypeExtensionsOverlay"
+    ),
+    "six": _lazy("six_overlay", "SixOverlay"),
+    "subprocess": _lazy("subprocess_overlay", "SubprocessOverlay"),
+    "sys": _lazy("sys_overlay", "SysOverlay"),
+    "types": _lazy("asyncio_types_overlay", "TypesOverlay"),
+    "typing": _lazy("typing_overlay", "TypingOverlay"),
+    "typing_extensions": _lazy(
+        "typing_extensions_overlay", "TypingExtensionsOverlay"
+    ),
 }
@@ -0,0 +1,143 @@
+"""Parse many pyi files in parallel.
+
+parser.parse_pyi() handles one file at a time, which is slow when validating or
+precompiling a large directory of stubs such as typeshed. parse_files() fans
+the files out over a process pool and yields the results as they finish.
+"""
+
+from collections.abc import Iterable, Iterator
+import concurrent.futures
+import dataclasses
+import os
+import time
+
+from pytype import module_utils
+from pytype.imports import pickle_utils
+from pytype.platform_utils import path_utils
+from pytype.pyi import parser
+from pytype.pytd import pytd
+
+_STUB_EXTENSIONS = (".pyi", ".pytd")
+
+
+@dataclasses.dataclass(frozen=True)
+class ParseResult:
+  """The result of parsing one file.
+
+  Attributes:
+    filename: The parsed file.
+    module_name: The module name that the file was parsed as.
+    ast: The post-processed AST, or None if the file could not be parsed or
+      was serialized.
+    serialized: The serialized AST, if serialization was requested.
+    error: The error message if the file could not be parsed, else None.
+    parse_time: The time in seconds spent parsing and serializing the file.
+  """
+
+  filename: str
+  module_name: str
+  ast: pytd.TypeDeclUnit | None = None
+  serialized: bytes | None = None
+  error: str | None = None
+  parse_time: float = 0.0
+
+
+def find_stubs(directory: str) -> list[tuple[str, str]]:
+  """Finds the stubs in a directory.
+
+  Args:
+    directory: The directory to search recursively.
+
+  Returns:
+    A sorted list of (filename, module name) pairs. Module names are relative
+    to the directory.
+  """
+  stubs = []
+  for root, dirs, files in os.walk(directory):
+    dirs.sort()
+    for f in sorted(files):
+      if path_utils.splitext(f)[1] not in _STUB_EXTENSIONS:
+        continue
+      filename = path_utils.join(root, f)
+      relpath = path_utils.relpath(filename, directory)
+      module_name = module_utils.path_to_module_name(
+          path_utils.splitext(relpath)[0])
+      stubs.append((filename, module_name))
+  return stubs
+
+
+def _parse_file(
+    filename: str,
+    module_name: str,
+    options: parser.PyiOptions,
+    serialize: bool,
+) -> ParseResult:
+  """Parses and post-processes one file. Runs in a worker process."""
+  start = time.perf_counter()
+  try:
+    with open(filename) as f:
+      src = f.read()
+    ast = parser.parse_pyi(src, filename, module_name, options)
+    if serialize:
+      serialized = pickle_utils.Serialize(ast, src_path=filename)
+      return ParseResult(filename, module_name, serialized=serialized,
+                         parse_time=time.perf_counter() - start)
+  except (OSError, parser.ParseError) as e:
+    return ParseResult(filename, module_name, error=str(e),
+                       parse_time=time.perf_counter() - start)
+  except Exception as e:  # pylint: disable=broad-except
+    # A crash in post-processing or serialization only fails this file.
+    return ParseResult(filename, module_name, error=_format_error(e),
+                       parse_time=time.perf_counter() - start)
+  return ParseResult(filename, module_name, ast=ast,
+                     parse_time=time.perf_counter() - start)
+
+
+def _format_error(e: Exception) -> str:
+  return f"{type(e).__name__}: {e}"
+
+
+def parse_files(
+    files: Iterable[tuple[str, str]],
+    options: parser.PyiOptions | None = None,
+    *,
+    serialize: bool = False,
+    max_workers: int | None = None,
+) -> Iterator[ParseResult]:
+  """Parses many files in parallel.
+
+  Args:
+    files: (filename, module name) pairs, e.g. from find_stubs().
+    options: The pyi parsing options.
+    serialize: Whether to return serialized ASTs, as pickle_utils.Serialize()
+      produces them, instead of pytd.TypeDeclUnit objects. This avoids sending
+      the ASTs back from the worker processes.
+    max_workers: The number of worker processes. None means the number of
+      CPUs, and 1 parses the files in this process.
+
+  Yields:
+    A ParseResult for every file, in the order in which they finish.
+  """
+  options = options or parser.PyiOptions()
+  files = list(files)
+  if max_workers is None:
+    max_workers = os.cpu_count() or 1
+  max_workers = min(max_workers, len(files))
+  if max_workers <= 1:
+    for filename, module_name in files:
+      yield _parse_file(filename, module_name, options, serialize)
+    return
+  with concurrent.futures.ProcessPoolExecutor(max_workers) as executor:
+    futures = {
+        executor.submit(
+            _parse_file, filename, module_name, options, serialize
+        ): (filename, module_name)
+        for filename, module_name in files
+    }
+    for future in concurrent.futures.as_completed(futures):
+      try:
+        result = future.result()
+      except Exception as e:  # pylint: disable=broad-except
+        # E.g. the result could not be sent back from the worker.
+        result = ParseResult(*futures[future], error=_format_error(e))
+      yield result
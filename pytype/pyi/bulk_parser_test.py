@@ -0,0 +1,85 @@
+"""Tests for bulk_parser.py."""
+
+from unittest import mock
+
+from pytype.imports import pickle_utils
+from pytype.platform_utils import path_utils
+from pytype.pyi import bulk_parser
+from pytype.pyi import parser
+from pytype.pytd import pytd_utils
+from pytype.tests import test_utils
+
+import unittest
+
+
+class BulkParserTest(unittest.TestCase):
+  """Tests for find_stubs and parse_files."""
+
+  def _create_stubs(self, d):
+    d.create_file("foo.pyi", "def f(x: int) -> str: ...")
+    d.create_file("pkg/__init__.pyi", "x: int")
+    d.create_file("pkg/bar.pytd", "class A: ...")
+    d.create_file("pkg/bad.pyi", "def f(x): str")
+    d.create_file("pkg/README", "not a stub")
+
+  def test_find_stubs(self):
+    with test_utils.Tempdir() as d:
+      self._create_stubs(d)
+      self.assertEqual(bulk_parser.find_stubs(d.path), [
+          (path_utils.join(d.path, "foo.pyi"), "foo"),
+          (path_utils.join(d.path, "pkg", "__init__.pyi"), "pkg"),
+          (path_utils.join(d.path, "pkg", "bad.pyi"), "pkg.bad"),
+          (path_utils.join(d.path, "pkg", "bar.pytd"), "pkg.bar"),
+      ])
+
+  def _parse(self, d, **kwargs):
+    results = bulk_parser.parse_files(bulk_parser.find_stubs(d.path), **kwargs)
+    return {result.module_name: result for result in results}
+
+  def test_parse_files(self):
+    for max_workers in (1, 2):
+      with self.subTest(max_workers=max_workers):
+        with test_utils.Tempdir() as d:
+          self._create_stubs(d)
+          results = self._parse(d, max_workers=max_workers)
+        self.assertCountEqual(results, ["foo", "pkg", "pkg.bad", "pkg.bar"])
+        self.assertEqual(
+            pytd_utils.Print(results["foo"].ast),
+            "def foo.f(x: int) -> str: ...")
+        self.assertEqual(results["pkg"].ast.name, "pkg")
+        self.assertIsNone(results["pkg"].error)
+        self.assertIsNone(results["pkg.bad"].ast)
+        self.assertIn("ParseError", results["pkg.bad"].error)
+        for result in results.values():
+          self.assertGreaterEqual(result.parse_time, 0)
+
+  def test_crash(self):
+    parse_pyi = parser.parse_pyi
+
+    def crash_on_foo(src, filename, module_name, options):
+      if module_name == "foo":
+        raise AssertionError("visitor failed")
+      return parse_pyi(src, filename, module_name, options)
+
+    with test_utils.Tempdir() as d:
+      self._create_stubs(d)
+      with mock.patch.object(parser, "parse_pyi", crash_on_foo):
+        results = self._parse(d, max_workers=1)
+    self.assertCountEqual(results, ["foo", "pkg", "pkg.bad", "pkg.bar"])
+    self.assertIsNone(results["foo"].ast)
+    self.assertEqual(results["foo"].error, "AssertionError: visitor failed")
+    self.assertEqual(results["pkg"].ast.name, "pkg")
+    self.assertIn("ParseError", results["pkg.bad"].error)
+
+  def test_serialize(self):
+    with test_utils.Tempdir() as d:
+      self._create_stubs(d)
+      results = self._parse(d, serialize=True, max_workers=2)
+    foo = results["foo"]
+    self.assertIsNone(foo.ast)
+    self.assertEqual(pickle_utils.DecodeAst(foo.serialized).ast.name, "foo")
+    self.assertIsNone(results["pkg.bad"].serialized)
+
+
+if __name__ == "__main__":
+  unittest.main()
@@ -100,6 +100,9 @@ class ConditionEvaluator(ast_visitor.BaseVisitor):
   def visit_Index(self, node):
     return node.value
 
+  def visit_Constant(self, node):
+    return node.value
+
   def visit_Pyval(self, node):
     return node.value
 
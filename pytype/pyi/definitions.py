@@ -952,7 +952,9 @@ class Definitions:
 
 def finalize_ast(ast: pytd.TypeDeclUnit):
   ast = ast.Visit(_PropertyToConstant())
-  ast = ast.Visit(_InsertTypeParameters(ast.type_params))
+  if ast.type_params:
+    # Without type parameters, there is nothing to insert.
+    ast = ast.Visit(_InsertTypeParameters(ast.type_params))
   ast = ast.Visit(_VerifyMutators())
   return ast
 
@@ -118,29 +118,21 @@ def _read_str_list(name, value):
   return tuple(x.value for x in value)
 
 
-class _ConvertConstantsVisitor(visitor.BaseVisitor):
-  """Converts ast module constants to our own representation."""
+# Constants are converted to our own representation while the tree is
+# converted to pytd, rather than in a separate pass over the whole tree.
 
-  def __init__(self, filename):
-    super().__init__(filename=filename, visit_decorators=True)
 
-  def visit_Constant(self, node):
-    if node.value is Ellipsis:
-      return definitions.Definitions.ELLIPSIS
-    return types.Pyval.from_const(node)
+def _convert_constant(node: astlib.Constant):
+  if node.value is Ellipsis:
+    return definitions.Definitions.ELLIPSIS
+  return types.Pyval.from_const(node)
 
-  def visit_UnaryOp(self, node):
-    if isinstance(node.op, astlib.USub):
-      if isinstance(node.operand, types.Pyval):
-        return node.operand.negated()
-    raise ParseError(f"Unexpected unary operator: {node.op}")
 
-  def visit_Assign(self, node):
-    if node.type_comment:
-      # Convert the type comment from a raw string to a string constant.
-      node.type_comment = types.Pyval(
-          "str", node.type_comment, *types.node_position(node)
-      )
+def _convert_unary_op(node: astlib.UnaryOp):
+  if isinstance(node.op, astlib.USub):
+    if isinstance(node.operand, types.Pyval):
+      return node.operand.negated()
+  raise ParseError(f"Unexpected unary operator: {node.op}")
 
 
 class _AnnotationVisitor(visitor.BaseVisitor):
@@ -150,6 +142,7 @@ class _AnnotationVisitor(visitor.BaseVisitor):
     super().__init__(filename=filename)
     self.defs = defs
     self.subscripted = []  # Keep track of the name being subscripted.
+    self.unary_op_depth = 0
 
   def show(self, node):
     print(debug.dump(node, astlib, include_attributes=False))
@@ -162,7 +155,7 @@ class _AnnotationVisitor(visitor.BaseVisitor):
       a = astlib.parse(annotation)
       # Unwrap the module the parser puts around the source string
       typ = cast(list[astlib.Expr], a.body)[0].value
-      return self.visit(_ConvertConstantsVisitor(self.filename).visit(typ))
+      return self.visit(typ)
     except ParseError as e:
       # Clear out position information since it is relative to the typecomment
       e.clear_position()
@@ -176,6 +169,25 @@ class _AnnotationVisitor(visitor.BaseVisitor):
       return self.defs.matches_type(last.id, "typing.Literal")
     return False
 
+  def visit_Constant(self, node):
+    const = _convert_constant(node)
+    if self.unary_op_depth or not isinstance(const, types.Pyval):
+      # A negative number is handled as a whole by visit_UnaryOp.
+      return const
+    return self.visit_Pyval(const)
+
+  def enter_UnaryOp(self, node):
+    self.unary_op_depth += 1
+
+  def visit_UnaryOp(self, node):
+    const = _convert_unary_op(node)
+    if self.unary_op_depth > 1:
+      return const
+    return self.visit_Pyval(const)
+
+  def leave_UnaryOp(self, node):
+    self.unary_op_depth -= 1
+
   def visit_Pyval(self, node):
     # Handle a types.Pyval node (converted from a literal constant).
     if node.type == "NoneType":
@@ -330,6 +342,11 @@ class _GeneratePytdVisitor(visitor.BaseVisitor):
       astlib.Del,
       # Appears as an operator in `__all__ += ...`.
       astlib.Add,
+      # Unary operators are checked by visit_UnaryOp.
+      astlib.Invert,
+      astlib.Not,
+      astlib.UAdd,
+      astlib.USub,
       # These nodes are passed through unchanged and processed by their parents.
       astlib.arg,
       astlib.arguments,
@@ -371,6 +388,12 @@ class _GeneratePytdVisitor(visitor.BaseVisitor):
   def visit_Pass(self, node):
     return self.defs.ELLIPSIS
 
+  def visit_Constant(self, node):
+    return _convert_constant(node)
+
+  def visit_UnaryOp(self, node):
+    return _convert_unary_op(node)
+
   def visit_Expr(self, node):
     # Handle some special cases of expressions that can occur in class and
     # module bodies.
@@ -668,7 +691,11 @@ class _GeneratePytdVisitor(visitor.BaseVisitor):
 
   def enter_Assign(self, node):
     if node.type_comment:
-      node.type_comment = self.annotation_visitor.visit(node.type_comment)
+      # Convert the type comment from a raw string to a string constant.
+      type_comment = types.Pyval(
+          "str", node.type_comment, *types.node_position(node)
+      )
+      node.type_comment = self.annotation_visitor.visit(type_comment)
     self._convert_value(node)
 
   def enter_AnnAssign(self, node):
@@ -911,7 +938,6 @@ def parse_pyi(
   root = _parse(src, feature_version, filename)
   if debug_mode:
     print(debug.dump(root, astlib, include_attributes=False))
-  root = _ConvertConstantsVisitor(filename).visit(root)
   gen_pytd = _GeneratePytdVisitor(src, filename, module_name, options)
   root = gen_pytd.visit(root)
   if debug_mode:
@@ -1195,6 +1195,14 @@ class FunctionTest(parser_test_base.ParserTestBase):
     """,
     )
 
+  def test_negative_default(self):
+    self.check(
+        "def f(x: int = -1) -> None: ...", "def f(x: int = ...) -> None: ..."
+    )
+    self.check_error(
+        "def f(x: bool = not True) -> None: ...", 1, "Unexpected unary operator"
+    )
+
   def test_star_params(self):
     self.check("def foo(*, x) -> str: ...")
     self.check("def foo(x: int, *args) -> str: ...")
@@ -3021,6 +3029,14 @@ class LiteralTest(parser_test_base.ParserTestBase):
       x: Literal[42]
     """)
 
+  def test_negative_int(self):
+    self.check("""
+      from typing import Literal
+
+      x: Literal[-42]
+    """)
+    self.check_error("x: -42", 1, "Unexpected literal: -42")
+
   def test_string(self):
     self.check("""
       from typing import Literal
@@ -7,16 +7,24 @@ This binary processes pytd files, typically to optimize them.
 
 Usage:
   pytd_tool [flags] <inputfile> <outputfile>
+  pytd_tool [flags] <inputdir> [<outputdir>]
+
+A directory of stubs is parsed in parallel, which is useful for validating or
+precompiling many stubs at once.
 """
 
 import argparse
 import sys
 
+from pytype import file_utils
 from pytype import utils
 from pytype.imports import builtin_stubs
+from pytype.platform_utils import path_utils
+from pytype.pyi import bulk_parser
 from pytype.pyi import parser
 from pytype.pytd import optimize
 from pytype.pytd import pytd_utils
+from pytype.pytd import visitors
 
 
 def make_parser():
@@ -27,13 +35,14 @@ def make_parser():
   )
 
   # Input and output filenames
-  o.add_argument("input", help="File to process")
+  o.add_argument("input", help="File or directory to process")
   o.add_argument(
       "output",
       nargs="?",
       help=(
-          "Output file (or - for stdout). If output is omitted, "
-          "the input file will be checked for errors."
+          "Output file (or - for stdout), or output directory for a "
+          "directory input. If output is omitted, the input will be checked "
+          "for errors."
       ),
   )
 
@@ -90,9 +99,84 @@ def make_parser():
       default=False,
       help="Print function arguments one to a line.",
   )
+  o.add_argument(
+      "-j",
+      "--jobs",
+      type=int,
+      action="store",
+      dest="jobs",
+      default=None,
+      help=(
+          "Number of processes for parsing a directory. Defaults to the "
+          "number of CPUs."
+      ),
+  )
+  o.add_argument(
+      "--pickle",
+      action="store_true",
+      dest="pickle",
+      default=False,
+      help=(
+          "Write pickled ASTs instead of pyi files to the output directory."
+      ),
+  )
+  o.add_argument(
+      "--slowest",
+      type=int,
+      action="store",
+      dest="slowest",
+      default=10,
+      help="Number of the slowest files to report for a directory.",
+  )
   return o
 
 
+def _process_directory(opts, options):
+  """Parses all stubs in the input directory.
+
+  Args:
+    opts: The command-line options.
+    options: The pyi parsing options.
+
+  Returns:
+    The number of files that could not be parsed.
+  """
+  stubs = bulk_parser.find_stubs(opts.input)
+  results = []
+  for result in bulk_parser.parse_files(
+      stubs, options, serialize=opts.pickle, max_workers=opts.jobs
+  ):
+    results.append(result)
+    if result.error:
+      sys.stderr.write(f"{result.error}\n")
+      continue
+    if opts.output is None:
+      continue
+    relpath = path_utils.relpath(result.filename, opts.input)
+    if opts.pickle:
+      output = path_utils.join(opts.output, relpath + ".pickled")
+    else:
+      output = path_utils.join(opts.output, relpath)
+    file_utils.makedirs(path_utils.dirname(output))
+    if opts.pickle:
+      with open(output, "wb") as out:
+        out.write(result.serialized)
+    else:
+      with open(output, "w") as out:
+        ast = result.ast.Visit(visitors.RemoveNamePrefix())
+        out.write(pytd_utils.Print(ast, opts.multiline_args))
+  errors = sum(1 for result in results if result.error)
+  total_time = sum(result.parse_time for result in results)
+  print(
+      f"Parsed {len(results)} files ({errors} errors) in "
+      f"{total_time:.2f}s of parse time"
+  )
+  results.sort(key=lambda result: result.parse_time, reverse=True)
+  for result in results[: opts.slowest]:
+    print(f"  {result.parse_time:.3f}s  {result.filename}")
+  return errors
+
+
 def main():
   argument_parser = make_parser()
   opts = argument_parser.parse_args()
@@ -108,6 +192,16 @@ def main():
 
   options = parser.PyiOptions(python_version=python_version)
 
+  if path_utils.isdir(opts.input):
+    if opts.optimize or opts.output == "-":
+      sys.stderr.write(
+          "Usage error: --optimize and - are not supported for directories\n"
+      )
+      sys.exit(1)
+    if _process_directory(opts, options):
+      sys.exit(1)
+    return
+
   with open(opts.input) as fi:
     sourcecode = fi.read()
     try:
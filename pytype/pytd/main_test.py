@@ -86,6 +86,26 @@ class TestPytdTool(unittest.TestCase):
       with open(outpath) as f:
         self.assertMultiLineEqual(f.read(), src)
 
+  def test_directory(self):
+    with test_utils.Tempdir() as d:
+      d.create_file("in/foo.pyi", "def f(x) -> str: ...")
+      d.create_file("in/pkg/__init__.pyi", "x: int")
+      outdir = path_utils.join(d.path, "out")
+      sys.argv = ["main.py", "-j", "1", path_utils.join(d.path, "in"), outdir]
+      pytd_tool.main()
+      with open(path_utils.join(outdir, "foo.pyi")) as f:
+        self.assertEqual(f.read(), "def f(x) -> str: ...")
+      with open(path_utils.join(outdir, "pkg", "__init__.pyi")) as f:
+        self.assertEqual(f.read(), "x: int")
+
+  def test_directory_parse_error(self):
+    with test_utils.Tempdir() as d:
+      d.create_file("in/foo.pyi", "def f(x) -> str: ...")
+      d.create_file("in/bar.pyi", "def f(x): str")
+      sys.argv = ["main.py", "-j", "1", path_utils.join(d.path, "in")]
+      with self.assertRaises(SystemExit):
+        pytd_tool.main()
+
 
 if __name__ == "__main__":
   unittest.main()
@@ -3,6 +3,8 @@
 import collections
 import logging
 import re
+import shutil
+import tempfile
 
 from pytype import utils
 from pytype.pytd import base_visitor
@@ -13,6 +15,10 @@ from pytype.pytd.parse import parser_constants
 # Aliases for readability:
 _NameType = _AliasType = str
 
+# How much of each section PrintVisitor.Write() keeps in memory before it moves
+# the section to a file on disk, in characters.
+_SPOOL_MAX_SIZE = 1 << 20
+
 
 class _TypingImports:
   """Imports from the `typing` module."""
@@ -123,6 +129,44 @@ class _Imports:
     return sorted(imports, key=lambda s: (s.startswith("from "), s))
 
 
+class _SpooledSection:
+  """A section of a pyi, such as the classes, kept in a temporary file.
+
+  Lines are added one at a time, and the file ends up containing the same text
+  as "\n".join(lines).rstrip(): trailing whitespace is held back until more
+  text follows it.
+  """
+
+  def __init__(self):
+    self._file = tempfile.SpooledTemporaryFile(
+        max_size=_SPOOL_MAX_SIZE, mode="w+", encoding="utf-8"
+    )
+    self._pending_whitespace = ""
+    self._empty = True
+
+  def __bool__(self):
+    return not self._empty
+
+  def add(self, line: str):
+    if not self._empty:
+      self._pending_whitespace += "\n"
+    self._empty = False
+    stripped = line.rstrip()
+    if stripped:
+      self._file.write(self._pending_whitespace)
+      self._file.write(stripped)
+      self._pending_whitespace = line[len(stripped):]
+    else:
+      self._pending_whitespace += line
+
+  def copy_to(self, out):
+    self._file.seek(0)
+    shutil.copyfileobj(self._file, out)
+
+  def close(self):
+    self._file.close()
+
+
 class PrintVisitor(base_visitor.Visitor):
   """Visitor for converting ASTs back to pytd source code."""
 
@@ -302,15 +346,18 @@ class PrintVisitor(base_visitor.Visitor):
     self._unit = None
     self._local_names = set()
 
-  def VisitTypeDeclUnit(self, node):
-    """Convert the AST for an entire module back to a string."""
-    for t in self.old_node.type_params:
+  def _AddTypeParamImports(self, type_params):
+    for t in type_params:
       if isinstance(t, pytd.ParamSpec):
         self._FromTyping("ParamSpec")
       elif t.full_name == "typing.Self":
         self._imports.add("typing.Self", "Self")
       else:
         self._FromTyping("TypeVar")
+
+  def VisitTypeDeclUnit(self, node):
+    """Convert the AST for an entire module back to a string."""
+    self._AddTypeParamImports(self.old_node.type_params)
     imports = self._imports.to_import_statements()
 
     # Remove deleted nodes
@@ -335,6 +382,57 @@ class PrintVisitor(base_visitor.Visitor):
     )
     return "\n\n".join(sections_as_string)
 
+  def _SpoolDefinitions(self, nodes, section):
+    for node in nodes:
+      text = node.Visit(self)
+      if text is not None:
+        section.add(text)
+
+  def Write(self, unit, out):
+    """Write the pyi for a module to a file object.
+
+    Produces the same text as unit.Visit(self), but prints the definitions one
+    at a time instead of joining the whole module in memory. The imports come
+    first in a pyi but are only known once everything else has been printed,
+    so the other sections are spooled to temporary files until then.
+
+    Args:
+      unit: A pytd.TypeDeclUnit.
+      out: A writable text file object.
+    """
+    sections = {
+        name: _SpooledSection()
+        for name in ("imports", "aliases", "constants", "type_params",
+                     "classes", "functions")
+    }
+    self.EnterTypeDeclUnit(unit)
+    try:
+      # Visit the children in the same order as unit.Visit(self) does, since
+      # printing a definition can add imports and aliases.
+      self._SpoolDefinitions(unit.constants, sections["constants"])
+      # The type parameters are formatted below, but their bounds and
+      # constraints may need imports.
+      for t in unit.type_params:
+        t.Visit(self)
+      self._SpoolDefinitions(unit.classes, sections["classes"])
+      self._SpoolDefinitions(unit.functions, sections["functions"])
+      self._SpoolDefinitions(unit.aliases, sections["aliases"])
+      self._AddTypeParamImports(unit.type_params)
+      for line in self._imports.to_import_statements():
+        sections["imports"].add(line)
+      for line in self._FormatTypeParams(unit.type_params):
+        sections["type_params"].add(line)
+      separator = ""
+      for section in sections.values():
+        if section:
+          out.write(separator)
+          section.copy_to(out)
+          separator = "\n\n"
+    finally:
+      for section in sections.values():
+        section.close()
+      self.LeaveTypeDeclUnit(unit)
+
   def EnterConstant(self, node):
     self.in_constant = True
 
@@ -52,6 +52,10 @@ class TypeDeclUnit(Node, eq=False):
   # _name2item is the lookup cache. It should not be treated as a child or used
   # in equality or hash operations.
   _name2item: dict[str, Any] = {}
+  # _member_index caches the LookupItemRecursive() results for names that are
+  # found by walking the (nested) members of this module. Like _name2item, it is
+  # not a child.
+  _member_index: dict[str, Any] = {}
 
   def _InitCache(self):
     # TODO(b/159053187): Put constants, functions, classes and aliases into a
@@ -91,13 +95,15 @@ class TypeDeclUnit(Node, eq=False):
 
   def IterChildren(self) -> Generator[tuple[str, Any | None], None, None]:
     for name, child in super().IterChildren():
-      if name == '_name2item':
+      if name in ('_name2item', '_member_index'):
         continue
       yield name, child
 
   def Replace(self, **kwargs):
     if '_name2item' not in kwargs:
       kwargs['_name2item'] = {}
+    if '_member_index' not in kwargs:
+      kwargs['_member_index'] = {}
     return super().Replace(**kwargs)
 
   # The hash/eq/ne values are used for caching and speed things up quite a bit.
@@ -833,16 +839,26 @@ def LookupItemRecursive(module: TypeDeclUnit, name: str) -> Node:
         return found
     return None
 
+  # pylint: disable=protected-access
+  cached = module._member_index.get(name)
+  if cached is not None:
+    return cached
+
   parts = name.split('.')
   partial_name = module.name
   prev_item = None
   item = module
+  # Whether name was found through members alone. Lookups through the type of a
+  # constant or through base classes may depend on ClassType pointers, which
+  # are filled in and cleared in place, so their results are not cached.
+  cacheable = True
 
   for part in parts:
     next_prev_item = item
     # Check the type of item and give up if we encounter a type we don't know
     # how to handle.
     if isinstance(item, Constant):
+      cacheable = False
       found = ExtractClass(item.type, prev_item)
       if not found:
         raise KeyError(item.type.name)
@@ -871,6 +887,7 @@ def LookupItemRecursive(module: TypeDeclUnit, name: str) -> Node:
     else:
       if not isinstance(item, Class):
         raise KeyError(item)
+      cacheable = False
       for base in item.bases:
         base_cls = ExtractClass(base, prev_item)
         if base_cls is None:
@@ -887,6 +904,7 @@ def LookupItemRecursive(module: TypeDeclUnit, name: str) -> Node:
       partial_name = lookup_name
     prev_item = next_prev_item
   if isinstance(item, Function):
-    return AliasMethod(item, from_constant=isinstance(prev_item, Constant))
-  else:
-    return item
+    item = AliasMethod(item, from_constant=isinstance(prev_item, Constant))
+  if cacheable:
+    module._member_index[name] = item
+  return item
@@ -12,6 +12,7 @@ locally or within a larger repository.
 
 import collections
 import itertools
+import operator
 import re
 
 from pytype import utils
@@ -68,7 +69,7 @@ def Concat(*args, **kwargs):
   )
 
 
-def JoinTypes(types):
+def JoinTypes(types, cache=None):
   """Combine a list of types into a union type, if needed.
 
   Leaves singular return values alone, or wraps a UnionType around them if there
@@ -78,6 +79,10 @@ def JoinTypes(types):
   Arguments:
     types: A list of types. This list might contain other UnionTypes. If so,
       they are flattened.
+    cache: Optionally, a dictionary in which joins of several types are stored,
+      so that joining the same types again returns the same union. The caller
+      owns the dictionary and decides how long it lives, e.g. the Converter
+      keeps one for the duration of a single conversion.
 
   Returns:
     A type that represents the union of the types passed in. Order is preserved.
@@ -97,16 +102,28 @@ def JoinTypes(types):
 
   if len(new_types) == 1:
     return new_types.pop()
-  elif any(isinstance(t, pytd.AnythingType) for t in new_types):
+  elif not new_types:
+    return pytd.NothingType()
+  # The key keeps the order of the members, since it is preserved in the union.
+  key = tuple(new_types)  # tuple() to make unions hashable
+  if cache is not None:
+    cached = cache.get(key)
+    # Equality ignores the cls pointer of a ClassType, so only reuse a union of
+    # the very same members.
+    if cached is not None and all(map(operator.is_, cached[0], key)):
+      return cached[1]
+  if any(isinstance(t, pytd.AnythingType) for t in new_types):
     nonetype = pytd.NamedType("builtins.NoneType")
     unresolved_nonetype = pytd.NamedType("NoneType")
     if any(t in (nonetype, unresolved_nonetype) for t in new_types):
-      return pytd.UnionType((pytd.AnythingType(), nonetype))
-    return pytd.AnythingType()
-  elif new_types:
-    return pytd.UnionType(tuple(new_types))  # tuple() to make unions hashable
+      joined = pytd.UnionType((pytd.AnythingType(), nonetype))
+    else:
+      joined = pytd.AnythingType()
   else:
-    return pytd.NothingType()
+    joined = pytd.UnionType(key)
+  if cache is not None:
+    cache[key] = (key, joined)
+  return joined
 
 
 def disabled_function(*unused_args, **unused_kwargs):
@@ -178,6 +195,11 @@ def Print(ast, multiline_args=False):
   return ast.Visit(printer.PrintVisitor(multiline_args))
 
 
+def Write(ast, out, multiline_args=False):
+  """Like Print(), but writes the pyi to a file object."""
+  printer.PrintVisitor(multiline_args).Write(ast, out)
+
+
 def MakeTypeAnnotation(ast, multiline_args=False):
   """Returns a type annotation and any added typing imports."""
   vis = printer.PrintVisitor(multiline_args)
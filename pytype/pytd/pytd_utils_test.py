@@ -1,6 +1,9 @@
+import io
 import textwrap
+from unittest import mock
 
 from pytype.pyi import parser
+from pytype.pytd import printer
 from pytype.pytd import pytd
 from pytype.pytd import pytd_utils
 from pytype.pytd import visitors
@@ -125,6 +128,27 @@ class TestUtils(parser_test_base.ParserTest):
         pytd_utils.JoinTypes(types), pytd.UnionType((any_type, none_type))
     )
 
+  def test_join_with_cache(self):
+    """Test that JoinTypes() reuses the unions stored in its cache."""
+    a, b = pytd.NamedType("a"), pytd.NamedType("b")
+    cache = {}
+    joined = pytd_utils.JoinTypes([a, b], cache)
+    self.assertIs(pytd_utils.JoinTypes([a, b], cache), joined)
+    self.assertIs(pytd_utils.JoinTypes([joined, b], cache), joined)
+    self.assertEqual(pytd_utils.JoinTypes([b, a], cache).type_list, (b, a))
+    self.assertIsNot(pytd_utils.JoinTypes([a, b]), joined)
+
+  def test_join_with_cache_keeps_class_types(self):
+    """Test that JoinTypes() doesn't reuse unions of equal ClassTypes."""
+    cls = pytd.Class("A", (), (), (), (), (), (), None, ())
+    resolved = pytd.ClassType("A", cls)
+    unresolved = pytd.ClassType("A")
+    b = pytd.NamedType("b")
+    cache = {}
+    pytd_utils.JoinTypes([unresolved, b], cache)
+    joined = pytd_utils.JoinTypes([resolved, b], cache)
+    self.assertIs(joined.type_list[0].cls, cls)
+
   def test_type_matcher(self):
     """Test for the TypeMatcher class."""
 
@@ -415,5 +439,49 @@ class PrintTest(parser_test_base.ParserTest):
     )
 
 
+class WriteTest(parser_test_base.ParserTest):
+  """Test pytd_utils.Write."""
+
+  _SRC = """
+    import collections
+    from typing import Callable, ParamSpec, TypeVar, Union
+    import foo.bar as baz
+    OrderedDict = collections.OrderedDict
+    c1: int
+    c2: baz.Qux
+    T = TypeVar('T', bound=collections.abc.Sized)
+    P = ParamSpec('P')
+    class A(typing.Generic[T]):
+      bar: T
+      def foo(self, x: list[int], y: T) -> Union[list[T], float]: ...
+    class B: ...
+    def f(x: Callable[P, T]) -> Callable[P, T]: ...
+    def g(x: int) -> None: ...
+  """
+
+  def _write(self, ast, multiline_args=False):
+    out = io.StringIO()
+    pytd_utils.Write(ast, out, multiline_args)
+    return out.getvalue()
+
+  def test_same_as_print(self):
+    ast = self.Parse(self._SRC)
+    for multiline_args in (False, True):
+      with self.subTest(multiline_args=multiline_args):
+        self.assertMultiLineEqual(
+            self._write(ast, multiline_args),
+            pytd_utils.Print(ast, multiline_args),
+        )
+
+  def test_empty(self):
+    ast = pytd_utils.CreateModule("foo")
+    self.assertEqual(self._write(ast), pytd_utils.Print(ast))
+
+  def test_spool_to_disk(self):
+    ast = self.Parse(self._SRC)
+    with mock.patch.object(printer, "_SPOOL_MAX_SIZE", 1):
+      self.assertMultiLineEqual(self._write(ast), pytd_utils.Print(ast))
+
+
 if __name__ == "__main__":
   unittest.main()
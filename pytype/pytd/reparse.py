@@ -0,0 +1,574 @@
+"""Convert an AST to what the pyi parser would build from its printed pyi.
+
+Exporting an inferred AST used to mean printing it to a pyi and parsing the
+pyi again, because printing and parsing both rewrite the AST: printing elides
+`self` annotations, turns `*args: tuple[int, ...]` into `*args: int` and
+replaces names with the imports that it adds, and parsing makes `__new__` a
+staticmethod, reorders the imports and adds `object` as the default base class.
+
+Reparse() applies the same rewrites directly to the AST. Its result is the
+TypeDeclUnit that the parser builds before post-processing, i.e., it can be
+passed to pytype.pyi.parser.post_process_ast(). Constructs whose printed form
+isn't reproduced here raise UnsupportedError; callers should fall back to
+printing and parsing the AST.
+"""
+
+import ast as astlib
+import copy
+
+from pytype.pytd import pep484
+from pytype.pytd import pytd
+from pytype.pytd import visitors
+
+
+class UnsupportedError(Exception):
+  """Raised when the AST contains a construct that Reparse() can't convert."""
+
+
+# Prefix that the parser gives to names imported with `from m import x`.
+_EXTERNAL = "$external$"
+
+# Bases of classes that the parser generates code for.
+_GENERATED_BASES = frozenset({"typing.NamedTuple", "typing.TypedDict"})
+
+
+def _GuessModule(maybe_module):
+  """Guess which part of the given name is the module prefix.
+
+  Keep in sync with printer.PrintVisitor._GuessModule.
+
+  Args:
+    maybe_module: A dotted name.
+
+  Returns:
+    A (module, rest) tuple.
+  """
+  if "." not in maybe_module:
+    return maybe_module, ""
+  prefix, suffix = maybe_module.rsplit(".", 1)
+  if suffix[0].islower():
+    return maybe_module, ""
+  else:
+    module, rest = _GuessModule(prefix)
+    return module, f"{rest}.{suffix}" if rest else suffix
+
+
+def _LiteralValue(printed):
+  """Returns the value that the parser stores for a printed literal."""
+  try:
+    value = astlib.literal_eval(printed)
+  except (ValueError, SyntaxError) as e:
+    raise UnsupportedError(f"literal value {printed!r}") from e
+  if isinstance(value, (str, bytes)):
+    return repr(value)
+  elif type(value) in (int, bool):  # pylint: disable=unidiomatic-typecheck
+    return value
+  raise UnsupportedError(f"literal value {printed!r}")
+
+
+class _CollectNames(visitors.Visitor):
+  """Collects the names of all NamedTypes."""
+
+  def __init__(self):
+    super().__init__()
+    self.names = set()
+
+  def EnterNamedType(self, node):
+    self.names.add(node.name)
+
+
+class _Imports:
+  """The imports that the printer adds, as the parser reads them back.
+
+  Keep in sync with printer._Imports. Imports from `typing` are not tracked,
+  since the parser resolves names imported from `typing` to their full names.
+  """
+
+  def __init__(self):
+    self.direct_imports: dict[str, str] = {}
+    self.from_imports: dict[str, dict[str, str]] = {}
+    # Map from fully qualified import name to alias
+    self.reverse_alias_map: dict[str, str] = {}
+
+  def add(self, full_name, alias=None):
+    alias = alias or full_name
+    if "." not in full_name or full_name == alias:
+      self.direct_imports[alias] = full_name
+    else:
+      module, name = full_name.rsplit(".", 1)
+      self.from_imports.setdefault(module, {})[alias] = name
+    self.reverse_alias_map[full_name] = alias
+
+  def parsed_name(self, printed):
+    """Returns the name that the parser resolves a printed name to."""
+    first, dot, rest = printed.partition(".")
+    for module, members in self.from_imports.items():
+      if first in members:
+        return f"{_EXTERNAL}{module}.{members[first]}{dot}{rest}"
+    return printed
+
+  def to_aliases(self):
+    """Returns the aliases that the parser creates for the import statements."""
+    statements = []
+    for alias, module in self.direct_imports.items():
+      if alias == module:
+        statement = f"import {module}"
+      else:
+        statement = f"import {module} as {alias}"
+      aliases = [pytd.Alias(alias, pytd.Module(name=alias, module_name=module))]
+      statements.append((False, statement, aliases))
+    for module, members in self.from_imports.items():
+      targets = sorted(
+          (f"{name} as {alias}" if alias != name else name, alias, name)
+          for alias, name in members.items()
+      )
+      statement = f"from {module} import " + ", ".join(t for t, _, _ in targets)
+      aliases = [
+          pytd.Alias(alias, pytd.NamedType(f"{_EXTERNAL}{module}.{name}"))
+          for _, alias, name in targets
+      ]
+      statements.append((True, statement, aliases))
+    # The printer puts import statements before from-import statements and
+    # sorts them lexicographically.
+    statements.sort(key=lambda s: s[:2])
+    return [alias for _, _, aliases in statements for alias in aliases]
+
+
+class _ReparseVisitor(visitors.Visitor):
+  """Converts an AST to what the parser would build from its printed pyi.
+
+  This mirrors the decisions that printer.PrintVisitor makes, so the two need
+  to be kept in sync.
+  """
+
+  def __init__(self):
+    super().__init__()
+    self._unit = None
+    self._local_names = set()
+    self._type_param_names = set()
+    self._type_aliases = set()
+    self._top_level_aliases = set()
+    # Like the printer, we keep the members of all enclosing classes and clear
+    # them when leaving any class.
+    self._class_members = set()
+    self._class_stack = []
+    self._in_parameter = False
+    self._imports = _Imports()
+
+  def _NameCollision(self, name):
+    def name_in(members):
+      return name in members or f"{self._unit.name}.{name}" in members
+
+    return name_in(self._class_members) or name_in(self._local_names)
+
+  def _StripUnitPrefix(self, name):
+    return name.removeprefix(f"{self._unit.name}.")
+
+  def _PrintedName(self, name):
+    """Returns how the printer prints a name that's not in builtins or typing.
+
+    Adds the import that the printer would add for the name.
+
+    Args:
+      name: A name.
+    """
+    if "." not in name:
+      return name
+    try:
+      pytd.LookupItemRecursive(self._unit, self._StripUnitPrefix(name))
+    except KeyError:
+      pass
+    else:
+      return name
+    prefix, _, suffix = name.rpartition(".")
+    while prefix:
+      prefix_alias = self._imports.reverse_alias_map.get(prefix)
+      if prefix_alias:
+        return f"{prefix_alias}.{suffix}"
+      prefix, _, remainder = prefix.rpartition(".")
+      suffix = f"{remainder}.{suffix}"
+    module, _ = _GuessModule(name.rpartition(".")[0])
+    if self._NameCollision(module):
+      raise UnsupportedError(f"module {module} collides with a local name")
+    self._imports.add(module)
+    return name
+
+  def _ParsedName(self, printed):
+    if printed.partition(".")[0] in self._type_aliases:
+      # The parser inlines references to type aliases.
+      raise UnsupportedError(f"reference to type alias {printed}")
+    return pytd.NamedType(self._imports.parsed_name(printed))
+
+  def EnterTypeDeclUnit(self, node):
+    self._unit = node
+    definitions = (
+        node.classes
+        + node.functions
+        + node.constants
+        + node.type_params
+        + node.aliases
+    )
+    self._local_names = {c.name for c in definitions}
+    for t in node.type_params:
+      if type(t) is not pytd.TypeParameter or t.full_name == "typing.Self":  # pylint: disable=unidiomatic-typecheck
+        raise UnsupportedError(f"type parameter {t.name}")
+    self._type_param_names = {t.name for t in node.type_params}
+    self._top_level_aliases = {id(a) for a in node.aliases}
+    for c in node.constants:
+      t = c.type
+      if (
+          not c.value
+          and isinstance(t, pytd.GenericType)
+          and t.base_type.name == "builtins.type"
+          and len(t.parameters) == 1
+          and getattr(t.parameters[0], "name", None) == f"typing.{c.name}"
+      ):
+        # The printer turns these into typing imports.
+        raise UnsupportedError(f"typing constant {c.name}")
+    for alias in node.aliases:
+      if isinstance(alias.type, pytd.Module):
+        self._imports.add(alias.type.module_name, alias.type.name)
+      elif (
+          isinstance(alias.type, (pytd.NamedType, pytd.ClassType, pytd.LateType))
+          and "." in alias.type.name
+      ):
+        name = self._StripUnitPrefix(alias.name)
+        if alias.type.name.startswith("typing.") or "." in name:
+          raise UnsupportedError(f"import {alias.type.name} as {name}")
+        self._imports.add(alias.type.name, name)
+      elif isinstance(alias.type, (pytd.Constant, pytd.Function)):
+        raise UnsupportedError(f"alias {alias.name}")
+      else:
+        self._type_aliases.add(alias.name)
+
+  def VisitTypeDeclUnit(self, node):
+    # The printer sorts the type parameter definitions. A visitor can't visit
+    # nodes while it's visiting, so we convert their bounds and constraints
+    # with a copy that shares this visitor's state.
+    v = copy.copy(self)
+    type_params = []
+    for t in sorted(self._unit.type_params, key=lambda t: f"{t.name} = "):
+      type_params.append(
+          t.Replace(
+              constraints=tuple(c.Visit(v) for c in t.constraints),
+              bound=t.bound and t.bound.Visit(v),
+              default=t.default and t.default.Visit(v),
+              scope=None,
+          )
+      )
+    aliases = self._imports.to_aliases()
+    aliases.extend(a for a in node.aliases if a.name in self._type_aliases)
+    return node.Replace(
+        name=None, type_params=tuple(type_params), aliases=tuple(aliases)
+    )
+
+  def EnterAlias(self, node):
+    if id(node) not in self._top_level_aliases:
+      # Aliases can also appear in types, e.g. as the type of a constant that
+      # is assigned one of several modules.
+      if not isinstance(node.type, pytd.Module):
+        raise UnsupportedError(f"alias {node.name} in a type")
+    elif node.name not in self._type_aliases:
+      return False  # imports are converted by VisitTypeDeclUnit
+
+  def VisitAlias(self, node):
+    if id(self.old_node) in self._top_level_aliases:
+      return node
+    # The printer prints an alias of a module in a type as its type.
+    return node.type
+
+  def EnterClass(self, node):
+    for member in node.methods + node.constants:
+      self._class_members.add(member.name)
+    self._class_stack.append(node)
+    return {"decorators", "template"}
+
+  def LeaveClass(self, node):
+    self._class_members.clear()
+    self._class_stack.pop()
+
+  def VisitClass(self, node):
+    bases = node.bases or (pytd.NamedType("object"),)
+    for base in bases:
+      if isinstance(base, pytd.GenericType):
+        base = base.base_type
+      if isinstance(base, pytd.NamedType) and base.name in _GENERATED_BASES:
+        raise UnsupportedError(f"{base.name} class {node.name}")
+    for keyword, value in node.keywords:
+      if isinstance(value, pytd.Literal):
+        raise UnsupportedError(f"class keyword {keyword}")
+    decorators = []
+    for d in self.old_node.decorators:
+      if d.type.name.startswith(("typing.", "builtins.")):
+        raise UnsupportedError(f"class decorator {d.name}")
+      printed = self._PrintedName(d.name)
+      if printed not in decorators:
+        decorators.append(printed)
+    return node.Replace(
+        bases=bases,
+        decorators=tuple(pytd.Alias(d, self._ParsedName(d)) for d in decorators),
+        template=(),
+    )
+
+  def EnterFunction(self, node):
+    if node.decorators:
+      raise UnsupportedError(f"decorated function {node.name}")
+    if node.kind == pytd.MethodKind.PROPERTY:
+      raise UnsupportedError(f"property {node.name}")
+    if (
+        not self._class_stack
+        and node.kind != pytd.MethodKind.METHOD
+        and node.name != "__new__"
+    ):
+      raise UnsupportedError(f"{node.kind.value} {node.name} outside a class")
+
+  def VisitFunction(self, node):
+    # The parser infers these kinds from the method names.
+    kind = node.kind
+    if node.name == "__new__":
+      kind = pytd.MethodKind.STATICMETHOD
+    elif (
+        node.name == "__init_subclass__"
+        and kind != pytd.MethodKind.STATICMETHOD
+    ):
+      kind = pytd.MethodKind.CLASSMETHOD
+    return node.Replace(kind=kind, flags=node.flags | pytd.MethodFlag.NONE)
+
+  def EnterSignature(self, node):
+    if node.exceptions:
+      raise UnsupportedError("raised exceptions")
+
+  def VisitSignature(self, node):
+    if isinstance(node.return_type, pytd.NothingType):
+      return_type = pytd.NamedType("typing.Never")
+    else:
+      return_type = node.return_type
+    params = node.params
+    # The parser treats a generic `self` annotation as a mutation of `self`.
+    if (
+        params
+        and params[0].name == "self"
+        and isinstance(params[0].type, pytd.GenericType)
+    ):
+      if params[0].optional:
+        raise UnsupportedError("optional self")
+      params = (params[0].Replace(mutated_type=params[0].type),) + params[1:]
+    return node.Replace(
+        params=params,
+        starargs=(
+            node.starargs and self._ContainerParameter(node.starargs, "tuple")
+        ),
+        starstarargs=(
+            node.starstarargs
+            and self._ContainerParameter(node.starstarargs, "dict")
+        ),
+        return_type=return_type,
+        template=(),
+    )
+
+  def _ContainerParameter(self, node, container):
+    """Converts *args or **kwargs, of which the printer prints the contents."""
+    if isinstance(node.type, pytd.GenericType):
+      if node.type.base_type.name.rpartition(".")[2] != container:
+        raise UnsupportedError(f"{node.type.base_type.name} {node.name}")
+      contents = node.type.parameters[-1]
+    else:
+      contents = pytd.AnythingType()
+    if self._class_members:
+      # The printer prints the contents with a copy of itself that doesn't know
+      # about the class members, so it doesn't avoid collisions with them.
+      collector = _CollectNames()
+      contents.Visit(collector)
+      for name in collector.names:
+        prefix, _, suffix = name.rpartition(".")
+        if prefix in ("builtins", "typing") and suffix in self._class_members:
+          raise UnsupportedError(f"{name} in parameter {node.name}")
+    if isinstance(contents, pytd.AnythingType):
+      t = pytd.NamedType(container)
+    elif container == "tuple":
+      t = pytd.GenericType(pytd.NamedType("tuple"), (contents,))
+    else:
+      t = pytd.GenericType(
+          pytd.NamedType("dict"), (pytd.NamedType("str"), contents)
+      )
+    return node.Replace(type=t, optional=True)
+
+  def EnterParameter(self, node):
+    if node.mutated_type is not None:
+      if node.optional:
+        raise UnsupportedError(f"optional mutated parameter {node.name}")
+      self._CheckImportFree(node.mutated_type)
+    self._in_parameter = True
+
+  def LeaveParameter(self, node):
+    self._in_parameter = False
+
+  def _CheckImportFree(self, t):
+    """Checks that printing a type doesn't add imports.
+
+    The printer prints mutated types with a copy of itself, so the imports that
+    they need are lost.
+
+    Args:
+      t: A type.
+    """
+    if isinstance(t, pytd.GenericType):
+      self._CheckImportFree(t.base_type)
+      for p in t.parameters:
+        self._CheckImportFree(p)
+    elif isinstance(t, (pytd.NamedType, pytd.ClassType, pytd.LateType)):
+      prefix, _, suffix = t.name.rpartition(".")
+      if prefix == "builtins":
+        if self._NameCollision(suffix):
+          raise UnsupportedError(f"mutated type {t.name}")
+      elif prefix:
+        try:
+          pytd.LookupItemRecursive(self._unit, self._StripUnitPrefix(t.name))
+        except KeyError as e:
+          raise UnsupportedError(f"mutated type {t.name}") from e
+    elif not isinstance(t, pytd.TypeParameter):
+      raise UnsupportedError(f"mutated type {t}")
+
+  def _IsOwnClass(self, t):
+    """Whether the printer considers t to be the type of the current class."""
+    if not self._class_stack:
+      return False
+    names = [c.name for c in self._class_stack]
+    if isinstance(t, pytd.GenericType):
+      if len(names) > 1 and "." not in names[-1]:
+        # The printer compares t with the joined class names if its printed
+        # form contains a dot anywhere, including in the parameters.
+        raise UnsupportedError(f"generic annotation in nested class {names[-1]}")
+      t = t.base_type
+    if not isinstance(t, pytd.NamedType):
+      return False
+    if "." in t.name and "." not in names[-1]:
+      class_name = ".".join(names)
+    else:
+      class_name = names[-1]
+    return t.name == class_name
+
+  def VisitParameter(self, node):
+    # The printer elides the annotations of `self` and `cls` that match the
+    # class.
+    t = node.type
+    if node.name == "self" and self._IsOwnClass(t):
+      return node.Replace(type=pytd.AnythingType())
+    if (
+        node.name == "cls"
+        and isinstance(t, pytd.GenericType)
+        and (
+            t.base_type.name == "type"
+            or t.base_type.name == "typing.Type"
+            and not self._NameCollision("Type")
+        )
+        and len(t.parameters) == 1
+        and self._IsOwnClass(t.parameters[0])
+    ):
+      return node.Replace(type=pytd.AnythingType())
+    return node
+
+  def VisitConstant(self, node):
+    return node.Replace(value=pytd.AnythingType() if node.value else None)
+
+  def VisitNamedType(self, node):
+    prefix, _, suffix = node.name.rpartition(".")
+    if prefix == "builtins":
+      if not self._NameCollision(suffix):
+        return pytd.NamedType(suffix)
+      self._imports.add("builtins")
+      return pytd.NamedType(node.name)
+    elif prefix == "typing":
+      if self._NameCollision(suffix):
+        self._imports.add("typing")
+      return pytd.NamedType(node.name)
+    elif prefix == "typing_extensions":
+      raise UnsupportedError(node.name)
+    return self._ParsedName(self._PrintedName(node.name))
+
+  def VisitClassType(self, node):
+    return self.VisitNamedType(node)
+
+  def VisitLateType(self, node):
+    return self.VisitNamedType(node)
+
+  def VisitModule(self, node):
+    return pytd.NamedType("module")
+
+  def VisitTypeParameter(self, node):
+    if node.name not in self._type_param_names:
+      raise UnsupportedError(f"undefined type parameter {node.name}")
+    return pytd.NamedType(node.name)
+
+  def VisitUnionType(self, node):
+    # The printer removes duplicates and types that another type in a
+    # parameter annotation subsumes, and moves literals and then None to the
+    # end.
+    type_list = list(dict.fromkeys(node.type_list))
+    if any(isinstance(t, pytd.UnionType) for t in type_list):
+      raise UnsupportedError("nested union")
+    if self._in_parameter:
+      for compat, name in pep484.get_compat_items():
+        compat, name = pytd.NamedType(compat), pytd.NamedType(name)
+        if compat in type_list and name in type_list:
+          type_list.remove(compat)
+    none = pytd.NamedType("NoneType")
+    literals = [t for t in type_list if isinstance(t, pytd.Literal)]
+    others = [
+        t
+        for t in type_list
+        if t != none and not isinstance(t, pytd.Literal)
+    ]
+    # Literal[True] and Literal[1] are equal, so the parser keeps only one.
+    type_list = list(dict.fromkeys(others + literals))
+    if none in node.type_list:
+      type_list.append(none)
+    if len(type_list) == 1:
+      return type_list[0]
+    return pytd.UnionType(tuple(type_list))
+
+  def VisitLiteral(self, node):
+    value = node.value
+    if isinstance(value, pytd.Constant):
+      prefix, _, suffix = value.name.rpartition(".")
+      if prefix == "builtins" and suffix in ("True", "False"):
+        return pytd.Literal(suffix == "True")
+      if prefix not in self._local_names:
+        raise UnsupportedError(f"literal {value.name}")
+      return pytd.Literal(pytd.Constant(value.name, pytd.NamedType(prefix)))
+    elif isinstance(value, str):
+      return pytd.Literal(_LiteralValue(value))
+    elif type(value) in (int, bool):  # pylint: disable=unidiomatic-typecheck
+      return node
+    raise UnsupportedError(f"literal {value!r}")
+
+  def VisitAnnotated(self, node):
+    return node.Replace(
+        annotations=tuple(_LiteralValue(a) for a in node.annotations)
+    )
+
+  def VisitIntersectionType(self, node):
+    raise UnsupportedError("intersection type")
+
+  def VisitParamSpec(self, node):
+    raise UnsupportedError(f"ParamSpec {node.name}")
+
+  def VisitConcatenate(self, node):
+    raise UnsupportedError("Concatenate")
+
+
+def Reparse(ast: pytd.TypeDeclUnit) -> pytd.TypeDeclUnit:
+  """Converts an AST to what the parser would build from its printed pyi.
+
+  Args:
+    ast: A TypeDeclUnit, e.g. the result of type inference.
+
+  Returns:
+    The TypeDeclUnit that parsing pytd_utils.Print(ast) would build before
+    post-processing.
+
+  Raises:
+    UnsupportedError: If the AST contains a construct that this function
+      doesn't know how to convert.
+  """
+  return ast.Visit(_ReparseVisitor())
@@ -0,0 +1,201 @@
+import os
+import textwrap
+
+from pytype import config
+from pytype import io
+from pytype import load_pytd
+from pytype import pytype_source_utils
+from pytype.imports import pickle_utils
+from pytype.platform_utils import path_utils
+from pytype.pytd import pytd_utils
+from pytype.pytd import reparse
+from pytype.pytd import serialize_ast
+from pytype.tests import test_base
+from pytype.tests import test_utils
+
+import unittest
+
+
+# Files in pytype/test_data that don't analyze cleanly.
+_CORPUS_EXCLUDES = frozenset({
+    "bad.py",
+    "constant.py",
+    "syntax.py",
+    "tokenerror1.py",
+    "tokenerror2.py",
+})
+
+
+class ReparseTest(test_base.UnitTest):
+  """Tests that exporting an AST directly matches printing and parsing it."""
+
+  def _infer(self, src, module_name="foo"):
+    with test_utils.Tempdir() as d:
+      filename = d.create_file(f"{module_name}.py", textwrap.dedent(src))
+      options = config.Options.create(
+          filename,
+          module_name=module_name,
+          python_version=self.python_version,
+          quick=True,
+      )
+      loader = load_pytd.create_loader(options)
+      ast = io.generate_pyi_ast(
+          io.read_source_file(filename), options, loader
+      ).ast
+    return ast, loader
+
+  def assertExportsLikeRoundTrip(self, src, module_name="foo", direct=True):
+    ast, loader = self._infer(src, module_name)
+    if direct:
+      reparse.Reparse(ast)  # must not fall back to printing and parsing
+    expected = serialize_ast.SourceToExportableAst(
+        module_name, pytd_utils.Print(ast), loader
+    )
+    actual = serialize_ast.PrepareForExport(module_name, ast, loader)
+    self.assertMultiLineEqual(
+        pytd_utils.Print(actual), pytd_utils.Print(expected)
+    )
+    pickled = pickle_utils.Serialize(actual)
+    self.assertEqual(pickled, pickle_utils.Serialize(expected))
+    self.assertTrue(pickle_utils.DecodeAst(pickled).ast)
+
+  def test_functions(self):
+    self.assertExportsLikeRoundTrip("""
+      import os
+      def f(x: int, *args: str, y=None, **kwargs: float) -> str:
+        return os.path.join("a", "b")
+      def g(x, /, y: "int | str | None" = None):
+        return [x]
+      async def h() -> bytes:
+        return b""
+      def gen():
+        yield 1
+      def never():
+        raise ValueError()
+    """)
+
+  def test_classes(self):
+    self.assertExportsLikeRoundTrip("""
+      import abc
+      import dataclasses
+      import enum
+      from typing import Generic, TypeVar
+      T = TypeVar("T")
+      class Color(enum.Enum):
+        RED = 1
+        BLUE = "b"
+      @dataclasses.dataclass(frozen=True)
+      class D:
+        x: int
+        y: str = "a"
+      class Base(abc.ABC):
+        @abc.abstractmethod
+        def f(self) -> int: ...
+        @property
+        def p(self) -> str:
+          return ""
+        @classmethod
+        def make(cls):
+          return cls()
+        class Inner:
+          def g(self) -> "Base.Inner":
+            return self
+      class G(Generic[T]):
+        def __init__(self, t: T):
+          self.t = t
+        def get(self) -> T:
+          return self.t
+      class Sub(G[int], Base):
+        def f(self) -> int:
+          return 1
+        def __new__(cls, *args):
+          return super().__new__(cls)
+      def color():
+        return Color.RED
+    """)
+
+  def test_constants_and_aliases(self):
+    self.assertExportsLikeRoundTrip("""
+      import collections
+      import os.path as osp
+      from typing import Literal
+      CONST = 3
+      LST = [1, "a"]
+      DCT = {"a": collections.OrderedDict()}
+      mod = osp
+      fn = len
+      def lit(x: Literal["a", "b"], y: Literal[1, True, None] = None):
+        return x
+    """)
+
+  def test_module_in_type(self):
+    self.assertExportsLikeRoundTrip("""
+      import sys, __main__
+      if sys.argv:
+        mod = __main__
+      else:
+        mod = sys
+    """)
+
+  def test_name_collision(self):
+    self.assertExportsLikeRoundTrip("""
+      import typing
+      class int:
+        pass
+      class List:
+        pass
+      def f(x: str, y: typing.List[str]) -> int:
+        return int()
+    """)
+
+  def test_unsupported(self):
+    src = """
+      from typing import Callable, ParamSpec, TypeVar
+      P = ParamSpec("P")
+      T = TypeVar("T")
+      def deco(f: Callable[P, T]) -> Callable[P, list[T]]:
+        def wrapper(*args: P.args, **kwargs: P.kwargs) -> list[T]:
+          return [f(*args, **kwargs)]
+        return wrapper
+    """
+    ast, _ = self._infer(src)
+    with self.assertRaises(reparse.UnsupportedError):
+      reparse.Reparse(ast)
+    # PrepareForExport falls back to printing and parsing the AST.
+    self.assertExportsLikeRoundTrip(src, direct=False)
+
+
+class ReparseCorpusTest(test_base.UnitTest):
+  """Tests that the direct export of real modules decodes like a round trip."""
+
+  def test_corpus(self):
+    test_data = pytype_source_utils.get_full_path("test_data")
+    for filename in sorted(os.listdir(test_data)):
+      if not filename.endswith(".py") or filename in _CORPUS_EXCLUDES:
+        continue
+      module_name = filename[: -len(".py")]
+      with self.subTest(module=module_name):
+        options = config.Options.create(
+            path_utils.join(test_data, filename),
+            module_name=module_name,
+            python_version=self.python_version,
+            quick=True,
+        )
+        loader = load_pytd.create_loader(options)
+        ast = io.generate_pyi_ast(
+            io.read_source_file(options.input), options, loader
+        ).ast
+        expected = pickle_utils.Serialize(
+            serialize_ast.SourceToExportableAst(
+                module_name, pytd_utils.Print(ast), loader
+            )
+        )
+        actual = pickle_utils.Serialize(
+            serialize_ast.PrepareForExport(module_name, ast, loader)
+        )
+        self.assertEqual(actual, expected)
+        self.assertTrue(pickle_utils.DecodeAst(actual).ast)
+
+
+if __name__ == "__main__":
+  unittest.main()
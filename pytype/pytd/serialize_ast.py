@@ -5,11 +5,14 @@ serializing it to disk. Further users only need to read the serialized data from
 disk, which is faster to digest than a pyi file.
 """
 
+import hashlib
+import sys
 
 import msgspec
 from pytype.pyi import parser
 from pytype.pytd import pytd
 from pytype.pytd import pytd_utils
+from pytype.pytd import reparse
 from pytype.pytd import visitors
 
 
@@ -18,13 +21,19 @@ class UnrestorableDependencyError(Exception):
 
 
 class FindClassTypesVisitor(visitors.Visitor):
-  """Visitor to find class and function types."""
+  """Visitor to find class and function types.
+
+  The names of the class types are interned along the way. Names like
+  "builtins.str" occur thousands of times across the pickles that a program
+  loads, and decoding creates a new string for every occurrence.
+  """
 
   def __init__(self):
     super().__init__()
     self.class_type_nodes = []
 
   def EnterClassType(self, n):
+    n.name = sys.intern(n.name)
     self.class_type_nodes.append(n)
 
 
@@ -70,6 +79,7 @@ class ClearLookupCache(visitors.Visitor):
 
   def LeaveTypeDeclUnit(self, node):
     node._name2item.clear()  # pylint: disable=protected-access
+    node._member_index.clear()  # pylint: disable=protected-access
 
 
 class SerializableAst(msgspec.Struct):
@@ -168,6 +178,132 @@ def SerializeAst(ast, src_path=None, metadata=None) -> SerializableAst:
   )
 
 
+class _CollectReferencedNames(visitors.Visitor):
+  """Visitor to collect the names of all the types that a node references."""
+
+  def __init__(self):
+    super().__init__()
+    self.names = set()
+
+  def EnterClassType(self, node):
+    self.names.add(node.name)
+
+  def EnterNamedType(self, node):
+    self.names.add(node.name)
+
+  def EnterLateType(self, node):
+    self.names.add(node.name)
+
+  def EnterTypeParameter(self, node):
+    self.names.add(node.name)
+
+
+def _IsPrivateName(name, exports):
+  if name.startswith("__") and name.endswith("__"):
+    return False
+  return name.startswith("_") and name not in exports
+
+
+def PruneToInterface(ast, exports=None):
+  """Removes private module members that the public interface doesn't need.
+
+  A top-level definition is private if its name starts with an underscore, it
+  isn't a dunder like __getattr__ and it isn't listed in __all__. Private
+  definitions are kept if a public definition references them, directly or
+  through other private definitions, e.g., the private base class of a public
+  class. Class bodies are kept as they are, since subclasses in other modules
+  may use their private members.
+
+  Args:
+    ast: A pytd.TypeDeclUnit, e.g., from PrepareForExport().
+    exports: Optionally, the names in the module's __all__. Needed for inferred
+      modules, whose __all__ constant doesn't record its value. If None, they
+      are read from the ast.
+
+  Returns:
+    The pruned pytd.TypeDeclUnit.
+  """
+  prefix = ast.name + "."
+  members = {}
+  for member in ast.constants + ast.classes + ast.functions + ast.aliases:
+    members.setdefault(member.name, []).append(member)
+  for t in ast.type_params:
+    members.setdefault(t.full_name, []).append(t)
+  if exports is None:
+    try:
+      exports = ast.Lookup(prefix + "__all__").value
+    except KeyError:
+      exports = None
+    if not isinstance(exports, tuple):
+      exports = ()
+  todo = [
+      name
+      for name in members
+      if not _IsPrivateName(name.removeprefix(prefix), exports)
+  ]
+  kept = set()
+  while todo:
+    name = todo.pop()
+    if name in kept:
+      continue
+    kept.add(name)
+    collector = _CollectReferencedNames()
+    for member in members[name]:
+      member.Visit(collector)
+    for referenced in collector.names:
+      # A reference to a nested class like "foo._A.B" keeps "foo._A".
+      while referenced:
+        if referenced in members:
+          todo.append(referenced)
+        elif prefix + referenced in members:
+          todo.append(prefix + referenced)
+        referenced, _, _ = referenced.rpartition(".")
+  return ast.Replace(
+      constants=tuple(c for c in ast.constants if c.name in kept),
+      type_params=tuple(t for t in ast.type_params if t.full_name in kept),
+      classes=tuple(c for c in ast.classes if c.name in kept),
+      functions=tuple(f for f in ast.functions if f.name in kept),
+      aliases=tuple(a for a in ast.aliases if a.name in kept),
+  )
+
+
+# The prefix of the pickle metadata entry that holds the interface hash.
+INTERFACE_HASH_METADATA = "interface_hash="
+
+
+def InterfaceHash(serializable_ast: SerializableAst) -> str:
+  """Computes a hash of the AST in a SerializableAst.
+
+  The hash only depends on the definitions in the AST, so it changes exactly
+  when a module's pickled interface changes. It is stored in the pickle
+  metadata by AddInterfaceHash().
+
+  Args:
+    serializable_ast: A SerializableAst, e.g., from SerializeAst().
+
+  Returns:
+    The hash as a hex string.
+  """
+  data = msgspec.msgpack.encode(serializable_ast.ast, order="deterministic")
+  return hashlib.sha256(data).hexdigest()
+
+
+def AddInterfaceHash(serializable_ast: SerializableAst) -> SerializableAst:
+  """Adds the interface hash of the AST to the metadata."""
+  metadata = serializable_ast.metadata + [
+      INTERFACE_HASH_METADATA + InterfaceHash(serializable_ast)
+  ]
+  return serializable_ast.Replace(metadata=metadata)
+
+
+def GetInterfaceHash(metadata: list[str]) -> str | None:
+  """Returns the interface hash stored in pickle metadata, if any."""
+  for entry in metadata:
+    if entry.startswith(INTERFACE_HASH_METADATA):
+      return entry[len(INTERFACE_HASH_METADATA):]
+  return None
+
+
 def EnsureAstName(ast, module_name, fix=False):
   """Verify that serializable_ast has the name module_name, or repair it.
 
@@ -314,15 +450,19 @@ def PrepareForExport(module_name, ast, loader):
     A pytd.TypeDeclUnit representing the supplied AST as it would look after
     being written to a file and parsed.
   """
-  # This is a workaround for functionality which crept into places it doesn't
-  # belong. Ideally this would call some transformation Visitors on ast to
-  # transform it into the same ast we get after parsing and loading (compare
-  # load_pytd.Loader.load_file). Unfortunately parsing has some special cases,
-  # e.g. '__init__' return type and '__new__' being a 'staticmethod', which
-  # need to be moved to visitors before we can do this. Printing an ast also
-  # applies transformations,
-  # e.g. visitors.PrintVisitor._FormatContainerContents, which need to move to
-  # their own visitors so they can be applied without printing.
+  # Printing and parsing an ast applies transformations, e.g. '__new__' becomes
+  # a 'staticmethod' and printer.PrintVisitor._FormatContainerContents
+  # rewrites *args and **kwargs. reparse.Reparse() applies them without the
+  # round trip through a pyi; for the constructs that it doesn't support, we
+  # still print the ast and parse the result.
+  if module_name:
+    try:
+      parsed_ast = reparse.Reparse(ast)
+    except reparse.UnsupportedError:
+      pass
+    else:
+      parsed_ast = parser.post_process_ast(parsed_ast, "", module_name)
+      return _ToExportableAst(module_name, parsed_ast, loader)
   src = pytd_utils.Print(ast)
   return SourceToExportableAst(module_name, src, loader)
 
@@ -335,6 +475,11 @@ def SourceToExportableAst(module_name, src, loader):
       filename=loader.options.input,
       options=parser.PyiOptions.from_toplevel_options(loader.options),
   )
+  return _ToExportableAst(module_name, ast, loader)
+
+
+def _ToExportableAst(module_name, ast, loader):
+  """Turn a parsed ast into a pickle-able ast."""
   ast = ast.Visit(visitors.LookupBuiltins(loader.builtins, full_names=False))
   ast = ast.Visit(visitors.LookupLocalTypes())
   ast = ast.Visit(visitors.AdjustTypeParameters())
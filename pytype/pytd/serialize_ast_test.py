@@ -87,6 +87,85 @@ class SerializeAstTest(test_base.UnitTest):
 
     self.assertEqual(len(indexer.class_type_nodes), 10)
 
+  def test_class_type_names_are_interned(self):
+    with test_utils.Tempdir() as d:
+      ast, _ = self._get_ast(temp_dir=d, module_name="module1")
+    data = pickle_utils.Serialize(ast)
+    names = {
+        n.name: n.name for n in pickle_utils.DecodeAst(data).class_type_nodes
+    }
+    class_type_nodes = pickle_utils.DecodeAst(data).class_type_nodes
+    self.assertTrue(class_type_nodes)
+    for node in class_type_nodes:
+      self.assertIs(node.name, names[node.name])
+
+  def test_prune_to_interface(self):
+    src = """
+      from typing import Generic, TypeVar
+      _T = TypeVar("_T")
+      _U = TypeVar("_U")
+      __all__ = ["Public", "_exported"]
+      class _Base: ...
+      class Public(_Base, Generic[_T]):
+        def f(self, x: _T) -> _T: ...
+      class _Result:
+        class Inner: ...
+      class _Unused: ...
+      def make() -> _Result.Inner: ...
+      def _exported() -> None: ...
+      def _helper(x: _U) -> _Unused: ...
+      def __getattr__(name) -> int: ...
+    """
+    with test_utils.Tempdir() as d:
+      ast, _ = self._get_ast(temp_dir=d, module_name="foo", src=src)
+    pruned = serialize_ast.PruneToInterface(ast)
+    self.assertCountEqual(
+        [c.name for c in pruned.classes],
+        ["foo.Public", "foo._Base", "foo._Result"],
+    )
+    self.assertCountEqual(
+        [f.name for f in pruned.functions],
+        ["foo.make", "foo._exported", "foo.__getattr__"],
+    )
+    self.assertCountEqual([t.name for t in pruned.type_params], ["_T"])
+    self.assertCountEqual([c.name for c in pruned.constants], ["foo.__all__"])
+
+  def test_interface_hash(self):
+    src = """
+      def f(x: int) -> str: ...
+      def _helper() -> None: ...
+    """
+
+    def interface_hash(src):
+      with test_utils.Tempdir() as d:
+        ast, _ = self._get_ast(temp_dir=d, module_name="foo", src=src)
+      ast = serialize_ast.PruneToInterface(ast)
+      return serialize_ast.InterfaceHash(serialize_ast.SerializeAst(ast))
+
+    h = interface_hash(src)
+    self.assertEqual(h, interface_hash(src))
+    self.assertEqual(
+        h, interface_hash(src.replace("_helper()", "_helper(x: int)"))
+    )
+    self.assertNotEqual(h, interface_hash(src.replace("-> str", "-> bytes")))
+
+  def test_interface_hash_metadata(self):
+    with test_utils.Tempdir() as d:
+      ast, _ = self._get_ast(temp_dir=d, module_name="foo")
+      serializable_ast = serialize_ast.SerializeAst(ast, metadata=["meta"])
+      self.assertIsNone(
+          serialize_ast.GetInterfaceHash(serializable_ast.metadata)
+      )
+      serializable_ast = serialize_ast.AddInterfaceHash(serializable_ast)
+      filename = path_utils.join(d.path, "foo.pickled")
+      pickle_utils.Save(serializable_ast, filename)
+      metadata = pickle_utils.LoadMetadata(filename)
+    self.assertEqual(metadata[0], "meta")
+    self.assertEqual(
+        serialize_ast.GetInterfaceHash(metadata),
+        serialize_ast.InterfaceHash(serializable_ast),
+    )
+
   def test_node_index_visitor_usage(self):
     """Confirms that the node index is used.
 
@@ -138,6 +217,16 @@ class SerializeAstTest(test_base.UnitTest):
           ["builtins", "foo.bar.module1", "module2", "queue"],
       )
 
+  def test_pickle_without_lookup_caches(self):
+    with test_utils.Tempdir() as d:
+      ast, _ = self._get_ast(temp_dir=d, module_name="foo.bar.module1")
+      pytd.LookupItemRecursive(ast, "SomeClass.__init__")
+      serialized_ast = pickle_utils.DecodeAst(pickle_utils.Serialize(ast))
+    self.assertFalse(serialized_ast.ast._member_index)
+    self.assertTrue(
+        pytd.LookupItemRecursive(serialized_ast.ast, "SomeClass.__init__")
+    )
+
   def test_unrestorable_child(self):
     # Assume .cls in a ClassType X in module1 was referencing something for
     # which, Visitors.LookupExternalTypes returned AnythingType.
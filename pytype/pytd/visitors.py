@@ -2150,6 +2150,58 @@ class ClearClassPointers(Visitor):
     node.cls = None
 
 
+class InternTypes(Visitor):
+  """Replaces equal types with a single shared instance.
+
+  The canonical instances are kept in a table that can be passed to several
+  visitors, so that e.g. every `Any` or `Optional[T]` in the modules of a loader
+  becomes the same object. Only types whose whole subtree is immutable are
+  interned: the .cls pointer of a ClassType is filled in and cleared in place,
+  so neither ClassType nodes nor the types containing them can be shared.
+  """
+
+  def __init__(self, table):
+    super().__init__()
+    self._table = table
+
+  def _Key(self, value):
+    """Returns a key identifying an internable value, or None."""
+    if isinstance(value, pytd.Node):
+      # Children are visited first, so a child that can be shared has already
+      # been replaced by its canonical instance.
+      return id(value) if self._table.get(id(value)) is value else None
+    elif isinstance(value, tuple):
+      keys = tuple(self._Key(v) for v in value)
+      return None if None in keys else keys
+    elif isinstance(value, (str, int, float, type(None))):
+      # Tag scalars with their type, since e.g. True == 1.
+      return (type(value), value)
+    else:
+      return None
+
+  def _Intern(self, t):
+    fields = self._Key(tuple(getattr(t, f) for f in t.__struct_fields__))
+    if fields is None:
+      return t
+    canonical = self._table.setdefault((type(t), fields), t)
+    if canonical is t:
+      self._table[id(t)] = t
+    return canonical
+
+  VisitNamedType = _Intern  # pylint: disable=invalid-name
+  VisitLateType = _Intern  # pylint: disable=invalid-name
+  VisitAnythingType = _Intern  # pylint: disable=invalid-name
+  VisitNothingType = _Intern  # pylint: disable=invalid-name
+  VisitTypeParameter = _Intern  # pylint: disable=invalid-name
+  VisitUnionType = _Intern  # pylint: disable=invalid-name
+  VisitIntersectionType = _Intern  # pylint: disable=invalid-name
+  VisitGenericType = _Intern  # pylint: disable=invalid-name
+  VisitTupleType = _Intern  # pylint: disable=invalid-name
+  VisitCallableType = _Intern  # pylint: disable=invalid-name
+  VisitLiteral = _Intern  # pylint: disable=invalid-name
+  VisitAnnotated = _Intern  # pylint: disable=invalid-name
+
+
 class ReplaceModulesWithAny(_RemoveTypeParametersFromGenericAny):
   """Replace all references to modules in a list with AnythingType."""
 
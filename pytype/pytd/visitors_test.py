@@ -1352,5 +1352,41 @@ class ReplaceUnionsWithAnyTest(unittest.TestCase):
     )
 
 
+class InternTypesTest(unittest.TestCase):
+
+  def test_share_equal_types(self):
+    table = {}
+    t1 = pytd.UnionType((pytd.NamedType("a"), pytd.AnythingType()))
+    t2 = pytd.UnionType((pytd.NamedType("a"), pytd.AnythingType()))
+    t1 = t1.Visit(visitors.InternTypes(table))
+    t2 = t2.Visit(visitors.InternTypes(table))
+    self.assertIs(t1, t2)
+
+  def test_keep_union_order(self):
+    table = {}
+    a, b = pytd.NamedType("a"), pytd.NamedType("b")
+    t1 = pytd.UnionType((a, b)).Visit(visitors.InternTypes(table))
+    t2 = pytd.UnionType((b, a)).Visit(visitors.InternTypes(table))
+    self.assertIsNot(t1, t2)
+    self.assertEqual(t2.type_list, (b, a))
+
+  def test_literal_value_type(self):
+    table = {}
+    t1 = pytd.Literal(True).Visit(visitors.InternTypes(table))
+    t2 = pytd.Literal(1).Visit(visitors.InternTypes(table))
+    self.assertIs(t1.value, True)
+    self.assertIs(type(t2.value), int)
+
+  def test_keep_class_types(self):
+    table = {}
+    t1 = pytd.GenericType(pytd.ClassType("list"), (pytd.AnythingType(),))
+    t2 = pytd.GenericType(pytd.ClassType("list"), (pytd.AnythingType(),))
+    t1 = t1.Visit(visitors.InternTypes(table))
+    t2 = t2.Visit(visitors.InternTypes(table))
+    self.assertIsNot(t1, t2)
+    self.assertIsNot(t1.base_type, t2.base_type)
+    self.assertIs(t1.parameters[0], t2.parameters[0])
+
+
 if __name__ == "__main__":
   unittest.main()
@@ -23,6 +23,7 @@ class Analysis:
   context: context.Context
   ast: pytd.TypeDeclUnit | None
   ast_deps: pytd.TypeDeclUnit | None
+  exports: tuple[str, ...] = ()
 
 
 def check_types(
@@ -0,0 +1,59 @@
+"""Benchmark the cost of errors that are never shown.
+
+Runs pytype over generated code that triggers many [wrong-arg-types] and
+[bad-return-type] errors, once with the errors reported, once with them
+disabled through --disable, and once with --no-report-errors.
+
+Usage: python -m pytype.scripts.bench_error_rendering [--size N]
+"""
+
+import argparse
+import timeit
+
+from pytype import config
+from pytype import io
+
+
+def _erroneous_code(size):
+  """Generates code with `size` bad calls and `size` bad returns."""
+  lines = [
+      "from typing import Dict, List",
+      "def f(x: Dict[str, List[int]]) -> int:",
+      "  return 0",
+  ]
+  for i in range(size):
+    lines.append(f"def g{i}(x) -> Dict[str, List[str]]:")
+    lines.append(f"  f([{{'k{i}': [x]}}])")
+    lines.append(f"  return [{i}]")
+  for i in range(size):
+    lines.append(f"g{i}({i})")
+  return "\n".join(lines) + "\n"
+
+
+def bench(src, repeat, **kwargs):
+  options = config.Options.create(**kwargs)
+
+  def run():
+    io.check_py(src, options)
+
+  return min(timeit.repeat(run, number=1, repeat=repeat))
+
+
+def main():
+  parser = argparse.ArgumentParser()
+  parser.add_argument("--size", type=int, default=200)
+  parser.add_argument("--repeat", type=int, default=3)
+  args = parser.parse_args()
+  src = _erroneous_code(args.size)
+  reported = bench(src, args.repeat)
+  print(f"reported errors: {reported:.3f}s")
+  disabled = bench(
+      src, args.repeat, disable="wrong-arg-types,bad-return-type"
+  )
+  print(f"disabled errors: {disabled:.3f}s")
+  unreported = bench(src, args.repeat, report_errors=False)
+  print(f"unreported errors: {unreported:.3f}s")
+
+
+if __name__ == "__main__":
+  main()
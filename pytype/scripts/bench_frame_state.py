@@ -0,0 +1,89 @@
+"""Benchmark FrameState data stack operations.
+
+Measures the cost of the push/pop patterns the VM performs on deeply nested
+expressions and on calls with long argument lists, both directly on FrameState
+and end to end through pytype.
+
+Usage: python -m pytype.scripts.bench_frame_state [--depth N] [--args N]
+"""
+
+import argparse
+import textwrap
+import timeit
+
+from pytype import config
+from pytype import io
+from pytype import state as frame_state
+
+
+class _FakeContext:
+  """Supports weakref."""
+
+
+def _nested_expression(depth):
+  return "x = " + "(1 + " * depth + "1" + ")" * depth + "\n"
+
+
+def _long_call(nargs):
+  params = ", ".join(f"a{i}" for i in range(nargs))
+  args = ", ".join(str(i) for i in range(nargs))
+  return textwrap.dedent(f"""
+    def f({params}):
+      return a0
+    y = f({args})
+  """)
+
+
+def bench_stack(depth, repeat):
+  """Pushes `depth` values one by one, then pops them one by one."""
+  ctx = _FakeContext()
+
+  def run():
+    state = frame_state.FrameState.init(None, ctx)
+    for i in range(depth):
+      state = state.push(i)
+    for _ in range(depth):
+      state, _ = state.pop()
+
+  return min(timeit.repeat(run, number=1, repeat=repeat))
+
+
+def bench_popn(nargs, repeat):
+  """Builds a deep stack and repeatedly pops and pushes `nargs` values."""
+  ctx = _FakeContext()
+  state = frame_state.FrameState.init(None, ctx).push(*range(1000))
+
+  def run():
+    s = state
+    for _ in range(100):
+      s, values = s.popn(nargs)
+      s = s.push(*values)
+
+  return min(timeit.repeat(run, number=1, repeat=repeat))
+
+
+def bench_pytype(src, repeat):
+  options = config.Options.create()
+
+  def run():
+    io.check_py(src, options)
+
+  return min(timeit.repeat(run, number=1, repeat=repeat))
+
+
+def main():
+  parser = argparse.ArgumentParser()
+  parser.add_argument("--depth", type=int, default=200)
+  parser.add_argument("--args", type=int, default=200)
+  parser.add_argument("--repeat", type=int, default=3)
+  args = parser.parse_args()
+  print(f"push/pop x{args.depth}: {bench_stack(args.depth, args.repeat):.6f}s")
+  print(f"popn({args.args}) x100: {bench_popn(args.args, args.repeat):.6f}s")
+  nested = bench_pytype(_nested_expression(args.depth), args.repeat)
+  print(f"pytype nested expression (depth {args.depth}): {nested:.3f}s")
+  call = bench_pytype(_long_call(args.args), args.repeat)
+  print(f"pytype call with {args.args} args: {call:.3f}s")
+
+
+if __name__ == "__main__":
+  main()
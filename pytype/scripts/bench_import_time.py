@@ -0,0 +1,77 @@
+"""Benchmark how long it takes to import pytype's entry points.
+
+Imports each module in a fresh interpreter under `python -X importtime` and
+reports the cumulative import time, along with the slowest imported modules.
+
+Usage: python -m pytype.scripts.bench_import_time [--top N] [module ...]
+"""
+
+import argparse
+import collections
+import re
+import subprocess
+import sys
+
+
+_IMPORT_TIME_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|\s*(\S+)")
+
+
+def import_times(module):
+  """Imports `module` in a fresh interpreter.
+
+  Args:
+    module: The name of the module to import.
+
+  Returns:
+    A list of (module name, self time, cumulative time) tuples, with times in
+    microseconds, in the order in which the module imports finished.
+  """
+  proc = subprocess.run(
+      [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+      stderr=subprocess.PIPE,
+      text=True,
+      check=True,
+  )
+  times = []
+  for line in proc.stderr.splitlines():
+    match = _IMPORT_TIME_LINE.match(line)
+    if match:
+      self_us, cumulative_us, name = match.groups()
+      times.append((name, int(self_us), int(cumulative_us)))
+  return times
+
+
+def bench(module, repeat):
+  """Returns the per-module times of the fastest of `repeat` imports."""
+  runs = [import_times(module) for _ in range(repeat)]
+  return min(runs, key=lambda times: times[-1][2])
+
+
+def main():
+  parser = argparse.ArgumentParser()
+  parser.add_argument(
+      "modules",
+      nargs="*",
+      default=["pytype.io", "pytype.main"],
+  )
+  parser.add_argument("--repeat", type=int, default=3)
+  parser.add_argument(
+      "--top", type=int, default=10, help="Number of slowest modules to show."
+  )
+  args = parser.parse_args()
+  for module in args.modules:
+    times = bench(module, args.repeat)
+    print(f"import {module}: {times[-1][2] / 1e6:.3f}s")
+    by_package = collections.Counter()
+    for name, self_us, _ in times:
+      by_package[name.split(".")[0]] += self_us
+    print("  by top-level package:")
+    for package, self_us in by_package.most_common(args.top):
+      print(f"    {package}: {self_us / 1e6:.3f}s")
+    print("  slowest modules (self time):")
+    for name, self_us, _ in sorted(times, key=lambda t: -t[1])[: args.top]:
+      print(f"    {name}: {self_us / 1e6:.3f}s")
+
+
+if __name__ == "__main__":
+  main()
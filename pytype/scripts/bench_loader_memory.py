@@ -0,0 +1,69 @@
+"""Benchmark the memory used by a loader that imports the typeshed stdlib.
+
+Imports every stdlib module in typeshed into a fresh loader, once with and once
+without --intern-pytd-types, and reports the memory still allocated once all
+modules are loaded, the peak memory and the time taken.
+
+Usage: python -m pytype.scripts.bench_loader_memory [--python-version X.Y]
+"""
+
+import argparse
+import gc
+import time
+import tracemalloc
+
+from pytype import config
+from pytype import load_pytd
+from pytype.imports import typeshed
+from pytype.pyi import bulk_parser
+
+
+def stdlib_modules():
+  ts = typeshed.Typeshed()
+  stdlib = ts.get_typeshed_paths()[0]
+  return sorted({module for _, module in bulk_parser.find_stubs(stdlib)})
+
+
+def bench(modules, options):
+  """Returns (modules loaded, current bytes, peak bytes, seconds)."""
+  gc.collect()
+  tracemalloc.start()
+  start = time.perf_counter()
+  loader = load_pytd.create_loader(options)
+  loaded = 0
+  for module in modules:
+    try:
+      if loader.import_name(module):
+        loaded += 1
+    except Exception:  # pylint: disable=broad-except
+      # Some stubs only exist for other platforms or Python versions.
+      pass
+  elapsed = time.perf_counter() - start
+  gc.collect()
+  current, peak = tracemalloc.get_traced_memory()
+  tracemalloc.stop()
+  del loader
+  return loaded, current, peak, elapsed
+
+
+def main():
+  parser = argparse.ArgumentParser()
+  parser.add_argument("--python-version", type=str, default="3.11")
+  args = parser.parse_args()
+  modules = stdlib_modules()
+  for intern in (False, True):
+    options = config.Options.create(
+        python_version=args.python_version, intern_pytd_types=intern
+    )
+    # Builtins and typing are cached between loaders, so load them up front.
+    load_pytd.create_loader(options)
+    loaded, current, peak, elapsed = bench(modules, options)
+    print(
+        f"intern_pytd_types={intern}: {loaded}/{len(modules)} modules, "
+        f"{current / 2**20:.1f}MB allocated, {peak / 2**20:.1f}MB peak, "
+        f"{elapsed:.1f}s"
+    )
+
+
+if __name__ == "__main__":
+  main()
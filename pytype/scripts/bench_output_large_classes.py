@@ -0,0 +1,107 @@
+"""Benchmark generating pyi output for modules with large classes.
+
+Generates a module whose classes look like ORM models or generated protobuf
+wrappers, with hundreds of class constants, instance attributes, methods and
+properties each, and infers its types. The time spent analyzing the module is
+reported separately from the time spent converting the analysis results to pytd
+(CallTracer.compute_types) and optimizing the resulting AST, since only the
+latter two grow with the size of the output.
+
+Usage: python -m pytype.scripts.bench_output_large_classes [--classes N]
+    [--fields N] [--methods N]
+"""
+
+import argparse
+import time
+
+from pytype import analyze
+from pytype import config
+from pytype import context
+from pytype import convert_structural
+from pytype import load_pytd
+from pytype.pytd import optimize
+from pytype.pytd import pytd_utils
+from pytype.pytd import visitors
+
+
+def generate_source(num_classes, num_fields, num_methods):
+  """Returns the source of a module with num_classes large classes."""
+  lines = ["import enum", "from typing import Optional", ""]
+  for i in range(num_classes):
+    lines.append(f"class Kind{i}(enum.Enum):")
+    for j in range(20):
+      lines.append(f"  VALUE_{j} = {j}")
+    lines.append(f"class Model{i}:")
+    for j in range(num_fields):
+      lines.append(f"  FIELD_{j}_NUMBER = {j}")
+    lines.append("  def __init__(self, empty: bool = False):")
+    for j in range(num_fields):
+      lines.append(f"    self.field_{j} = None if empty else {j}")
+    lines.append(f"    self.kind = Kind{i}.VALUE_0")
+    for j in range(num_methods):
+      field = f"self.field_{j % num_fields}"
+      lines.append(f"  def get_{j}(self, default: Optional[int] = None):")
+      lines.append(f"    return {field} or default")
+      lines.append("  @property")
+      lines.append(f"  def name_{j}(self):")
+      lines.append(f"    return str({field})")
+    lines.append("  @classmethod")
+    lines.append("  def make(cls):")
+    lines.append("    return cls()")
+  return "\n".join(lines) + "\n"
+
+
+def bench(src, options):
+  """Returns the analysis, conversion and optimization times for src.
+
+  Mirrors analyze.infer_types and io.generate_pyi_ast, timing their phases.
+  """
+  loader = load_pytd.create_loader(options)
+  ctx = context.Context(options, loader, src=src)
+  start = time.perf_counter()
+  loc, defs = ctx.vm.run_program(
+      src, options.input, analyze.INIT_MAXIMUM_DEPTH
+  )
+  ctx.exitpoint = ctx.vm.analyze(
+      loc, defs, analyze.QUICK_INFER_MAXIMUM_DEPTH
+  )
+  analyzed = time.perf_counter()
+  ast = ctx.vm.compute_types(defs)
+  converted = time.perf_counter()
+  ast = loader.resolve_ast(ast)
+  ast = ast.Visit(visitors.CreateTypeParametersForSignatures())
+  ast = ast.Visit(visitors.RemoveUnknownClasses())
+  ast = convert_structural.extract_local(ast)
+  ast = optimize.Optimize(
+      ast,
+      loader.concat_all(),
+      lossy=False,
+      use_abcs=False,
+      max_union=7,
+      remove_mutable=False,
+  )
+  pytd_utils.CanonicalOrdering(ast)
+  optimized = time.perf_counter()
+  return analyzed - start, converted - analyzed, optimized - converted
+
+
+def main():
+  parser = argparse.ArgumentParser()
+  parser.add_argument("--classes", type=int, default=3)
+  parser.add_argument("--fields", type=int, default=150)
+  parser.add_argument("--methods", type=int, default=150)
+  args = parser.parse_args()
+  src = generate_source(args.classes, args.fields, args.methods)
+  options = config.Options.create(quick=True, check=False)
+  analysis, conversion, optimization = bench(src, options)
+  print(
+      f"{args.classes} classes with {args.fields} fields and "
+      f"{args.methods} methods each ({src.count(chr(10))} lines)"
+  )
+  print(f"analysis:     {analysis:.3f}s")
+  print(f"conversion:   {conversion:.3f}s")
+  print(f"optimization: {optimization:.3f}s")
+
+
+if __name__ == "__main__":
+  main()
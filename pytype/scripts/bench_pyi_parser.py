@@ -0,0 +1,154 @@
+"""Benchmark the stages of the pyi parser over typeshed and pytype's stubs.
+
+Parses every stub, timing each stage of parser.parse_pyi() separately, and
+reports the throughput of each stage in lines per second. With --allocations,
+the stubs are parsed a second time under tracemalloc to measure the memory
+that each stage allocates and keeps; tracing is too slow to combine with the
+timing run.
+
+Usage: python -m pytype.scripts.bench_pyi_parser [--allocations] [dir ...]
+"""
+
+import argparse
+import collections
+import contextlib
+import sys
+import time
+import tracemalloc
+
+from pytype.imports import typeshed
+from pytype.pyi import bulk_parser
+from pytype.pyi import parser
+
+
+_STAGES = ("ast.parse", "generate pytd", "post-process")
+
+
+def parse_in_stages(src, filename, module_name, options, measure):
+  """Runs the stages of parser.parse_pyi(), measuring each one.
+
+  Args:
+    src: The source code.
+    filename: The filename.
+    module_name: The module name.
+    options: A parser.PyiOptions.
+    measure: A function that takes a stage name and returns a context manager
+      measuring the stage.
+  """
+  # Keep in sync with parser.parse_pyi().
+  # pylint: disable=protected-access
+  with measure("ast.parse"):
+    feature_version = parser._feature_version(options.python_version)
+    root = parser._parse(src, feature_version, filename)
+  with measure("generate pytd"):
+    gen_pytd = parser._GeneratePytdVisitor(src, filename, module_name, options)
+    root = gen_pytd.visit(root)
+  # pylint: enable=protected-access
+  with measure("post-process"):
+    parser.post_process_ast(root, src, module_name)
+
+
+class _Timer:
+  """Measures the time of each stage."""
+
+  def __init__(self):
+    self.totals = collections.Counter()
+
+  @contextlib.contextmanager
+  def __call__(self, stage):
+    start = time.perf_counter()
+    yield
+    self.totals[stage] += time.perf_counter() - start
+
+
+class _AllocationCounter:
+  """Measures the memory that each stage allocates and keeps."""
+
+  def __init__(self):
+    self.totals = collections.Counter()
+    self.blocks = collections.Counter()
+
+  @contextlib.contextmanager
+  def __call__(self, stage):
+    start = tracemalloc.take_snapshot()
+    yield
+    stats = tracemalloc.take_snapshot().compare_to(start, "filename")
+    self.totals[stage] += sum(max(s.size_diff, 0) for s in stats)
+    self.blocks[stage] += sum(max(s.count_diff, 0) for s in stats)
+
+
+def load_stubs(directories):
+  """Returns (filename, module name, source) for every stub in directories."""
+  stubs = []
+  for directory in directories:
+    for filename, module_name in bulk_parser.find_stubs(directory):
+      with open(filename) as f:
+        stubs.append((filename, module_name, f.read()))
+  return stubs
+
+
+def bench(stubs, options, measure):
+  """Parses all stubs, returning the number of files that failed to parse."""
+  errors = 0
+  for filename, module_name, src in stubs:
+    try:
+      parse_in_stages(src, filename, module_name, options, measure)
+    except parser.ParseError:
+      errors += 1
+  return errors
+
+
+def main():
+  argparser = argparse.ArgumentParser()
+  argparser.add_argument(
+      "directories",
+      nargs="*",
+      help="Directories of stubs. Defaults to typeshed and pytype's stubs.",
+  )
+  argparser.add_argument("--repeat", type=int, default=3)
+  argparser.add_argument(
+      "--allocations",
+      action="store_true",
+      help="Also count the memory that each stage allocates.",
+  )
+  args = argparser.parse_args()
+  if args.directories:
+    directories = args.directories
+  else:
+    ts = typeshed.Typeshed()
+    directories = ts.get_typeshed_paths()[:1] + ts.get_pytd_paths()
+  stubs = load_stubs(directories)
+  lines = sum(src.count("\n") + 1 for _, _, src in stubs)
+  options = parser.PyiOptions(python_version=sys.version_info[:2])
+  print(f"{len(stubs)} files, {lines} lines")
+
+  # Report the fastest of several runs to reduce noise.
+  runs = []
+  for _ in range(args.repeat):
+    timer = _Timer()
+    errors = bench(stubs, options, timer)
+    runs.append(timer.totals)
+  totals = min(runs, key=lambda totals: sum(totals.values()))
+  if errors:
+    print(f"{errors} files failed to parse")
+  for stage in _STAGES + ("total",):
+    seconds = totals[stage] if stage != "total" else sum(totals.values())
+    print(
+        f"  {stage:>14}: {seconds:7.3f}s  {lines / seconds:10.0f} lines/s"
+    )
+
+  if args.allocations:
+    counter = _AllocationCounter()
+    tracemalloc.start()
+    bench(stubs, options, counter)
+    tracemalloc.stop()
+    print("allocations:")
+    for stage in _STAGES:
+      print(
+          f"  {stage:>14}: {counter.totals[stage] / 2**20:9.1f}MB in "
+          f"{counter.blocks[stage]} blocks"
+      )
+
+
+if __name__ == "__main__":
+  main()
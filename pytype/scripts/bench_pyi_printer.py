@@ -0,0 +1,106 @@
+"""Benchmark printing a large generated module to a pyi file.
+
+Generates a module that looks like protobuf-generated code, with many message
+classes that each have fields, accessors and nested enums, and then writes its
+pyi to a temporary file both by printing the module to a string first
+(pytd_utils.Print) and by streaming it (pytd_utils.Write). For each mode, the
+time and the peak memory that tracemalloc sees while printing are reported.
+
+Usage: python -m pytype.scripts.bench_pyi_printer [--classes N]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from pytype.pyi import parser
+from pytype.pytd import pytd_utils
+
+
+def generate_source(num_classes, num_fields):
+  """Returns the source of a pyi with num_classes message classes."""
+  lines = [
+      "from typing import ClassVar, Iterable, Mapping, Optional, Union",
+      "",
+  ]
+  for i in range(num_classes):
+    lines.append(f"class Message{i}:")
+    lines.append(f"    class Kind{i}:")
+    for j in range(4):
+      lines.append(f"        VALUE_{j}: ClassVar[int]")
+    for j in range(num_fields):
+      lines.append(f"    field_{j}: Optional[Union[int, str, Message{i}]]")
+      lines.append(f"    FIELD_{j}_NUMBER: ClassVar[int]")
+    lines.append(
+        "    def __init__(self, "
+        + ", ".join(
+            f"field_{j}: Optional[Union[int, str]] = ..."
+            for j in range(num_fields)
+        )
+        + ") -> None: ..."
+    )
+    lines.append("    def HasField(self, name: str) -> bool: ...")
+    lines.append(
+        f"    def MergeFrom(self, other: Message{i}) -> Message{i}: ...")
+    lines.append(
+        "    def ListFields(self) -> list[tuple[str, object]]: ...")
+    lines.append(
+        f"def make_{i}(items: Iterable[Mapping[str, int]]) -> Message{i}: ...")
+  return "\n".join(lines) + "\n"
+
+
+def print_to_string(ast, out):
+  out.write(pytd_utils.Print(ast))
+
+
+def write_streaming(ast, out):
+  pytd_utils.Write(ast, out)
+
+
+_MODES = (("Print", print_to_string), ("Write", write_streaming))
+
+
+def bench(ast, write, filename, repeat):
+  """Returns the best time and the peak traced memory of writing the pyi."""
+  times = []
+  for _ in range(repeat):
+    with open(filename, "w") as out:
+      start = time.perf_counter()
+      write(ast, out)
+      times.append(time.perf_counter() - start)
+  tracemalloc.start()
+  try:
+    with open(filename, "w") as out:
+      write(ast, out)
+    _, peak = tracemalloc.get_traced_memory()
+  finally:
+    tracemalloc.stop()
+  return min(times), peak
+
+
+def main():
+  argparser = argparse.ArgumentParser()
+  argparser.add_argument("--classes", type=int, default=2000)
+  argparser.add_argument("--fields", type=int, default=10)
+  argparser.add_argument("--repeat", type=int, default=3)
+  args = argparser.parse_args()
+  src = generate_source(args.classes, args.fields)
+  options = parser.PyiOptions(python_version=sys.version_info[:2])
+  ast = parser.parse_pyi(src, "generated.pyi", "generated", options)
+  with tempfile.TemporaryDirectory() as tmpdir:
+    filename = os.path.join(tmpdir, "generated.pyi")
+    for name, write in _MODES:
+      seconds, peak = bench(ast, write, filename, args.repeat)
+      with open(filename) as f:
+        lines = sum(1 for _ in f)
+      print(
+          f"{name:>6}: {lines} lines in {seconds:.3f}s, "
+          f"{peak / 2**20:.1f}MB peak traced memory"
+      )
+
+
+if __name__ == "__main__":
+  main()
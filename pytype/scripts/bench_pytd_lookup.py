@@ -0,0 +1,93 @@
+"""Benchmark name lookups in large loaded modules.
+
+Loads each module and looks up every top-level name with Loader.lookup_pytd,
+and every top-level name and class member (e.g. "str.join") with
+pytd.LookupItemRecursive. The first pass over a fresh copy of the module, which
+fills in its lookup caches, is reported separately from the later ones.
+
+Usage: python -m pytype.scripts.bench_pytd_lookup [--repeat N] [module ...]
+"""
+
+import argparse
+import time
+
+from pytype import config
+from pytype import load_pytd
+from pytype.pytd import pytd
+
+
+def _member_names(cls, prefix):
+  for member in cls.methods + cls.constants:
+    yield f"{prefix}.{member.name}"
+  for nested in cls.classes:
+    nested_prefix = f"{prefix}.{nested.name.rsplit('.', 1)[-1]}"
+    yield nested_prefix
+    yield from _member_names(nested, nested_prefix)
+
+
+def lookup_names(ast):
+  """Returns the top-level names and the class member names in ast."""
+  prefix = f"{ast.name}."
+  top_level = [
+      x.name[len(prefix) :]
+      for x in ast.constants + ast.functions + ast.classes + ast.aliases
+  ]
+  members = []
+  for cls in ast.classes:
+    members.extend(_member_names(cls, cls.name[len(prefix) :]))
+  return top_level, members
+
+
+def _rate(num_lookups, seconds):
+  return f"{num_lookups / seconds:,.0f} lookups/s"
+
+
+def bench(loader, module, repeat):
+  """Prints the lookup rates for module."""
+  ast = loader.import_name(module)
+  top_level, members = lookup_names(ast)
+  names = []
+  for name in top_level + members:
+    try:
+      pytd.LookupItemRecursive(ast, name)
+    except KeyError:
+      continue
+    names.append(name)
+
+  start = time.perf_counter()
+  for _ in range(repeat):
+    for name in top_level:
+      loader.lookup_pytd(module, name)
+  lookup_pytd = time.perf_counter() - start
+
+  fresh = ast.Replace()
+  start = time.perf_counter()
+  for name in names:
+    pytd.LookupItemRecursive(fresh, name)
+  first = time.perf_counter() - start
+  start = time.perf_counter()
+  for _ in range(repeat):
+    for name in names:
+      pytd.LookupItemRecursive(fresh, name)
+  later = time.perf_counter() - start
+
+  print(f"{module}: {len(top_level)} top-level names, {len(names)} lookups")
+  print(f"  lookup_pytd: {_rate(len(top_level) * repeat, lookup_pytd)}")
+  print(f"  LookupItemRecursive, first: {_rate(len(names), first)}")
+  print(f"  LookupItemRecursive, later: {_rate(len(names) * repeat, later)}")
+
+
+def main():
+  parser = argparse.ArgumentParser()
+  parser.add_argument(
+      "modules", nargs="*", default=["builtins", "typing", "os", "tkinter"]
+  )
+  parser.add_argument("--repeat", type=int, default=20)
+  args = parser.parse_args()
+  loader = load_pytd.create_loader(config.Options.create())
+  for module in args.modules:
+    bench(loader, module, args.repeat)
+
+
+if __name__ == "__main__":
+  main()
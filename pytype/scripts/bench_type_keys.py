@@ -0,0 +1,94 @@
+"""Benchmark type key maintenance for container-heavy code.
+
+Merges nested containers one at a time into a list's type parameter, asking
+for the list's type key after every merge, and runs pytype over generated code
+that builds large dicts and lists of nested containers element by element.
+
+Usage: python -m pytype.scripts.bench_type_keys [--size N]
+"""
+
+import argparse
+import cProfile
+import pstats
+import textwrap
+import timeit
+
+from pytype import config
+from pytype import context
+from pytype import io
+from pytype import load_pytd
+from pytype.abstract import abstract
+from pytype.abstract import abstract_utils
+
+
+def _container_code(size):
+  """Generates code that fills nested containers element by element."""
+  lines = ["d = {}", "lst = []"]
+  for i in range(size):
+    value = (
+        f"[{i}]",
+        f"{{'k': {i}}}",
+        f"({i}, '{i}')",
+        f"{{{i}: [{i}.0]}}",
+    )[i % 4]
+    lines.append(f"d['k{i}'] = {value}")
+    lines.append(f"lst.append({value})")
+  lines.append(textwrap.dedent("""
+    def f(x):
+      return x
+    y = f(d)
+    z = f(lst)
+  """))
+  return "\n".join(lines) + "\n"
+
+
+def bench_merge(size, repeat):
+  """Grows a list of nested lists, computing its type key after each merge."""
+  options = config.Options.create()
+  ctx = context.Context(
+      options=options, loader=load_pytd.Loader(options), src=""
+  )
+  node = ctx.root_node
+  values = []
+  for i in range(size):
+    inner = abstract.List([ctx.convert.build_int(node)], ctx)
+    if i % 2:
+      inner = abstract.List([inner.to_variable(node)], ctx)
+    values.append(inner.to_variable(node))
+
+  def run():
+    lst = abstract.List([], ctx)
+    for value in values:
+      lst.merge_instance_type_parameter(node, abstract_utils.T, value)
+      lst.get_type_key()
+
+  return min(timeit.repeat(run, number=1, repeat=repeat))
+
+
+def main():
+  parser = argparse.ArgumentParser()
+  parser.add_argument("--size", type=int, default=400)
+  parser.add_argument("--repeat", type=int, default=3)
+  parser.add_argument(
+      "--profile", action="store_true", help="Print the top type key callers."
+  )
+  args = parser.parse_args()
+  merge = bench_merge(args.size, args.repeat)
+  print(f"{args.size} merges with type keys: {merge:.3f}s")
+  src = _container_code(args.size)
+  options = config.Options.create()
+
+  def run():
+    io.check_py(src, options)
+
+  elapsed = min(timeit.repeat(run, number=1, repeat=args.repeat))
+  print(f"containers with {args.size} elements: {elapsed:.3f}s")
+  if args.profile:
+    profiler = cProfile.Profile()
+    profiler.runcall(run)
+    stats = pstats.Stats(profiler).sort_stats("cumulative")
+    stats.print_stats("get_type_key|update_caches|merge_instance_type_param")
+
+
+if __name__ == "__main__":
+  main()
@@ -28,6 +28,104 @@ FrameType = Union["SimpleFrame", "Frame"]
 _ContextType = Any
 
 
+class _Stack:
+  """An immutable stack that shares structure between versions.
+
+  Pushing and popping a single value is O(1) and does not copy the rest of the
+  stack, unlike slicing a tuple. Accessing or popping the top n values is O(n),
+  independent of the total stack depth.
+  """
+
+  __slots__ = ("_top", "_rest", "_len")
+
+  def __init__(self, top, rest, length):
+    self._top = top
+    self._rest = rest
+    self._len = length
+
+  @classmethod
+  def from_iterable(cls, values):
+    stack = _EMPTY_STACK
+    for value in values:
+      stack = _Stack(value, stack, stack._len + 1)  # pylint: disable=protected-access
+    return stack
+
+  def push(self, *values):
+    stack = self
+    for value in values:
+      stack = _Stack(value, stack, stack._len + 1)  # pylint: disable=protected-access
+    return stack
+
+  def pop(self):
+    """Returns the stack without its top value, and the top value."""
+    if not self._len:
+      raise IndexError("Trying to pop from an empty stack")
+    return self._rest, self._top
+
+  def popn(self, n):
+    """Returns the stack without its top n values, and those values."""
+    if self._len < n:
+      raise IndexError(
+          "Trying to pop %d values from stack of size %d" % (n, self._len)
+      )
+    values = [None] * n
+    stack = self
+    for i in range(n - 1, -1, -1):
+      values[i] = stack._top  # pylint: disable=protected-access
+      stack = stack._rest  # pylint: disable=protected-access
+    return stack, tuple(values)
+
+  def peek(self, n):
+    """Returns the value `n` entries down in the stack (1 is the top)."""
+    if n < 1 or self._len < n:
+      raise IndexError("Stack index out of range")
+    stack = self
+    for _ in range(n - 1):
+      stack = stack._rest  # pylint: disable=protected-access
+    return stack._top  # pylint: disable=protected-access
+
+  def __len__(self):
+    return self._len
+
+  def __bool__(self):
+    return self._len > 0
+
+  def __iter__(self):
+    """Iterates from the bottom of the stack to the top."""
+    return iter(self.popn(self._len)[1])
+
+  def __getitem__(self, index):
+    if isinstance(index, slice):
+      return tuple(self)[index]
+    if index < 0:
+      return self.peek(-index)
+    return self.peek(self._len - index)
+
+  def __eq__(self, other):
+    if self is other:
+      return True
+    if isinstance(other, _Stack):
+      return self._len == other._len and tuple(self) == tuple(other)
+    if isinstance(other, tuple):
+      return tuple(self) == other
+    return NotImplemented
+
+  def __hash__(self):
+    return hash(tuple(self))
+
+  def __repr__(self):
+    return repr(tuple(self))
+
+
+_EMPTY_STACK = _Stack(None, None, 0)
+
+
+def _as_stack(values):
+  if isinstance(values, _Stack):
+    return values
+  return _Stack.from_iterable(values)
+
+
 class FrameState(utils.ContextWeakrefMixin):
   """Immutable state object, for attaching to opcodes."""
 
@@ -35,15 +133,15 @@ class FrameState(utils.ContextWeakrefMixin):
 
   def __init__(self, data_stack, block_stack, node, ctx, exception, why):
     super().__init__(ctx)
-    self.data_stack = data_stack
-    self.block_stack = block_stack
+    self.data_stack = _as_stack(data_stack)
+    self.block_stack = _as_stack(block_stack)
     self.node = node
     self.exception = exception
     self.why = why
 
   @classmethod
   def init(cls, node, ctx):
-    return FrameState((), (), node, ctx, False, None)
+    return FrameState(_EMPTY_STACK, _EMPTY_STACK, node, ctx, False, None)
 
   def __setattribute__(self):
     raise AttributeError("States are immutable.")
@@ -70,52 +168,54 @@ class FrameState(utils.ContextWeakrefMixin):
 
   def push(self, *values):
     """Push value(s) onto the value stack."""
-    return self.set_stack(self.data_stack + tuple(values))
+    return self.set_stack(self.data_stack.push(*values))
 
   def peek(self, n):
     """Get a value `n` entries down in the stack, without changing the stack."""
+    # Index like a tuple would, so that peek(0) is the bottom of the stack.
     return self.data_stack[-n]
 
   def top(self):
-    return self.data_stack[-1]
+    return self.data_stack.peek(1)
 
   def topn(self, n):
     if n > 0:
-      return self.data_stack[-n:]
+      return self.data_stack.popn(n)[1]
     else:
       return ()
 
   def pop(self):
     """Pop a value from the value stack."""
-    if not self.data_stack:
-      raise IndexError("Trying to pop from an empty stack")
-    value = self.data_stack[-1]
-    return self.set_stack(self.data_stack[:-1]), value
+    stack, value = self.data_stack.pop()
+    return self.set_stack(stack), value
 
   def pop_and_discard(self):
     """Pop a value from the value stack and discard it."""
-    return self.set_stack(self.data_stack[:-1])
+    if not self.data_stack:
+      return self.set_stack(self.data_stack)
+    return self.set_stack(self.data_stack.pop()[0])
 
   def popn(self, n):
     """Return n values, ordered oldest-to-newest."""
     if not n:
       # Not an error: E.g. function calls with no parameters pop zero items
       return self, ()
-    if len(self.data_stack) < n:
-      raise IndexError(
-          "Trying to pop %d values from stack of size %d"
-          % (n, len(self.data_stack))
-      )
-    values = self.data_stack[-n:]
-    return self.set_stack(self.data_stack[:-n]), values
+    stack, values = self.data_stack.popn(n)
+    return self.set_stack(stack), values
 
   def set_top(self, value):
     """Replace top of data stack with value."""
-    return self.set_stack(self.data_stack[:-1] + (value,))
+    stack = self.data_stack
+    if stack:
+      stack = stack.pop()[0]
+    return self.set_stack(stack.push(value))
 
   def set_second(self, value):
     """Replace second element of data stack with value."""
-    return self.set_stack(self.data_stack[:-2] + (value, self.data_stack[-1]))
+    stack, top = self.data_stack.pop()
+    if stack:
+      stack = stack.pop()[0]
+    return self.set_stack(stack.push(value, top))
 
   def rotn(self, n):
     """Rotate the top n values by one."""
@@ -124,9 +224,8 @@ class FrameState(utils.ContextWeakrefMixin):
           "Trying to rotate %d values from stack of size %d"
           % (n, len(self.data_stack))
       )
-    top = self.data_stack[-1]
-    rot = self.data_stack[-n:-1]
-    return self.set_stack(self.data_stack[:-n] + (top,) + rot)
+    stack, values = self.data_stack.popn(n)
+    return self.set_stack(stack.push(values[-1], *values[:-1]))
 
   def swap(self, n):
     """Swap the top of the data stack with the value in position n."""
@@ -135,17 +234,14 @@ class FrameState(utils.ContextWeakrefMixin):
           "Trying to swap value %d in stack of size %d"
           % (n, len(self.data_stack))
       )
-    top = self.data_stack[-1]
-    nth = self.data_stack[-n]
-    in_between = self.data_stack[(-n + 1) : -1]
-    rest = self.data_stack[:-n]
-    return self.set_stack(rest + (top,) + in_between + (nth,))
+    stack, values = self.data_stack.popn(n)
+    return self.set_stack(stack.push(values[-1], *values[1:-1], values[0]))
 
   def push_block(self, block):
     """Push a block on to the block stack."""
     return FrameState(
         self.data_stack,
-        self.block_stack + (block,),
+        self.block_stack.push(block),
         self.node,
         self.ctx,
         self.exception,
@@ -154,11 +250,11 @@ class FrameState(utils.ContextWeakrefMixin):
 
   def pop_block(self):
     """Pop a block from the block stack."""
-    block = self.block_stack[-1]
+    block_stack, block = self.block_stack.pop()
     return (
         FrameState(
             self.data_stack,
-            self.block_stack[:-1],
+            block_stack,
             self.node,
             self.ctx,
             self.exception,
@@ -59,6 +59,17 @@ class DataStackTest(unittest.TestCase):
   def test_peek(self):
     self.assertEqual(self.state.peek(2), 5)
 
+  def test_peek_zero(self):
+    # Like indexing a tuple with -0.
+    self.assertEqual(self.state.peek(0), 1)
+
+  def test_peek_zero_deep(self):
+    # peek(0) stays the bottom of the stack, however deep it is.
+    state = self.state.push(*range(7, 100))
+    self.assertEqual(state.peek(0), 1)
+    state = frame_state.FrameState((7,), [], None, CTX, None, None)
+    self.assertEqual(state.peek(0), 7)
+
   def test_top(self):
     self.assertEqual(self.state.top(), 6)
     self.assertEqual(self.state.topn(2), (5, 6))
@@ -87,6 +98,61 @@ class DataStackTest(unittest.TestCase):
     state = self.state.swap(4)
     self.assertEqual(state.data_stack, (1, 2, 6, 4, 5, 3))
 
+  def test_structural_sharing(self):
+    state = self.state.push(7)
+    popped, _ = state.pop()
+    self.assertIs(popped.data_stack, self.state.data_stack)
+    self.assertEqual(self.state.data_stack, (1, 2, 3, 4, 5, 6))
+
+  def test_pop_empty(self):
+    state = frame_state.FrameState((), (), None, CTX, None, None)
+    with self.assertRaises(IndexError):
+      state.pop()
+    self.assertEqual(state.pop_and_discard().data_stack, ())
+    with self.assertRaises(IndexError):
+      self.state.popn(7)
+
+  def test_block_stack(self):
+    state = self.state.push_block("a").push_block("b")
+    self.assertEqual(state.block_stack, ("a", "b"))
+    state, block = state.pop_block()
+    self.assertEqual(block, "b")
+    self.assertEqual(state.block_stack[-1], "a")
+    self.assertEqual(len(state.block_stack), 1)
+
+
+class StackTest(unittest.TestCase):
+  """Test the persistent stack."""
+
+  def setUp(self):
+    super().setUp()
+    self.stack = frame_state._Stack.from_iterable((1, 2, 3))
+
+  def test_peek(self):
+    self.assertEqual(self.stack.peek(1), 3)
+    self.assertEqual(self.stack.peek(3), 1)
+    for n in (0, -1, 4):
+      with self.assertRaises(IndexError):
+        self.stack.peek(n)
+
+  def test_getitem(self):
+    self.assertEqual(self.stack[0], 1)
+    self.assertEqual(self.stack[2], 3)
+    self.assertEqual(self.stack[-1], 3)
+    self.assertEqual(self.stack[-3], 1)
+    self.assertEqual(self.stack[-0], 1)
+    self.assertEqual(self.stack[1:], (2, 3))
+    for index in (3, -4):
+      with self.assertRaises(IndexError):
+        self.stack[index]  # pylint: disable=pointless-statement
+
+  def test_getitem_empty(self):
+    stack = frame_state._Stack.from_iterable(())
+    for index in (0, -1):
+      with self.assertRaises(IndexError):
+        stack[index]  # pylint: disable=pointless-statement
+    self.assertEqual(stack[:], ())
+
 
 class ConditionTestBase(unittest.TestCase):
 
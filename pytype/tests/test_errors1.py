@@ -48,6 +48,14 @@ class ErrorTest(test_base.BaseTest):
       import rumplestiltskin  # import-error
     """)
 
+  def test_unreported_import_error(self):
+    # Import errors are still logged when other errors aren't reported.
+    self.options.tweak(report_errors=False)
+    self.InferWithErrors("""
+      import rumplestiltskin  # import-error
+      x = len(42)
+    """)
+
   def test_import_from_error(self):
     errors = self.CheckWithErrors("""
       from sys import foobar  # import-error[e]
@@ -152,6 +152,50 @@ class PreciseReturnTest(test_base.BaseTest):
     )
 
 
+class ReuseSubsumedCallsTest(test_base.BaseTest):
+  """Tests for --reuse-subsumed-calls."""
+
+  def setUp(self):
+    super().setUp()
+    self.options.tweak(reuse_subsumed_calls=True)
+
+  def test_reuse_superset_call(self):
+    ty = self.Infer("""
+      def f(x):
+        return x
+      a = f(0 if __random__ else "")
+      b = f(0)
+    """)
+    self.assertTypesMatchPytd(
+        ty,
+        """
+      from typing import TypeVar, Union
+      _T0 = TypeVar('_T0')
+      def f(x: _T0) -> _T0: ...
+      a: Union[int, str]
+      b: Union[int, str]
+    """,
+    )
+
+  def test_no_reuse_of_subset_call(self):
+    ty = self.Infer("""
+      def f(x):
+        return x
+      a = f(0)
+      b = f(0 if __random__ else "")
+    """)
+    self.assertTypesMatchPytd(
+        ty,
+        """
+      from typing import TypeVar, Union
+      _T0 = TypeVar('_T0')
+      def f(x: _T0) -> _T0: ...
+      a: int
+      b: Union[int, str]
+    """,
+    )
+
+
 class TestFunctions(test_base.BaseTest):
   """Tests for functions."""
 
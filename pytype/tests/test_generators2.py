@@ -189,6 +189,25 @@ class GeneratorFeatureTest(test_base.BaseTest):
     """,
     )
 
+  def test_yield_from_in_expression(self):
+    # The generator frame is suspended with x still on the data stack.
+    ty = self.Infer("""
+      def foo():
+        yield 'hello'
+        return 42
+      def bar(x):
+        return [x, (yield from foo())]
+    """)
+    self.assertTypesMatchPytd(
+        ty,
+        """
+      from typing import Any, Generator, TypeVar, Union
+      _T0 = TypeVar('_T0')
+      def foo() -> Generator[str, Any, int]: ...
+      def bar(x: _T0) -> Generator[str, Any, list[Union[int, _T0]]]: ...
+    """,
+    )
+
   def test_yield_from_check_return(self):
     self.CheckWithErrors("""
       from typing import Generator
@@ -58,6 +58,19 @@ ITEMS = {
     'keep_going': Item(
         False, 'False', None,
         'Keep going past errors to analyze as many files as possible.'),
+    'fork_server': Item(
+        False, 'False', None,
+        'Analyze files in forked copies of one prewarmed pytype process '
+        'instead of running a new pytype process per file through ninja.'),
+    'single_process_cycles': Item(
+        False, 'False', None,
+        'Analyze the files of each import cycle together in one pytype '
+        'process, which infers them until their pyi files stop changing, '
+        'instead of running pytype over every file of the cycle twice.'),
+    'timing_report': Item(
+        False, 'False', None,
+        'Record the time and memory that pytype spends on each file and '
+        'report the slowest files after the run.'),
     'jobs': Item(
         1, '4', None,
         "Run N jobs in parallel. When 'auto' is used, this will be equivalent "
@@ -144,7 +157,10 @@ def make_converters(cwd=None):
       'exclude': lambda v: file_utils.expand_source_files(v, cwd),
       'inputs': lambda v: file_utils.expand_source_files(v, cwd),
       'jobs': parse_jobs,
+      'fork_server': string_to_bool,
       'keep_going': string_to_bool,
+      'single_process_cycles': string_to_bool,
+      'timing_report': string_to_bool,
       'output': lambda v: file_utils.expand_path(v, cwd),
       'platform': get_platform,
       'python_version': get_python_version,
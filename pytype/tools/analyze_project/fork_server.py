@@ -0,0 +1,187 @@
+"""Run pytype-single commands in forked children of a prewarmed process.
+
+Every pytype-single process spends a large, fixed amount of time importing
+pytype and loading builtins before it looks at its module. The fork server pays
+that cost once: it builds a context.ContextTemplate and then forks a child per
+module, which inherits the warm state through copy-on-write pages.
+"""
+
+from collections.abc import Sequence
+import dataclasses
+import logging
+import os
+import sys
+import time
+import traceback
+import types
+
+from pytype import config
+from pytype import context
+from pytype import file_utils
+from pytype import io
+from pytype import main as pytype_main
+from pytype.platform_utils import path_utils
+
+try:
+  import resource  # pylint: disable=g-import-not-at-top
+except ImportError:
+  # Not available on Windows
+  resource: types.ModuleType = None
+
+
+@dataclasses.dataclass(frozen=True)
+class Job:
+  """A pytype-single command for one module or import cycle.
+
+  Attributes:
+    name: A description of the job, e.g. "check foo".
+    args: The command-line arguments, without the executable.
+    outputs: The files that the command writes.
+    deps: The outputs of the jobs that have to finish first.
+    priority: Of the jobs whose deps are done, the one with the highest
+      priority is started first.
+  """
+
+  name: str
+  args: Sequence[str]
+  outputs: Sequence[str]
+  deps: Sequence[str]
+  priority: float = 0.0
+
+
+@dataclasses.dataclass(frozen=True)
+class JobResult:
+  """The outcome of a job.
+
+  Attributes:
+    exit_status: The exit status of the child.
+    wall_time: The wall time of the child, in seconds.
+    max_rss: The peak resident set size of the child, in kilobytes. A forked
+      child starts out with the pages of the prewarmed server, so this counts
+      them as well.
+    base_rss: The peak resident set size of the server when it forked the child,
+      in kilobytes. The child's own memory use is at most max_rss - base_rss.
+  """
+
+  exit_status: int
+  wall_time: float
+  max_rss: int
+  base_rss: int = 0
+
+  @property
+  def extra_rss(self):
+    """How far the child's peak RSS went above the server's, in kilobytes."""
+    return max(self.max_rss - self.base_rss, 0)
+
+
+def _max_rss_kb(rusage):
+  # ru_maxrss is in bytes on macOS and in kilobytes elsewhere.
+  if sys.platform == 'darwin':
+    return rusage.ru_maxrss // 1024
+  return rusage.ru_maxrss
+
+
+def _server_max_rss_kb():
+  if resource is None:
+    return 0
+  return _max_rss_kb(resource.getrusage(resource.RUSAGE_SELF))
+
+
+def _analyze(template, args):
+  """Runs a pytype-single command with the same setup as its main()."""
+  options = config.Options(list(args), command_line=True)
+  with pytype_main.run_context(options, ['pytype-single', *args]):
+    if options.batch_cycle:
+      module_options = config.read_batch_manifest(
+          list(args), options.batch_manifest)
+      return io.process_cycle(
+          module_options, loader=template.loader_for(module_options[0]))
+    return io.process_one_file(options, template.loader_for(options))
+
+
+class ForkServer:
+  """Runs jobs in dependency order in forked children of this process."""
+
+  def __init__(self, jobs: Sequence[Job], max_parallel=1, keep_going=False):
+    self._jobs = jobs
+    self._max_parallel = max(max_parallel, 1)
+    self._keep_going = keep_going
+    self.results: dict[str, JobResult] = {}
+
+  def _start(self, template, job):
+    """Forks a child that runs the job."""
+    pid = os.fork()
+    if pid:
+      return pid
+    exit_status = 1
+    try:
+      exit_status = _analyze(template, job.args)
+    except Exception:  # pylint: disable=broad-except
+      traceback.print_exc()
+    finally:
+      sys.stdout.flush()
+      sys.stderr.flush()
+      os._exit(exit_status)  # pylint: disable=protected-access
+
+  def run(self):
+    """Runs all jobs.
+
+    Like ninja, a job whose dependencies failed is skipped, and unless
+    keep_going is set, no new job is started after the first failure.
+
+    Returns:
+      0 if all jobs succeeded, else 1.
+    """
+    if not self._jobs:
+      return 0
+    template = context.ContextTemplate(
+        config.Options(list(self._jobs[0].args), command_line=True)
+    )
+    # Dependencies that no job builds, like the default pyi, already exist.
+    outputs = {output for job in self._jobs for output in job.outputs}
+    pending = sorted(
+        (dataclasses.replace(job, deps=[d for d in job.deps if d in outputs])
+         for job in self._jobs),
+        key=lambda job: -job.priority)
+    running = {}  # pid -> (job, start time, server max RSS)
+    built = set()
+    failed = set()
+    while pending or running:
+      while pending and len(running) < self._max_parallel:
+        if failed and not self._keep_going:
+          break
+        done = built | failed
+        job = next(
+            (j for j in pending if all(d in done for d in j.deps)), None)
+        if not job:
+          break
+        pending.remove(job)
+        if any(d in failed for d in job.deps):
+          logging.info('skipped: %s (a dependency failed)', job.name)
+          failed.update(job.outputs)
+          continue
+        for output in job.outputs:
+          file_utils.makedirs(path_utils.dirname(output))
+        base_rss = _server_max_rss_kb()
+        running[self._start(template, job)] = (job, time.time(), base_rss)
+      if not running:
+        break
+      pid, status, rusage = os.wait4(-1, 0)
+      job, start, base_rss = running.pop(pid)
+      result = self.results[job.name] = JobResult(
+          exit_status=os.waitstatus_to_exitcode(status),
+          wall_time=time.time() - start,
+          max_rss=_max_rss_kb(rusage),
+          base_rss=base_rss,
+      )
+      print(
+          f'[{len(self.results)}/{len(self._jobs)}] {job.name} '
+          f'({result.wall_time:.2f}s, '
+          f'{result.extra_rss / 1024:.1f}MB max RSS above the server)'
+      )
+      if result.exit_status:
+        print(f'FAILED: {job.name}')
+        failed.update(job.outputs)
+      else:
+        built.update(job.outputs)
+    return 1 if failed or pending else 0
@@ -0,0 +1,108 @@
+"""Tests for fork_server.py."""
+
+import dataclasses
+import json
+import os
+import time
+from unittest import mock
+
+from pytype.platform_utils import path_utils
+from pytype.tests import test_utils
+from pytype.tools.analyze_project import fork_server
+
+import unittest
+
+
+@unittest.skipUnless(hasattr(os, 'fork'), 'Requires fork')
+class ForkServerTest(unittest.TestCase):
+  """Test ForkServer."""
+
+  def _job(self, d, name, src, deps=()):
+    path = d.create_file(f'{name}.py', src)
+    output = path_utils.join(d.path, 'pyi', f'{name}.pyi')
+    return fork_server.Job(
+        name=f'check {name}', args=[path, '-o', output, '--module-name', name],
+        outputs=[output], deps=deps)
+
+  def test_run(self):
+    with test_utils.Tempdir() as d:
+      foo = self._job(d, 'foo', 'x = 0')
+      bar = self._job(d, 'bar', 'y = ""', deps=foo.outputs)
+      server = fork_server.ForkServer([foo, bar])
+      self.assertEqual(server.run(), 0)
+      with open(bar.outputs[0]) as f:
+        self.assertEqual(f.read(), 'y: str\n')
+    self.assertEqual(set(server.results), {'check foo', 'check bar'})
+    for result in server.results.values():
+      self.assertEqual(result.exit_status, 0)
+      self.assertGreater(result.max_rss, 0)
+      self.assertGreater(result.base_rss, 0)
+      self.assertEqual(
+          result.extra_rss, max(result.max_rss - result.base_rss, 0))
+
+  def test_timeout(self):
+    with test_utils.Tempdir() as d:
+      foo = self._job(d, 'foo', 'x = 0')
+      foo = dataclasses.replace(foo, args=[*foo.args, '--timeout', '1'])
+      server = fork_server.ForkServer([foo])
+      # The forked child inherits the mock.
+      with mock.patch.object(
+          fork_server.io, 'process_one_file', lambda *_: time.sleep(60)):
+        self.assertEqual(server.run(), 1)
+    self.assertNotEqual(server.results['check foo'].exit_status, 0)
+    self.assertLess(server.results['check foo'].wall_time, 30)
+
+  def test_exec_log(self):
+    with test_utils.Tempdir() as d:
+      foo = self._job(d, 'foo', 'x = 0')
+      log = path_utils.join(d.path, 'exec.log')
+      foo = dataclasses.replace(foo, args=[*foo.args, '--exec-log', log])
+      self.assertEqual(fork_server.ForkServer([foo]).run(), 0)
+      with open(log) as f:
+        self.assertEqual(f.read(), ' '.join(['pytype-single', *foo.args]))
+
+  def test_priority(self):
+    with test_utils.Tempdir() as d:
+      foo = self._job(d, 'foo', 'x = 0')
+      bar = dataclasses.replace(self._job(d, 'bar', 'y = 0'), priority=1.0)
+      server = fork_server.ForkServer([foo, bar])
+      self.assertEqual(server.run(), 0)
+    self.assertEqual(list(server.results), ['check bar', 'check foo'])
+
+  def test_cycle(self):
+    with test_utils.Tempdir() as d:
+      modules = {'foo': 'import bar\nx = 0', 'bar': 'import foo\ny = foo.x'}
+      outputs = []
+      with open(d['manifest'], 'w') as f:
+        for name, src in modules.items():
+          outputs.append(path_utils.join(d.path, 'pyi', f'{name}.pyi'))
+          entry = {
+              'input': d.create_file(f'{name}.py', src),
+              'output': outputs[-1],
+              'module_name': name,
+              'imports_info': d.create_file('imports', ''),
+          }
+          f.write(json.dumps(entry) + '\n')
+      cycle = fork_server.Job(
+          name='cycle foo bar',
+          args=['--batch-manifest', d['manifest'], '--batch-cycle'],
+          outputs=outputs, deps=())
+      server = fork_server.ForkServer([cycle])
+      self.assertEqual(server.run(), 0)
+      with open(outputs[1]) as f:
+        self.assertIn('y: int', f.read())
+
+  def test_skip_dependents_of_failure(self):
+    with test_utils.Tempdir() as d:
+      foo = self._job(d, 'foo', 'x: str = 0')
+      bar = self._job(d, 'bar', 'y = ""', deps=foo.outputs)
+      baz = self._job(d, 'baz', 'z = 0')
+      server = fork_server.ForkServer([foo, bar, baz], keep_going=True)
+      self.assertEqual(server.run(), 1)
+    self.assertEqual(server.results['check foo'].exit_status, 1)
+    self.assertNotIn('check bar', server.results)
+    self.assertEqual(server.results['check baz'].exit_status, 0)
+
+
+if __name__ == '__main__':
+  unittest.main()
@@ -0,0 +1,192 @@
+"""An importlab import graph that caches the imports of each file on disk.
+
+importlab finds a file's imports by parsing the file with the target python
+version, which runs a subprocess per file when that isn't the host version.
+This is by far the slowest part of computing the dependencies of a project, so
+the imports of every file are cached in the output directory, keyed by the
+file's contents. The imports are still resolved to files on every run, since
+that depends on which files exist on the pythonpath.
+
+The cache doesn't keep the path that python itself resolved an import to (the
+import's source), since it goes stale when files are added to the pythonpath
+or to site-packages. A file with an import that can't be resolved without its
+source, e.g. of a package that is neither on the pythonpath nor in typeshed, is
+parsed again.
+"""
+
+import hashlib
+import json
+import logging
+import os
+
+import importlab.graph
+import importlab.parsepy
+import importlab.resolve
+
+from pytype import file_utils
+from pytype.platform_utils import path_utils
+
+CACHE_FILENAME = 'imports.json'
+# Bump this whenever the cache format changes.
+_CACHE_VERSION = 2
+
+
+def _hash_file(filename):
+  with open(filename, 'rb') as f:
+    return hashlib.sha256(f.read()).hexdigest()
+
+
+def _stat(filename):
+  try:
+    return os.stat(filename)
+  except OSError as e:
+    raise importlab.parsepy.ParseError(filename) from e
+
+
+class ImportCache:
+  """Maps files to their import statements, saved in a JSON file."""
+
+  def __init__(self, path, python_version, pythonpath):
+    self.path = path
+    self._key = {
+        'version': _CACHE_VERSION,
+        'python_version': list(python_version),
+        'pythonpath': list(pythonpath),
+    }
+    self._entries = {}
+    self.hits = self.misses = self.reparses = 0
+    self._load()
+
+  def _load(self):
+    try:
+      with open(self.path) as f:
+        data = json.load(f)
+    except (OSError, ValueError):
+      return
+    if not isinstance(data, dict) or data.get('key') != self._key:
+      logging.info('Discarding stale import cache %s', self.path)
+      return
+    self._entries = data['files']
+
+  def save(self):
+    file_utils.makedirs(path_utils.dirname(self.path))
+    # Drop the entries of deleted files so that the cache doesn't keep growing.
+    entries = {k: v for k, v in self._entries.items() if path_utils.exists(k)}
+    tmp = self.path + '.tmp'
+    with open(tmp, 'w') as f:
+      json.dump({'key': self._key, 'files': entries}, f)
+    os.replace(tmp, self.path)
+
+  def lookup(self, filename):
+    """Returns the cached import statements of the file, or None.
+
+    The statements have no source, see the module docstring.
+
+    Args:
+      filename: The file.
+
+    Returns:
+      A list of importlab.parsepy.ImportStatement objects, or None if the file
+      isn't in the cache or has changed.
+    """
+    stat = _stat(filename)
+    entry = self._entries.get(filename)
+    if entry and (
+        (entry['mtime'], entry['size']) == (stat.st_mtime_ns, stat.st_size)
+        # A checkout can touch a file without changing it.
+        or entry['hash'] == _hash_file(filename)
+    ):
+      entry['mtime'], entry['size'] = stat.st_mtime_ns, stat.st_size
+      self.hits += 1
+      return [importlab.parsepy.ImportStatement(*i) for i in entry['imports']]
+    self.misses += 1
+    return None
+
+  def parse(self, filename, python_version):
+    """Parses the file and caches its import statements."""
+    stat = _stat(filename)
+    digest = _hash_file(filename)
+    imports = importlab.parsepy.get_imports(filename, python_version)
+    self._entries[filename] = {
+        'mtime': stat.st_mtime_ns,
+        'size': stat.st_size,
+        'hash': digest,
+        # Everything but the source.
+        'imports': [list(i[:4]) for i in imports],
+    }
+    return imports
+
+  def reparse(self, filename, python_version):
+    """Parses a cached file again to get the sources of its imports."""
+    self.reparses += 1
+    return self.parse(filename, python_version)
+
+
+class CachedImportGraph(importlab.graph.ImportGraph):
+  """An ImportGraph that gets the imports of files from an ImportCache."""
+
+  def __init__(self, env, cache):
+    super().__init__(env)
+    self.cache = cache
+
+  @classmethod
+  def create(cls, env, filenames, trim=False, *, cache):
+    """Creates a final graph and saves the updated cache.
+
+    Args:
+      env: An importlab.environment.Environment object.
+      filenames: A list of filenames.
+      trim: Whether to trim the dependencies of builtin and system files.
+      cache: An ImportCache.
+
+    Returns:
+      An immutable graph with the recursive dependencies of all the files in
+      filenames.
+    """
+    import_graph = cls(env, cache)
+    for filename in filenames:
+      import_graph.add_file_recursive(path_utils.abspath(filename), trim)
+    import_graph.build()
+    logging.info('Import cache: %d hits, %d misses, %d reparsed', cache.hits,
+                 cache.misses, cache.reparses)
+    try:
+      cache.save()
+    except OSError as e:
+      logging.warning('Could not save the import cache: %s', e)
+    return import_graph
+
+  def get_file_deps(self, filename):
+    # Same as importlab.graph.ImportGraph.get_file_deps, but with cached
+    # imports.
+    python_version = self.env.python_version
+    imports = self.cache.lookup(filename)
+    if imports is None:
+      imports = self.cache.parse(filename, python_version)
+      resolved, unresolved = self._resolve_imports(filename, imports)
+    else:
+      resolved, unresolved = self._resolve_imports(filename, imports)
+      if unresolved:
+        # Resolving an import outside of the pythonpath needs its source.
+        imports = self.cache.reparse(filename, python_version)
+        resolved, unresolved = self._resolve_imports(filename, imports)
+    resolved_paths = []
+    for f in resolved:
+      full_path = path_utils.abspath(f.path)
+      resolved_paths.append(full_path)
+      self.provenance[full_path] = f
+    return (resolved_paths, unresolved)
+
+  def _resolve_imports(self, filename, imports):
+    """Resolves imports to importlab.resolve.ResolvedFile objects."""
+    resolved = []
+    unresolved = []
+    r = importlab.resolve.Resolver(self.path, self.provenance[filename])
+    for imp in imports:
+      try:
+        f = r.resolve_import(imp)
+      except importlab.resolve.ImportException:
+        unresolved.append(imp)
+        continue
+      if not isinstance(f, importlab.resolve.Builtin):
+        resolved.append(f)
+    return (resolved, unresolved)
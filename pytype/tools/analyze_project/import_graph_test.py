@@ -0,0 +1,142 @@
+"""Tests for import_graph.py."""
+
+import os
+import sys
+
+from importlab import environment
+from importlab import fs
+
+from pytype.platform_utils import path_utils
+from pytype.tests import test_utils
+from pytype.tools.analyze_project import import_graph
+
+import unittest
+
+
+class ImportGraphTest(unittest.TestCase):
+  """Tests for CachedImportGraph and ImportCache."""
+
+  def setUp(self):
+    super().setUp()
+    self.python_version = sys.version_info[:2]
+
+  def _make_cache(self, d, pythonpath=('.',)):
+    return import_graph.ImportCache(
+        path_utils.join(d.path, '.pytype', import_graph.CACHE_FILENAME),
+        self.python_version, pythonpath)
+
+  def _make_graph(self, d, filenames, cache):
+    path = fs.Path()
+    path.add_path(d.path, 'os')
+    env = environment.Environment(path, self.python_version)
+    return import_graph.CachedImportGraph.create(
+        env, [path_utils.join(d.path, f) for f in filenames], trim=True,
+        cache=cache)
+
+  def _deps(self, graph):
+    return {
+        path_utils.basename(k): sorted(path_utils.basename(v) for v in vs)
+        for k, vs in graph.deps_list()
+    }
+
+  def test_graph(self):
+    with test_utils.Tempdir() as d:
+      d.create_file('foo.py', 'import bar\nimport missing')
+      d.create_file('bar.py', 'import baz')
+      d.create_file('baz.py')
+      cache = self._make_cache(d)
+      graph = self._make_graph(d, ['foo.py'], cache)
+      self.assertEqual(
+          self._deps(graph),
+          {'foo.py': ['bar.py'], 'bar.py': ['baz.py'], 'baz.py': []})
+      self.assertEqual(
+          {imp.name for imp in graph.get_all_unresolved()}, {'missing'})
+      self.assertEqual((cache.hits, cache.misses), (0, 3))
+
+  def test_reuse(self):
+    with test_utils.Tempdir() as d:
+      d.create_file('foo.py', 'import bar')
+      d.create_file('bar.py')
+      self._make_graph(d, ['foo.py'], self._make_cache(d))
+      d.create_file('bar.py', 'import baz')
+      d.create_file('baz.py')
+      cache = self._make_cache(d)
+      graph = self._make_graph(d, ['foo.py'], cache)
+      self.assertEqual(
+          self._deps(graph),
+          {'foo.py': ['bar.py'], 'bar.py': ['baz.py'], 'baz.py': []})
+      # foo.py is unchanged, bar.py was modified and baz.py is new.
+      self.assertEqual((cache.hits, cache.misses), (1, 2))
+
+  def test_touched_file(self):
+    with test_utils.Tempdir() as d:
+      foo = d.create_file('foo.py', 'import sys')
+      self._make_graph(d, ['foo.py'], self._make_cache(d))
+      stat = os.stat(foo)
+      os.utime(foo, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+      cache = self._make_cache(d)
+      self._make_graph(d, ['foo.py'], cache)
+      self.assertEqual((cache.hits, cache.misses), (1, 0))
+
+  def test_new_module_shadows_import(self):
+    # Imports are resolved on every run, so the cache can't go stale when a
+    # file is added.
+    with test_utils.Tempdir() as d:
+      d.create_file('foo.py', 'import bar')
+      graph = self._make_graph(d, ['foo.py'], self._make_cache(d))
+      self.assertEqual(self._deps(graph), {'foo.py': []})
+      d.create_file('bar.py')
+      graph = self._make_graph(d, ['foo.py'], self._make_cache(d))
+      self.assertEqual(
+          self._deps(graph), {'foo.py': ['bar.py'], 'bar.py': []})
+
+  def test_new_submodule(self):
+    # `from pkg import c` imports pkg/__init__.py until pkg/c.py is added.
+    with test_utils.Tempdir() as d:
+      d.create_file('foo.py', 'from pkg import c')
+      d.create_file('pkg/__init__.py', 'c = 0')
+      graph = self._make_graph(d, ['foo.py'], self._make_cache(d))
+      self.assertEqual(
+          self._deps(graph), {'foo.py': ['__init__.py'], '__init__.py': []})
+      d.create_file('pkg/c.py')
+      cache = self._make_cache(d)
+      graph = self._make_graph(d, ['foo.py'], cache)
+      self.assertEqual(self._deps(graph)['foo.py'], ['c.py'])
+      self.assertEqual((cache.hits, cache.misses, cache.reparses), (1, 1, 0))
+
+  def test_reparse_system_import(self):
+    # The file of a module outside the pythonpath is found by python itself,
+    # which the cache doesn't remember.
+    with test_utils.Tempdir() as d:
+      d.create_file('foo.py', 'import json')
+      graph = self._make_graph(d, ['foo.py'], self._make_cache(d))
+      deps = self._deps(graph)
+      cache = self._make_cache(d)
+      graph = self._make_graph(d, ['foo.py'], cache)
+      self.assertEqual(self._deps(graph), deps)
+      self.assertEqual(deps['foo.py'], ['__init__.py'])
+      self.assertEqual((cache.hits, cache.misses, cache.reparses), (1, 0, 1))
+
+  def test_different_pythonpath(self):
+    with test_utils.Tempdir() as d:
+      d.create_file('foo.py')
+      self._make_graph(d, ['foo.py'], self._make_cache(d))
+      cache = self._make_cache(d, pythonpath=('src',))
+      self._make_graph(d, ['foo.py'], cache)
+      self.assertEqual((cache.hits, cache.misses), (0, 1))
+
+  def test_corrupt_cache(self):
+    with test_utils.Tempdir() as d:
+      d.create_file('foo.py')
+      d.create_file(path_utils.join('.pytype', import_graph.CACHE_FILENAME),
+                    '{not json')
+      cache = self._make_cache(d)
+      self._make_graph(d, ['foo.py'], cache)
+      self.assertEqual((cache.hits, cache.misses), (0, 1))
+      cache = self._make_cache(d)
+      self._make_graph(d, ['foo.py'], cache)
+      self.assertEqual((cache.hits, cache.misses), (1, 0))
+
+
+if __name__ == '__main__':
+  unittest.main()
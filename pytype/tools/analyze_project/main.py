@@ -5,7 +5,6 @@ import sys
 
 import importlab.environment
 import importlab.fs
-import importlab.graph
 import importlab.output
 
 from pytype import io
@@ -15,6 +14,7 @@ from pytype.tools import environment
 from pytype.tools import tool_utils
 from pytype.tools.analyze_project import config
 from pytype.tools.analyze_project import environment as analyze_project_env
+from pytype.tools.analyze_project import import_graph as import_graph_lib
 from pytype.tools.analyze_project import parse_args
 from pytype.tools.analyze_project import pytype_runner
 
@@ -58,7 +58,11 @@ def main():
   typeshed = environment.initialize_typeshed_or_die()
   env = analyze_project_env.create_importlab_environment(conf, typeshed)
   print('Computing dependencies')
-  import_graph = importlab.graph.ImportGraph.create(env, conf.inputs, trim=True)
+  cache = import_graph_lib.ImportCache(
+      path_utils.join(conf.output, import_graph_lib.CACHE_FILENAME),
+      env.python_version, conf.pythonpath)
+  import_graph = import_graph_lib.CachedImportGraph.create(
+      env, conf.inputs, trim=True, cache=cache)
 
   if args.tree:
     print('Source tree:')
@@ -141,6 +141,9 @@ def make_parser():
       (('-x', '--exclude'), {'nargs': '*', 'action': 'flatten'}),
       (('inputs',), {'metavar': 'input', 'nargs': '*', 'action': 'flatten'}),
       (('-k', '--keep-going'), {'action': 'store_true', 'type': None}),
+      (('--fork-server',), {'action': 'store_true', 'type': None}),
+      (('--single-process-cycles',), {'action': 'store_true', 'type': None}),
+      (('--timing-report',), {'action': 'store_true', 'type': None}),
       (('-j', '--jobs'), {'action': 'store', 'metavar': 'N'}),
       (('--platform',),),
       (('-P', '--pythonpath'),),
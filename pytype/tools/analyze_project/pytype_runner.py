@@ -4,8 +4,11 @@ import collections
 from collections.abc import Iterable, Sequence
 import importlib
 import itertools
+import json
 import logging
+import os
 import re
+import statistics
 import subprocess
 import sys
 
@@ -26,16 +29,22 @@ class Action:
   CHECK = 'check'
   INFER = 'infer'
   GENERATE_DEFAULT = 'generate default'
+  # Checks or infers all modules of an import cycle at once.
+  CYCLE = 'cycle'
 
 
 class Stage:
   SINGLE_PASS = 'single pass'
   FIRST_PASS = 'first pass'
   SECOND_PASS = 'second pass'
+  CYCLE = 'cycle'
 
 
 FIRST_PASS_SUFFIX = '-1'
 
+# The number of modules listed in the timing summary.
+TIMING_SUMMARY_SIZE = 10
+
 
 def _get_executable(binary, module=None):
   """Get the path to the executable with the given name."""
@@ -161,6 +170,105 @@ def escape_ninja_path(path: str):
   return re.sub(r'(?P<char>[\n :$])', r'$\g<char>', path)
 
 
+def _read_metrics(metrics_file):
+  """Reads a metrics file that pytype-single wrote with --metrics.
+
+  The file is a JSON dump of pytype.metrics objects. It's read directly so that
+  the ninja build doesn't need to import pytype.
+
+  Args:
+    metrics_file: The metrics file.
+
+  Returns:
+    A dictionary of metric names to the attributes of the metrics.
+  """
+  with open(metrics_file) as f:
+    return {attrs['_name']: attrs for _, attrs in json.load(f)}
+
+
+def _summarize_metrics(name, metrics):
+  """Summarizes the metrics of one build statement for the timing report."""
+  def get(metric, attr, default=0):
+    return metrics.get(metric, {}).get(attr, default)
+  # The call cache counts are keyed by "<function name>:<outcome>".
+  outcomes = collections.Counter()
+  for key, count in get('interpreter_function_call_cache', '_counts',
+                        {}).items():
+    outcomes[key.rpartition(':')[2]] += count
+  return {
+      'name': name,
+      'wall_time': get('wall_time', '_total'),
+      'cpu_time': get('total_time', '_total'),
+      'peak_memory_kb': get('peak_memory', '_kilobytes', None),
+      'opcodes': get('vm_opcode', '_total'),
+      'call_cache_hits': outcomes['hit'] + outcomes['subsumed'],
+      'call_cache_misses': outcomes['miss'],
+  }
+
+
+def _read_ninja_log(ninja_log):
+  """Reads the build times of outputs from a .ninja_log file.
+
+  Args:
+    ninja_log: The log, whose lines after the header are
+      "<start ms>\t<end ms>\t<mtime>\t<output>\t<command hash>".
+
+  Returns:
+    A dictionary of outputs to their latest build times in seconds.
+  """
+  timings = {}
+  with open(ninja_log) as f:
+    for line in f:
+      if line.startswith('#'):
+        continue
+      fields = line.rstrip('\n').split('\t')
+      if len(fields) != 5:
+        continue
+      start, end, _, output, _ = fields
+      try:
+        timings[output] = (int(end) - int(start)) / 1000
+      except ValueError:
+        continue
+  return timings
+
+
+def get_priorities(build_statements, timings):
+  """Computes the scheduling priorities of build statements.
+
+  The priority of a build statement is the predicted time of the longest chain
+  of build statements that starts with it, so that the statements on the
+  critical path of the build, and slow statements with no dependents, start as
+  early as possible. A statement's time is predicted from the time that it
+  took in earlier runs, and is the median of the known times otherwise.
+
+  Args:
+    build_statements: A sequence of (description, action, ninja variables,
+      outputs, deps), in dependency order.
+    timings: A dictionary of the first output of a build statement to its time
+      in an earlier run.
+
+  Returns:
+    The list of priorities, in the order of build_statements.
+  """
+  known = list(timings.values())
+  default_time = statistics.median(known) if known else 1.0
+  output_to_index = {}
+  for i, (_, _, _, outputs, _) in enumerate(build_statements):
+    for output in outputs:
+      output_to_index[output] = i
+  # The longest predicted time of the chains that start with a dependent.
+  dependents_time = [0.0] * len(build_statements)
+  priorities = [0.0] * len(build_statements)
+  for i in reversed(range(len(build_statements))):
+    _, _, _, outputs, deps = build_statements[i]
+    priorities[i] = timings.get(outputs[0], default_time) + dependents_time[i]
+    for dep in deps:
+      j = output_to_index.get(dep)
+      if j is not None:
+        dependents_time[j] = max(dependents_time[j], priorities[i])
+  return priorities
+
+
 def get_imports_map(deps, module_to_imports_map, module_to_output):
   """Get a short path -> full path map for the given deps."""
   imports_map = {}
@@ -182,11 +290,20 @@ class PytypeRunner:
     self.platform = conf.platform
     self.pyi_dir = path_utils.join(conf.output, 'pyi')
     self.imports_dir = path_utils.join(conf.output, 'imports')
+    self.metrics_dir = path_utils.join(conf.output, 'metrics')
+    self.timing_report_file = path_utils.join(conf.output, 'timing_report.json')
+    self.timings_file = path_utils.join(conf.output, 'timings.json')
     self.ninja_file = path_utils.join(conf.output, 'build.ninja')
     self.custom_options = [
         (k, getattr(conf, k)) for k in set(conf.__slots__) - set(config.ITEMS)]
     self.keep_going = conf.keep_going
     self.jobs = conf.jobs
+    self.fork_server = conf.fork_server
+    self.single_process_cycles = conf.single_process_cycles
+    self.timing_report = conf.timing_report
+    # (description, action, ninja variables, outputs, deps) for each build
+    # statement.
+    self.build_statements = []
 
   def set_custom_options(self, flags_with_values, binary_flags, report_errors):
     """Merge self.custom_options into flags_with_values and binary_flags."""
@@ -205,30 +322,52 @@ class PytypeRunner:
       elif value:
         flags_with_values[arg_info.flag] = str(value)
 
-  def get_pytype_command_for_ninja(self, report_errors):
-    """Get the command line for running pytype."""
-    exe = PYTYPE_SINGLE
+  def _get_pytype_command(self, flags_with_values, binary_flags,
+                          report_errors):
     flags_with_values = {
-        '--imports_info': '$imports',
+        **flags_with_values,
         '-V': self.python_version,
-        '-o': '$out',
-        '--module-name': '$module',
         '--platform': self.platform,
     }
-    binary_flags = {
-        '--quick',
-        '--analyze-annotated' if report_errors else '--no-report-errors',
-        '--nofail',
-    }
+    binary_flags = binary_flags | {'--quick', '--nofail'}
     self.set_custom_options(flags_with_values, binary_flags, report_errors)
     # Order the flags so that ninja recognizes commands across runs.
     return (
-        exe +
+        PYTYPE_SINGLE +
         list(sum(sorted(flags_with_values.items()), ())) +
-        sorted(binary_flags) +
-        ['$in']
+        sorted(binary_flags)
     )
 
+  def get_pytype_command_for_ninja(self, report_errors):
+    """Get the command line for running pytype."""
+    flags_with_values = {
+        '--imports_info': '$imports',
+        '-o': '$out',
+        '--module-name': '$module',
+    }
+    if self.timing_report:
+      flags_with_values['--metrics'] = '$metrics'
+    binary_flags = {
+        '--analyze-annotated' if report_errors else '--no-report-errors'}
+    return self._get_pytype_command(
+        flags_with_values, binary_flags, report_errors) + ['$in']
+
+  def get_pytype_cycle_command_for_ninja(self):
+    """Get the command line for running pytype over an import cycle.
+
+    The modules of the cycle are listed in a manifest, which also says which of
+    them to report errors for.
+
+    Returns:
+      The command line.
+    """
+    flags_with_values = {'--batch-manifest': '$manifest'}
+    if self.timing_report:
+      flags_with_values['--metrics'] = '$metrics'
+    return self._get_pytype_command(
+        flags_with_values, {'--batch-cycle', '--analyze-annotated'},
+        report_errors=True)
+
   def make_imports_dir(self):
     try:
       file_utils.makedirs(self.imports_dir)
@@ -237,6 +376,24 @@ class PytypeRunner:
       return False
     return True
 
+  def make_metrics_dir(self):
+    """Creates an empty metrics directory.
+
+    Metrics files from earlier runs are removed, so that the timing report only
+    covers the build statements that this run executes.
+
+    Returns:
+      True if the directory could be created, else False.
+    """
+    try:
+      file_utils.makedirs(self.metrics_dir)
+      for filename in os.listdir(self.metrics_dir):
+        os.remove(path_utils.join(self.metrics_dir, filename))
+    except OSError:
+      logging.error('Could not create metrics directory: %s', self.metrics_dir)
+      return False
+    return True
+
   def write_default_pyi(self):
     """Write a default pyi file."""
     output = path_utils.join(self.imports_dir, 'default.pyi')
@@ -292,6 +449,12 @@ class PytypeRunner:
           modules.append((module, action))
       if len(modules) == 1:
         yield modules[0] + (deps, Stage.SINGLE_PASS)
+      elif self.single_process_cycles:
+        # The modules of the cycle are analyzed together, against the pyi files
+        # of the cycle's dependencies.
+        deps += tuple(module for module, _ in modules)
+        for module, action in modules:
+          yield module, action, deps, Stage.CYCLE
       else:
         # If we have a cycle we run pytype over the files twice. So that we
         # don't fail on missing dependencies, we'll ignore errors the first
@@ -322,6 +485,26 @@ class PytypeRunner:
             '  description = {action} $module\n'.format(
                 action=action, command=command)
         )
+      if self.single_process_cycles:
+        command = ' '.join(self.get_pytype_cycle_command_for_ninja())
+        logging.info('%s command: %s', Action.CYCLE, command)
+        f.write(
+            'rule {action}\n'
+            '  command = {command}\n'
+            '  description = {action} $module\n'.format(
+                action=Action.CYCLE, command=command)
+        )
+
+  def get_output(self, module, suffix=''):
+    return path_utils.join(self.pyi_dir,
+                           _module_to_output_path(module) + '.pyi' + suffix)
+
+  def get_metrics_file(self, name):
+    return path_utils.join(self.metrics_dir, name + '.json')
+
+  def _write_metrics_variable(self, f, name):
+    if self.timing_report:
+      f.write(f'  metrics = {escape_ninja_path(self.get_metrics_file(name))}\n')
 
   def write_build_statement(self, module, action, deps, imports, suffix):
     """Write a build statement for the given module.
@@ -336,8 +519,7 @@ class PytypeRunner:
     Returns:
       The expected output of the build statement.
     """
-    output = path_utils.join(self.pyi_dir,
-                             _module_to_output_path(module) + '.pyi' + suffix)
+    output = self.get_output(module, suffix)
     logging.info('%s %s\n  imports: %s\n  deps: %s\n  output: %s',
                  action, module.name, imports, deps, output)
     if deps:
@@ -354,8 +536,66 @@ class PytypeRunner:
                   deps=deps,
                   imports=escape_ninja_path(imports),
                   module=module.name))
+      self._write_metrics_variable(f, module.name + suffix)
     return output
 
+  def write_cycle_manifest(self, modules, imports):
+    """Write a manifest for analyzing an import cycle with pytype-single.
+
+    Args:
+      modules: The (module, action) pairs of the cycle.
+      imports: The imports file that all modules of the cycle share.
+
+    Returns:
+      The manifest.
+    """
+    output = path_utils.join(self.imports_dir,
+                             modules[0][0].name + '.cycle')
+    with open(output, 'w') as f:
+      for module, action in modules:
+        entry = {
+            'input': module.full_path,
+            'output': self.get_output(module),
+            'module_name': module.name,
+            'imports_info': imports,
+            'report_errors': action == Action.CHECK,
+        }
+        f.write(json.dumps(entry) + '\n')
+    return output
+
+  def write_cycle_build_statement(self, modules, deps, manifest):
+    """Write a build statement for an import cycle.
+
+    Args:
+      modules: The modules of the cycle.
+      deps: The cycle's dependencies.
+      manifest: The manifest from write_cycle_manifest().
+
+    Returns:
+      The expected outputs of the build statement.
+    """
+    outputs = [self.get_output(module) for module in modules]
+    names = ' '.join(module.name for module in modules)
+    logging.info('%s %s\n  manifest: %s\n  deps: %s\n  outputs: %s',
+                 Action.CYCLE, names, manifest, deps, outputs)
+    if deps:
+      deps = ' | ' + ' '.join(escape_ninja_path(dep) for dep in deps)
+    else:
+      deps = ''
+    with open(self.ninja_file, 'a') as f:
+      f.write('build {outputs}: {action} {inputs}{deps}\n'
+              '  manifest = {manifest}\n'
+              '  module = {module}\n'.format(
+                  outputs=' '.join(escape_ninja_path(o) for o in outputs),
+                  action=Action.CYCLE,
+                  inputs=' '.join(
+                      escape_ninja_path(module.full_path) for module in modules),
+                  deps=deps,
+                  manifest=escape_ninja_path(manifest),
+                  module=names))
+      self._write_metrics_variable(f, modules[0].name + '.cycle')
+    return outputs
+
   def setup_build(self):
     """Write out the full build.ninja file.
 
@@ -364,18 +604,32 @@ class PytypeRunner:
     """
     if not self.make_imports_dir():
       return set()
+    if self.timing_report and not self.make_metrics_dir():
+      return set()
     default_output = self.write_default_pyi()
     self.write_ninja_preamble()
+    self.build_statements = []
     files = set()
     module_to_imports_map = {}
     module_to_output = {}
+    cycle = []  # (module, action) pairs of the cycle being collected
+    cycle_deps = ()
     for module, action, deps, stage in self.yield_sorted_modules():
+      if cycle and (stage != Stage.CYCLE or deps != cycle_deps):
+        files |= self.setup_cycle_build(
+            cycle, cycle_deps, module_to_imports_map, module_to_output,
+            default_output)
+        cycle = []
       if files >= self.filenames:
         logging.info('skipped: %s %s (%s)', action, module.name, stage)
         continue
       if action == Action.GENERATE_DEFAULT:
         module_to_output[module] = default_output
         continue
+      if stage == Stage.CYCLE:
+        cycle.append((module, action))
+        cycle_deps = deps
+        continue
       if stage == Stage.SINGLE_PASS:
         files.add(module.full_path)
         suffix = ''
@@ -391,10 +645,84 @@ class PytypeRunner:
       # Don't depend on default.pyi, since it's regenerated every time.
       deps = tuple(module_to_output[m] for m in deps
                    if module_to_output[m] != default_output)
-      module_to_output[module] = self.write_build_statement(
+      output = module_to_output[module] = self.write_build_statement(
           module, action, deps, imports, suffix)
+      variables = {
+          '$imports': imports,
+          '$out': output,
+          '$module': module.name,
+          '$in': module.full_path,
+      }
+      if self.timing_report:
+        variables['$metrics'] = self.get_metrics_file(module.name + suffix)
+      self.build_statements.append(
+          (f'{action} {module.name}', action, variables, (output,), deps))
+    if cycle:
+      files |= self.setup_cycle_build(
+          cycle, cycle_deps, module_to_imports_map, module_to_output,
+          default_output)
     return files
 
+  def setup_cycle_build(self, cycle, deps, module_to_imports_map,
+                        module_to_output, default_output):
+    """Write out the build statement for an import cycle.
+
+    Args:
+      cycle: The (module, action) pairs of the cycle.
+      deps: The dependencies of the cycle, including the cycle itself.
+      module_to_imports_map: The imports maps of the modules so far.
+      module_to_output: The outputs of the modules so far.
+      default_output: The default pyi.
+
+    Returns:
+      The files of the cycle.
+    """
+    modules = [module for module, _ in cycle]
+    deps = tuple(m for m in deps if m not in modules)
+    imports_map = get_imports_map(deps, module_to_imports_map, module_to_output)
+    for module in modules:
+      module_to_imports_map[module] = imports_map
+    imports = self.write_imports(modules[0].name, imports_map, '')
+    manifest = self.write_cycle_manifest(cycle, imports)
+    deps = tuple(module_to_output[m] for m in deps
+                 if module_to_output[m] != default_output)
+    outputs = self.write_cycle_build_statement(modules, deps, manifest)
+    module_to_output.update(zip(modules, outputs))
+    names = ' '.join(module.name for module in modules)
+    variables = {'$manifest': manifest}
+    if self.timing_report:
+      variables['$metrics'] = self.get_metrics_file(modules[0].name + '.cycle')
+    self.build_statements.append((
+        f'{Action.CYCLE} {names}', Action.CYCLE, variables, tuple(outputs),
+        deps))
+    return {module.full_path for module in modules}
+
+  def load_timings(self):
+    """Loads the build times of the build statements from earlier runs.
+
+    Returns:
+      A dictionary of the first output of a build statement to its time in
+      seconds.
+    """
+    try:
+      with open(self.timings_file) as f:
+        timings = json.load(f)
+    except (OSError, ValueError):
+      return {}
+    if not isinstance(timings, dict):
+      return {}
+    return timings
+
+  def save_timings(self, timings):
+    """Saves the build times of the current build statements."""
+    outputs = {outputs[0] for _, _, _, outputs, _ in self.build_statements}
+    timings = {k: v for k, v in timings.items() if k in outputs}
+    try:
+      with open(self.timings_file, 'w') as f:
+        json.dump(timings, f, indent=2, sort_keys=True)
+    except OSError as e:
+      logging.warning('Could not save build times: %s', e)
+
   def build(self):
     """Execute the build.ninja file."""
     # -k N     keep going until N jobs fail (0 means infinity)
@@ -411,8 +739,85 @@ class PytypeRunner:
       command.append('-v')
     ret = subprocess.call(command)
     print(f'Leaving directory {c!r}')
+    # ninja schedules by the build times in its own log, which the fork server
+    # can use in later runs.
+    ninja_log = path_utils.join(path_utils.dirname(self.ninja_file),
+                                '.ninja_log')
+    try:
+      ninja_timings = _read_ninja_log(ninja_log)
+    except OSError:
+      ninja_timings = {}
+    timings = self.load_timings()
+    for _, _, _, outputs, _ in self.build_statements:
+      if outputs[0] in ninja_timings:
+        timings[outputs[0]] = ninja_timings[outputs[0]]
+    self.save_timings(timings)
     return ret
 
+  def build_with_fork_server(self):
+    """Run the build statements in forked children of a prewarmed process."""
+    # The fork server imports most of pytype, which the ninja build doesn't
+    # need.
+    from pytype.tools.analyze_project import fork_server  # pylint: disable=g-import-not-at-top
+
+    commands = {
+        Action.INFER: self.get_pytype_command_for_ninja(report_errors=False),
+        Action.CHECK: self.get_pytype_command_for_ninja(report_errors=True),
+        Action.CYCLE: self.get_pytype_cycle_command_for_ninja(),
+    }
+    timings = self.load_timings()
+    priorities = get_priorities(self.build_statements, timings)
+    jobs = []
+    for (name, action, variables, outputs, deps), priority in zip(
+        self.build_statements, priorities):
+      args = [variables.get(arg, arg)
+              for arg in commands[action][len(PYTYPE_SINGLE):]]
+      jobs.append(fork_server.Job(
+          name=name, args=args, outputs=outputs, deps=deps, priority=priority))
+    server = fork_server.ForkServer(jobs, self.jobs, self.keep_going)
+    ret = server.run()
+    for name, _, _, outputs, _ in self.build_statements:
+      result = server.results.get(name)
+      if result and not result.exit_status:
+        timings[outputs[0]] = result.wall_time
+    self.save_timings(timings)
+    return ret
+
+  def write_timing_report(self):
+    """Reports the time and memory of the build statements that ran.
+
+    Build statements that were up to date didn't write a metrics file, so they
+    are left out.
+
+    Returns:
+      The report, sorted by descending wall time.
+    """
+    report = []
+    for name, _, variables, _, _ in self.build_statements:
+      metrics_file = variables['$metrics']
+      if not path_utils.exists(metrics_file):
+        continue
+      try:
+        metrics = _read_metrics(metrics_file)
+      except (OSError, ValueError) as e:
+        logging.warning('Could not read metrics file %s: %s', metrics_file, e)
+        continue
+      report.append(_summarize_metrics(name, metrics))
+    report.sort(key=lambda entry: entry['wall_time'], reverse=True)
+    with open(self.timing_report_file, 'w') as f:
+      json.dump(report, f, indent=2)
+    if report:
+      print('Slowest files (wall time, CPU time, peak memory):')
+      for entry in report[:TIMING_SUMMARY_SIZE]:
+        if entry['peak_memory_kb'] is None:
+          memory = '?'
+        else:
+          memory = f"{entry['peak_memory_kb'] / 1024:.1f}MB"
+        print(f"  {entry['wall_time']:.2f}s  {entry['cpu_time']:.2f}s  "
+              f"{memory}  {entry['name']}")
+    print(f'Timing report: {self.timing_report_file}')
+    return report
+
   def run(self):
     """Run pytype over the project."""
     logging.info('------------- Starting pytype run. -------------')
@@ -420,7 +825,12 @@ class PytypeRunner:
     num_sources = len(self.filenames & files_to_analyze)
     print('Analyzing %d sources with %d local dependencies' %
           (num_sources, len(files_to_analyze) - num_sources))
-    ret = self.build()
+    if self.fork_server and hasattr(os, 'fork'):
+      ret = self.build_with_fork_server()
+    else:
+      ret = self.build()
+    if self.timing_report:
+      self.write_timing_report()
     if not ret:
       print('Success: no errors found')
     return ret
@@ -3,10 +3,12 @@
 import collections
 from collections.abc import Sequence
 import dataclasses
+import json
 import re
 
 from pytype import config as pytype_config
 from pytype import file_utils
+from pytype import metrics
 from pytype import module_utils
 from pytype.platform_utils import path_utils
 from pytype.tests import test_utils
@@ -376,6 +378,11 @@ class TestGetRunCmd(TestBase):
     self.assertTrue(options.report_errors)
     self.assertTrue(options.analyze_annotated)
 
+  def test_metrics(self):
+    self.assertFalse(self.get_basic_options().metrics)
+    self.runner.timing_report = True
+    self.assertEqual(self.get_basic_options().metrics, '$metrics')
+
   def test_custom_option(self):
     custom_conf = self.parser.config_from_defaults()
     custom_conf.disable = ['import-error', 'name-error']
@@ -384,6 +391,18 @@ class TestGetRunCmd(TestBase):
     options = self.get_options(args)
     self.assertEqual(options.disable, ['import-error', 'name-error'])
 
+  def test_cycle(self):
+    args = self.runner.get_pytype_cycle_command_for_ninja()
+    args = args[len(pytype_runner.PYTYPE_SINGLE):]
+    self.assertIn('$manifest', args)
+    self.assertNotIn('$in', args)
+    options = pytype_config.Options(
+        [arg.replace('$manifest', 'manifest') for arg in args],
+        command_line=True)
+    self.assertTrue(options.batch_cycle)
+    self.assertEqual(options.batch_manifest, 'manifest')
+    self.assertTrue(options.report_errors)
+
   def test_custom_option_no_report_errors(self):
     custom_conf = self.parser.config_from_defaults()
     # If the --precise-return flag is ever removed, replace it with another
@@ -493,6 +512,22 @@ class TestYieldSortedModules(TestBase):
         ],
     )
 
+  def test_single_process_cycle(self):
+    conf = self.parser.config_from_defaults()
+    d = self.normalize('foo/')
+    conf.pythonpath = [d]
+    conf.single_process_cycles = True
+    src = Module(d, 'bar.py', 'bar')
+    dep = Module(d, 'baz.py', 'baz')
+    runner = make_runner([src], [((dep, src), ())], conf)
+    self.assert_sorted_modules_equal(
+        runner.yield_sorted_modules(),
+        [
+            (dep, Action.INFER, (dep, src), Stage.CYCLE),
+            (src, Action.CHECK, (dep, src), Stage.CYCLE),
+        ],
+    )
+
   def test_system_dep(self):
     conf = self.parser.config_from_defaults()
     d = self.normalize('foo/')
@@ -839,6 +874,147 @@ class TestNinjaBody(TestBase):
         ),
     )
 
+  def test_single_process_cycle(self):
+    src = Module('', 'foo.py', 'foo')
+    dep = Module('', 'bar.py', 'bar')
+    user = Module('', 'baz.py', 'baz')
+    self.conf.single_process_cycles = True
+    with test_utils.Tempdir() as d:
+      self.conf.output = d.path
+      runner = make_runner(
+          [src, user], [((dep, src), ()), ((user,), (dep, src))], self.conf)
+      runner.setup_build()
+      with open(runner.ninja_file) as f:
+        body = f.read().splitlines()[_PREAMBLE_LENGTH + 3:]
+      manifest = path_utils.join(runner.imports_dir, 'bar.cycle')
+      with open(manifest) as f:
+        entries = [json.loads(line) for line in f]
+      with open(path_utils.join(runner.imports_dir, 'baz.imports')) as f:
+        user_imports = sorted(f.read().splitlines())
+    bar_pyi = path_utils.join(runner.pyi_dir, 'bar.pyi')
+    foo_pyi = path_utils.join(runner.pyi_dir, 'foo.pyi')
+    self.assertEqual(body[:3], [
+        f'build {bar_pyi} {foo_pyi}: cycle bar.py foo.py',
+        f'  manifest = {manifest}',
+        '  module = bar foo',
+    ])
+    imports = path_utils.join(runner.imports_dir, 'bar.imports')
+    self.assertEqual(entries, [
+        {'input': 'bar.py', 'output': bar_pyi, 'module_name': 'bar',
+         'imports_info': imports, 'report_errors': False},
+        {'input': 'foo.py', 'output': foo_pyi, 'module_name': 'foo',
+         'imports_info': imports, 'report_errors': True},
+    ])
+    self.assertBuildStatementMatches(
+        body[3:],
+        ExpectedBuildStatement(
+            output=path_utils.join(runner.pyi_dir, 'baz.pyi'),
+            action=Action.CHECK,
+            input='baz.py',
+            deps=[bar_pyi, foo_pyi],
+            imports=path_utils.join(runner.imports_dir, 'baz.imports'),
+            module='baz',
+        ),
+    )
+    self.assertEqual(user_imports, [f'bar {bar_pyi}', f'foo {foo_pyi}'])
+
+  def test_timing_report(self):
+    src = Module('', 'foo.py', 'foo')
+    dep = Module('', 'bar.py', 'bar')
+    self.conf.timing_report = True
+    with test_utils.Tempdir() as d:
+      self.conf.output = d.path
+      runner = make_runner([src], [((dep,), ()), ((src,), (dep,))], self.conf)
+      stale = d.create_file(path_utils.join('metrics', 'stale.json'), '[]')
+      runner.setup_build()
+      self.assertFalse(path_utils.exists(stale))
+      with open(runner.ninja_file) as f:
+        body = f.read().splitlines()[_PREAMBLE_LENGTH:]
+      bar_metrics = path_utils.join(runner.metrics_dir, 'bar.json')
+      foo_metrics = path_utils.join(runner.metrics_dir, 'foo.json')
+      self.assertEqual(body[3], f'  metrics = {bar_metrics}')
+      self.assertEqual(body[7], f'  metrics = {foo_metrics}')
+      self.assertEqual(
+          [variables['$metrics'] for _, _, variables, _, _
+           in runner.build_statements], [bar_metrics, foo_metrics])
+      # Only foo is rebuilt.
+      metrics._prepare_for_test()
+      with metrics.WallStopWatch('wall_time'), metrics.PeakMemory('peak_memory'):
+        pass
+      calls = metrics.MapCounter('interpreter_function_call_cache')
+      for key in ('f:hit', 'f:miss', 'g:subsumed', 'g:uncacheable'):
+        calls.inc(key)
+      with open(foo_metrics, 'w') as f:
+        metrics.dump_all([metrics.get_metric('wall_time', None),
+                          metrics.get_metric('peak_memory', None), calls], f)
+      report = runner.write_timing_report()
+      with open(runner.timing_report_file) as f:
+        self.assertEqual(json.load(f), report)
+    self.assertEqual(len(report), 1)
+    entry = report[0]
+    self.assertEqual(entry['name'], 'check foo')
+    self.assertGreaterEqual(entry['wall_time'], 0)
+    self.assertEqual(entry['cpu_time'], 0)
+    self.assertEqual(entry['opcodes'], 0)
+    self.assertEqual(
+        (entry['call_cache_hits'], entry['call_cache_misses']), (2, 1))
+
+
+class TestPriorities(TestBase):
+  """Test scheduling build statements by their times in earlier runs."""
+
+  def setUp(self):
+    super().setUp()
+    self.conf = self.parser.config_from_defaults()
+
+  def _statement(self, name, deps=()):
+    return (f'check {name}', Action.CHECK, {}, (f'{name}.pyi',), deps)
+
+  def test_critical_path(self):
+    # foo -> bar -> baz is the longest chain, although qux is the slowest.
+    statements = [
+        self._statement('foo'),
+        self._statement('bar', deps=('foo.pyi',)),
+        self._statement('baz', deps=('bar.pyi',)),
+        self._statement('qux'),
+    ]
+    timings = {'foo.pyi': 1.0, 'bar.pyi': 2.0, 'baz.pyi': 3.0, 'qux.pyi': 5.0}
+    self.assertEqual(
+        pytype_runner.get_priorities(statements, timings),
+        [6.0, 5.0, 3.0, 5.0])
+
+  def test_unknown_times(self):
+    statements = [
+        self._statement('foo'),
+        self._statement('bar', deps=('foo.pyi', 'default.pyi')),
+        self._statement('baz'),
+    ]
+    self.assertEqual(
+        pytype_runner.get_priorities(statements, {}), [2.0, 1.0, 1.0])
+    self.assertEqual(
+        pytype_runner.get_priorities(statements, {'baz.pyi': 4.0}),
+        [8.0, 4.0, 4.0])
+
+  def test_save_timings(self):
+    with test_utils.Tempdir() as d:
+      self.conf.output = d.path
+      runner = make_runner([], [], self.conf)
+      self.assertEqual(runner.load_timings(), {})
+      runner.build_statements = [self._statement('foo')]
+      runner.save_timings({'foo.pyi': 1.5, 'deleted.pyi': 2.0})
+      self.assertEqual(runner.load_timings(), {'foo.pyi': 1.5})
+
+  def test_read_ninja_log(self):
+    with test_utils.Tempdir() as d:
+      ninja_log = d.create_file('.ninja_log', '\n'.join([
+          '# ninja log v5',
+          '0\t1500\t0\tfoo.pyi\t123',
+          '1500\t1750\t0\tbar.pyi\t456',
+          '2000\t2500\t0\tfoo.pyi\t123',
+      ]) + '\n')
+      self.assertEqual(pytype_runner._read_ninja_log(ninja_log),
+                       {'foo.pyi': 0.5, 'bar.pyi': 0.25})
+
 
 class TestImports(TestBase):
   """Test imports-related functionality."""
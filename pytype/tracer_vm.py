@@ -631,9 +631,13 @@ class CallTracer(vm.VirtualMachine):
 
   def pytd_classes_for_unknowns(self):
     classes = []
-    for name, val in self._unknowns.items():
+    unknowns = list(self._unknowns.items())
+    visible = self.ctx.program.FilterVariables(
+        [val.variable for _, val in unknowns], self.ctx.exitpoint, strict=False
+    )
+    for (name, val), bindings in zip(unknowns, visible):
       log.info("Generating structural definition for unknown: %r", name)
-      if val in val.variable.Filter(self.ctx.exitpoint, strict=False):
+      if val in bindings:
         classes.append(val.data.to_structural_def(self.ctx.exitpoint, name))
     return classes
 
@@ -654,82 +658,104 @@ class CallTracer(vm.VirtualMachine):
     ):
       annotated_names.add(name)
       data.append(pytd.Constant(name, t))
+    exported = {}
+    to_filter = {}
     for name, var in defs.items():
       if name in annotated_names or self._skip_definition_export(name, var):
         continue
-      log.info("Generating pytd type for top-level definition: %r", name)
       if any(
           v == self.ctx.convert.unsolvable for v in var.Data(self.ctx.exitpoint)
       ):
-        options = [self.ctx.convert.unsolvable]
+        exported[name] = None
       else:
-        all_options = var.FilteredData(self.ctx.exitpoint, strict=False)
-        options = [
-            o for o in all_options if not isinstance(o, abstract.Deleted)
-        ]
-        if all_options and not options:
-          # All bindings are deleted. Don't emit anything.
-          continue
-      if len(options) > 1 and not all(
-          isinstance(o, abstract.FUNCTION_TYPES) for o in options
-      ):
-        if all(isinstance(o, abstract.TypeParameter) for o in options):
-          pytd_def = pytd_utils.JoinTypes(
-              t.to_pytd_def(self.ctx.exitpoint, name) for t in options
-          )
-          if isinstance(pytd_def, pytd.TypeParameter):
-            data.append(pytd_def)
-          else:
-            # We have multiple definitions for the same TypeVar name. There's no
-            # good way to handle this.
-            data.append(pytd.Constant(name, pytd.AnythingType()))
-        elif all(
-            isinstance(o, (abstract.ParameterizedClass, abstract.Union))
-            for o in options
-        ):  # type alias
-          pytd_def = pytd_utils.JoinTypes(
-              t.to_pytd_def(self.ctx.exitpoint, name).type for t in options
-          )
-          data.append(pytd.Alias(name, pytd_def))
+        exported[name] = to_filter[name] = var
+    # Filter all of the definitions with a single call, so that reachability
+    # information is shared between them.
+    filtered = dict(
+        zip(
+            to_filter,
+            self.ctx.program.FilterVariables(
+                list(to_filter.values()), self.ctx.exitpoint, strict=False
+            ),
+        )
+    )
+    # Values are shared between definitions, e.g. a class's attributes and
+    # the instances it creates, so cache their types for this conversion.
+    with self.ctx.pytd_convert.cache_types():
+      for name, var in exported.items():
+        log.info("Generating pytd type for top-level definition: %r", name)
+        if var is None:
+          options = [self.ctx.convert.unsolvable]
         else:
-          # It's ambiguous whether this is a type, a function or something
-          # else, so encode it as a constant.
-          combined_types = pytd_utils.JoinTypes(
-              t.to_pytd_type(self.ctx.exitpoint) for t in options
-          )
-          data.append(pytd.Constant(name, combined_types))
-      elif options:
-        for option in options:
-          try:
-            # TODO(b/260754211): We should have a specific check for large
-            # literals, rather than trying to filter other things out.
-            should_optimize = not isinstance(option, abstract.FUNCTION_TYPES)
-            with self.ctx.pytd_convert.optimize_literals(should_optimize):
-              # Deep definition
-              d = option.to_pytd_def(self.ctx.exitpoint, name)
-          except NotImplementedError:
-            with self.ctx.pytd_convert.optimize_literals():
-              d = option.to_pytd_type(self.ctx.exitpoint)  # Type only
-            if isinstance(d, pytd.NothingType):
-              if isinstance(option, abstract.Empty):
-                d = pytd.AnythingType()
-              else:
-                assert isinstance(option, typing_overlay.Never)
-          if isinstance(d, pytd.Type) and not isinstance(d, pytd.TypeParameter):
-            data.append(pytd.Constant(name, d))
+          all_options = [b.data for b in filtered[name]]
+          options = [
+              o for o in all_options if not isinstance(o, abstract.Deleted)
+          ]
+          if all_options and not options:
+            # All bindings are deleted. Don't emit anything.
+            continue
+        if len(options) > 1 and not all(
+            isinstance(o, abstract.FUNCTION_TYPES) for o in options
+        ):
+          if all(isinstance(o, abstract.TypeParameter) for o in options):
+            pytd_def = self.ctx.pytd_convert.join_types(
+                t.to_pytd_def(self.ctx.exitpoint, name) for t in options
+            )
+            if isinstance(pytd_def, pytd.TypeParameter):
+              data.append(pytd_def)
+            else:
+              # We have multiple definitions for the same TypeVar name. There's
+              # no good way to handle this.
+              data.append(pytd.Constant(name, pytd.AnythingType()))
+          elif all(
+              isinstance(o, (abstract.ParameterizedClass, abstract.Union))
+              for o in options
+          ):  # type alias
+            pytd_def = self.ctx.pytd_convert.join_types(
+                t.to_pytd_def(self.ctx.exitpoint, name).type for t in options
+            )
+            data.append(pytd.Alias(name, pytd_def))
           else:
-            data.append(d)
-      else:
-        log.error("No visible options for %s", name)
-        data.append(pytd.Constant(name, pytd.AnythingType()))
+            # It's ambiguous whether this is a type, a function or something
+            # else, so encode it as a constant.
+            combined_types = self.ctx.pytd_convert.join_types(
+                t.to_pytd_type(self.ctx.exitpoint) for t in options
+            )
+            data.append(pytd.Constant(name, combined_types))
+        elif options:
+          for option in options:
+            try:
+              # TODO(b/260754211): We should have a specific check for large
+              # literals, rather than trying to filter other things out.
+              should_optimize = not isinstance(option, abstract.FUNCTION_TYPES)
+              with self.ctx.pytd_convert.optimize_literals(should_optimize):
+                # Deep definition
+                d = option.to_pytd_def(self.ctx.exitpoint, name)
+            except NotImplementedError:
+              with self.ctx.pytd_convert.optimize_literals():
+                d = option.to_pytd_type(self.ctx.exitpoint)  # Type only
+              if isinstance(d, pytd.NothingType):
+                if isinstance(option, abstract.Empty):
+                  d = pytd.AnythingType()
+                else:
+                  assert isinstance(option, typing_overlay.Never)
+            if isinstance(d, pytd.Type) and not isinstance(
+                d, pytd.TypeParameter
+            ):
+              data.append(pytd.Constant(name, d))
+            else:
+              data.append(d)
+        else:
+          log.error("No visible options for %s", name)
+          data.append(pytd.Constant(name, pytd.AnythingType()))
     return pytd_utils.WrapTypeDeclUnit("inferred", data)
 
-  @staticmethod
-  def _call_traces_to_function(call_traces, name_transform=lambda x: x):
+  def _call_traces_to_function(self, call_traces, name_transform=lambda x: x):
     funcs = collections.defaultdict(pytd_utils.OrderedSet)
+    join_types = self.ctx.pytd_convert.join_types
 
     def to_pytd_type(node, arg):
-      return pytd_utils.JoinTypes(a.to_pytd_type(node) for a in arg.data)
+      return join_types(a.to_pytd_type(node) for a in arg.data)
 
     for ct in call_traces:
       log.info(
@@ -748,9 +774,7 @@ class CallTracer(vm.VirtualMachine):
       kw_types = []
       for name, arg in ct.keyword_arguments:
         kw_types.append((name, to_pytd_type(ct.node, arg)))
-      ret = pytd_utils.JoinTypes(
-          t.to_pytd_type(ct.node) for t in ct.return_value.data
-      )
+      ret = join_types(t.to_pytd_type(ct.node) for t in ct.return_value.data)
       starargs = None
       starstarargs = None
       funcs[ct.function.data.name].add(
@@ -835,17 +859,19 @@ class CallTracer(vm.VirtualMachine):
     return classes
 
   def compute_types(self, defs):
-    classes = tuple(self.pytd_classes_for_unknowns()) + tuple(
-        self.pytd_classes_for_call_traces()
-    )
-    functions = tuple(self.pytd_functions_for_call_traces())
-    aliases = ()  # aliases are instead recorded as constants
-    ty = pytd_utils.Concat(
-        self.pytd_for_types(defs),
-        pytd_utils.CreateModule(
-            "unknowns", classes=classes, functions=functions, aliases=aliases
-        ),
-    )
+    # The call traces and the definitions share many values and unions.
+    with self.ctx.pytd_convert.cache_types():
+      classes = tuple(self.pytd_classes_for_unknowns()) + tuple(
+          self.pytd_classes_for_call_traces()
+      )
+      functions = tuple(self.pytd_functions_for_call_traces())
+      aliases = ()  # aliases are instead recorded as constants
+      ty = pytd_utils.Concat(
+          self.pytd_for_types(defs),
+          pytd_utils.CreateModule(
+              "unknowns", classes=classes, functions=functions, aliases=aliases
+          ),
+      )
     ty = ty.Visit(optimize.CombineReturnsAndExceptions())
     ty = ty.Visit(optimize.PullInMethodClasses())
     ty = ty.Visit(
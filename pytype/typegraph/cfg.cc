@@ -52,6 +52,7 @@ static PyObject* k_default_data;
 static PyObject *k_NewCFGNode;
 static PyObject *k_NewVariable;
 static PyObject *k_is_reachable;
+static PyObject *k_FilterVariables;
 static PyObject *k_calculate_metrics;
 
 // CFGNode
@@ -504,6 +505,64 @@ static PyObject* is_reachable(PyProgramObj* self,
   }
 }
 
+PyDoc_STRVAR(
+    filter_variables_doc,
+    "FilterVariables(variables, cfg_node, strict=True)\n\n"
+    "Returns a list with the filtered bindings of each variable. This is "
+    "equivalent to [v.Filter(cfg_node, strict) for v in variables], but does "
+    "all of the filtering in one call, sharing reachability information "
+    "between the variables.");
+
+static PyObject* FilterVariables(PyProgramObj* self,
+                                 PyObject* args, PyObject* kwargs) {
+  static const char* kwlist[] = {"variables", "cfg_node", "strict", nullptr};
+  PyObject* variables_obj;
+  PyCFGNodeObj* cfg_node;
+  PyObject* strict_obj = nullptr;
+  if (!SafeParseTupleAndKeywords(args, kwargs, "OO!|O", kwlist, &variables_obj,
+                                 &PyCFGNode, &cfg_node, &strict_obj))
+    return nullptr;
+  const auto strict = IsTruthy(strict_obj);
+  PyObject* seq = PySequence_Fast(variables_obj,
+                                  "variables must be an iterable");
+  if (seq == nullptr)
+    return nullptr;
+  const Py_ssize_t length = PySequence_Fast_GET_SIZE(seq);
+  std::vector<const typegraph::Variable*> variables;
+  variables.reserve(length);
+  for (Py_ssize_t i = 0; i < length; i++) {
+    PyObject* item = PySequence_Fast_GET_ITEM(seq, i);
+    if (Py_TYPE(item) != &PyVariable) {
+      PyErr_SetString(PyExc_TypeError, "expected a list of Variables");
+      Py_DECREF(seq);
+      return nullptr;
+    }
+    typegraph::Variable* u = reinterpret_cast<PyVariableObj*>(item)->u;
+    if (u->program() != self->program) {
+      PyErr_SetString(PyExc_AttributeError,
+                      "Passing variable from different program");
+      Py_DECREF(seq);
+      return nullptr;
+    }
+    variables.push_back(u);
+  }
+  Py_DECREF(seq);
+  auto filtered = self->program->FilterVariables(
+      variables, cfg_node->cfg_node, strict);
+  PyObject* result = PyList_New(filtered.size());
+  for (std::size_t i = 0; i < filtered.size(); i++) {
+    PyObject* list = PyList_New(0);
+    for (typegraph::Binding* attr : filtered[i]) {
+      PyObject* binding = WrapBinding(self, attr);
+      PyList_Append(list, binding);
+      Py_DECREF(binding);
+    }
+    // PyList_SET_ITEM steals the reference to |list|.
+    PyList_SET_ITEM(result, i, list);
+  }
+  return result;
+}
+
 PyDoc_STRVAR(calculate_metrics_doc, "Get a snapshot of the program's metrics.");
 
 static PyObject* calculate_metrics(PyProgramObj* self, PyObject* _args) {
@@ -531,6 +590,7 @@ static PyObject* ProgramDir(PyVariableObj* self, PyObject* args,
   PyList_Append(list, k_NewCFGNode);
   PyList_Append(list, k_NewVariable);
   PyList_Append(list, k_is_reachable);
+  PyList_Append(list, k_FilterVariables);
   PyList_Append(list, k_calculate_metrics);
   return list;
 }
@@ -542,6 +602,8 @@ static PyMethodDef program_methods[] = {
     METH_VARARGS|METH_KEYWORDS, new_variable_doc},
   {"is_reachable", reinterpret_cast<PyCFunction>(is_reachable),
    METH_VARARGS|METH_KEYWORDS, is_reachable_doc},
+  {"FilterVariables", reinterpret_cast<PyCFunction>(FilterVariables),
+   METH_VARARGS|METH_KEYWORDS, filter_variables_doc},
   {"calculate_metrics", reinterpret_cast<PyCFunction>(calculate_metrics),
    METH_NOARGS, calculate_metrics_doc},
   {"__dir__", reinterpret_cast<PyCFunction>(ProgramDir),
@@ -1639,6 +1701,8 @@ static PyObject* InitModule(PyObject* module) {
   k_NewVariable = PyUnicode_FromString("NewVariable");
   Py_XDECREF(k_is_reachable);
   k_is_reachable = PyUnicode_FromString("is_reachable");
+  Py_XDECREF(k_FilterVariables);
+  k_FilterVariables = PyUnicode_FromString("FilterVariables");
   Py_XDECREF(k_calculate_metrics);
   k_calculate_metrics = PyUnicode_FromString("calculate_metrics");
   // CFGNode
@@ -12,6 +12,7 @@ class Program:
   def NewCFGNode(self, name: Optional[str] = ..., condition: Binding = ...) -> CFGNode: ...
   def NewVariable(self, bindings: Optional[Iterable[BindingData]] = ..., source_set: Optional[Iterable[Binding]] = ..., where: Optional[CFGNode] = ...) -> Variable: ...
   def is_reachable(self, src: CFGNode, dst: CFGNode) -> bool: ...
+  def FilterVariables(self, variables: Iterable[Variable], cfg_node: CFGNode, strict: Optional[bool] = ...) -> list[list[Binding]]: ...
   def calculate_metrics(self) -> Metrics: ...
 
 class CFGNode:
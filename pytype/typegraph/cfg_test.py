@@ -561,6 +561,43 @@ class CFGTest(unittest.TestCase):
     self.assertEqual(x.Filter(n1), [])
     self.assertEqual(x.Filter(n2), [a])
 
+  def test_filter_variables(self):
+    p = cfg.Program()
+    n1 = p.NewCFGNode("n1")
+    n2 = n1.ConnectNew("n2")
+    n3 = n1.ConnectNew("n3")
+    n4 = n2.ConnectNew("n4")
+    n3.ConnectTo(n4)
+    x = p.NewVariable()
+    x_a = x.AddBinding("a", source_set=[], where=n2)
+    x_b = x.AddBinding("b", source_set=[], where=n3)
+    y = p.NewVariable()
+    y_a = y.AddBinding("a", source_set=[x_a], where=n2)
+    y_b = y.AddBinding("b", source_set=[x_b], where=n3)
+    z = p.NewVariable()
+    z_a = z.AddBinding("a", source_set=[], where=n3)
+    p.entrypoint = n1
+    for node in (n1, n2, n3, n4):
+      for strict in (True, False):
+        self.assertEqual(
+            p.FilterVariables([x, y, z, x], node, strict=strict),
+            [v.Filter(node, strict=strict) for v in (x, y, z, x)],
+        )
+    self.assertEqual(p.FilterVariables((x, y), n2), [[x_a], [y_a]])
+    self.assertEqual(p.FilterVariables([x, y], n4), [[x_a, x_b], [y_a, y_b]])
+    self.assertEqual(p.FilterVariables([z], n2), [[]])
+    self.assertEqual(p.FilterVariables([z], n2, strict=False), [[z_a]])
+    self.assertEqual(p.FilterVariables([], n1), [])
+
+  def test_filter_variables_from_different_program(self):
+    p1 = cfg.Program()
+    p2 = cfg.Program()
+    n = p1.NewCFGNode("n")
+    with self.assertRaises(AttributeError):
+      p1.FilterVariables([p2.NewVariable()], n)
+    with self.assertRaises(TypeError):
+      p1.FilterVariables([n], n)
+
   def test_hidden_conflict1(self):
     p = cfg.Program()
     n1 = p.NewCFGNode("n1")
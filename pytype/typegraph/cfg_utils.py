@@ -63,23 +63,52 @@ def _variable_product_items(
 
 
 class TooComplexError(Exception):
-  """Thrown if we determine that something in our program is too complex."""
+  """Thrown if we determine that something in our program is too complex.
+
+  Attributes:
+    limit: The limit that was hit.
+    binding_counts: The number of bindings of each of the variables whose
+      product was being taken, as a list of (variable id, count) tuples.
+  """
+
+  def __init__(
+      self, limit: int = 0, binding_counts: Sequence[tuple[int, int]] = ()
+  ) -> None:
+    super().__init__(limit, binding_counts)
+    self.limit = limit
+    self.binding_counts = binding_counts
+
+  def __str__(self):
+    variables = ", ".join(f"v{i}: {n}" for i, n in self.binding_counts)
+    return (
+        f"More than {self.limit} binding combinations for variables with "
+        f"binding counts {{{variables}}}"
+    )
 
 
 class ComplexityLimit:
   """A class that raises TooComplexError if we hit a limit."""
 
-  def __init__(self, limit: int) -> None:
+  def __init__(
+      self, limit: int, variables: Iterable[cfg.Variable] = ()
+  ) -> None:
     self.limit = limit
     self.count = 0
+    self._variables = variables
 
   def inc(self, add: int = 1) -> None:
     self.count += add
     if self.count >= self.limit:
-      raise TooComplexError()
+      raise TooComplexError(
+          self.limit, [(v.id, len(v.bindings)) for v in self._variables]
+      )
 
 
-def deep_variable_product(variables, limit: int = DEEP_VARIABLE_LIMIT):
+def deep_variable_product(
+    variables,
+    limit: int = DEEP_VARIABLE_LIMIT,
+    node: cfg.CFGNode | None = None,
+):
   """Take the deep Cartesian product of a list of Variables.
 
   For example:
@@ -97,6 +126,9 @@ def deep_variable_product(variables, limit: int = DEEP_VARIABLE_LIMIT):
   Args:
     variables: A sequence of Variables.
     limit: How many results we allow before aborting.
+    node: Optionally, a CFG node. If given, bindings that cannot be visible at
+      this node are dropped before they are expanded, and combinations that
+      would have contained them are not generated.
 
   Returns:
     A list of lists of Values, where each sublist has one Value from each
@@ -106,14 +138,49 @@ def deep_variable_product(variables, limit: int = DEEP_VARIABLE_LIMIT):
     TooComplexError: If we expanded too many values.
   """
   return _deep_values_list_product(
-      [v.bindings for v in variables], set(), ComplexityLimit(limit)
+      [v.bindings for v in variables],
+      set(),
+      ComplexityLimit(limit, variables),
+      node,
   )
 
 
+def _prune_values_list(
+    values_list: Sequence[Sequence[cfg.Binding]], node: cfg.CFGNode
+) -> list[list[cfg.Binding]] | None:
+  """Drops bindings that can't be visible at `node`.
+
+  Args:
+    values_list: A list of lists of bindings.
+    node: A CFG node.
+
+  Returns:
+    The non-empty lists with their invisible bindings removed, or None if one
+    of the lists had only invisible bindings, in which case no combination of
+    the lists can be visible.
+  """
+  pruned = []
+  for values in values_list:
+    if not values:
+      continue
+    visible = [v for v in values if node.CanHaveCombination([v])]
+    if not visible:
+      return None
+    pruned.append(visible)
+  return pruned
+
+
 def _deep_values_list_product(
-    values_list: Sequence[cfg.Binding], seen, complexity_limit: ComplexityLimit
+    values_list: Sequence[Sequence[cfg.Binding]],
+    seen,
+    complexity_limit: ComplexityLimit,
+    node: cfg.CFGNode | None = None,
 ) -> Sequence[tuple[cfg.Binding, ...]]:
   """Take the deep Cartesian product of a list of list of Values."""
+  if node is not None:
+    values_list = _prune_values_list(values_list, node)
+    if values_list is None:
+      return []
   result = []
   for row in itertools.product(*(values for values in values_list if values)):
     extra_params = [
@@ -123,11 +190,14 @@ def _deep_values_list_product(
         for value in entry.data.unique_parameter_values()
     ]
     extra_values = extra_params and _deep_values_list_product(
-        extra_params, seen.union(row), complexity_limit
+        extra_params, seen.union(row), complexity_limit, node
     )
     if extra_values:
       for new_row in extra_values:
         result.append(row + new_row)
+    elif extra_params and node is not None:
+      # All expansions of this row were pruned.
+      continue
     else:
       complexity_limit.inc()
       result.append(row)
@@ -159,7 +229,8 @@ def variable_product_dict(
   return [
       dict(d)
       for d in _variable_product_items(
-          variabledict.items(), ComplexityLimit(limit)
+          variabledict.items(),
+          ComplexityLimit(limit, variabledict.values()),
       )
   ]
 
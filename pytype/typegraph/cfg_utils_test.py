@@ -199,6 +199,34 @@ class VariableProductTest(unittest.TestCase):
         ],
     )
 
+  def test_too_complex_error_details(self):
+    values = [DummyValue(i + 1) for i in range(4)]
+    v1 = self.prog.NewVariable(values, [], self.current_location)
+    v2 = self.prog.NewVariable(values[:2], [], self.current_location)
+    with self.assertRaises(cfg_utils.TooComplexError) as ctx:
+      cfg_utils.deep_variable_product([v1, v2], 4)
+    self.assertEqual(ctx.exception.limit, 4)
+    self.assertEqual(ctx.exception.binding_counts, [(v1.id, 4), (v2.id, 2)])
+
+  def test_deep_variable_product_prunes_invisible(self):
+    x1, x2, x3, x4 = (DummyValue(i + 1) for i in range(4))
+    node = self.current_location.ConnectNew()
+    other = self.prog.NewCFGNode()
+    v1 = self.prog.NewVariable()
+    v1.AddBinding(x1, [], self.current_location)
+    v1.AddBinding(x2, [], other)
+    v2 = self.prog.NewVariable()
+    v2.AddBinding(x3, [], self.current_location)
+    v3 = self.prog.NewVariable()
+    v3.AddBinding(x4, [], other)
+    x1.set_parameters([v2])
+    x2.set_parameters([v3])
+    product = cfg_utils.deep_variable_product([v1], node=node)
+    rows = [{a.data for a in row} for row in product]
+    self.assertCountEqual(rows, [{x1, x3}])
+    x3.set_parameters([v3])
+    self.assertFalse(cfg_utils.deep_variable_product([v1], node=node))
+
   def test_variable_product_dict(self):
     u1 = self.prog.NewVariable([1, 2], [], self.current_location)
     u2 = self.prog.NewVariable([3, 4], [], self.current_location)
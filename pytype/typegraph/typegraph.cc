@@ -5,6 +5,7 @@
 #include <set>
 #include <stack>
 #include <string>
+#include <unordered_map>
 #include <unordered_set>
 #include <utility>
 #include <vector>
@@ -69,6 +70,55 @@ bool Program::is_reachable(const CFGNode* src, const CFGNode* dst) {
   return backward_reachability_->is_reachable(dst->id(), src->id());
 }
 
+std::vector<std::vector<Binding*>> Program::FilterVariables(
+    const std::vector<const Variable*>& variables, const CFGNode* viewpoint,
+    const bool strict) {
+  Solver* s = GetSolver();
+  std::unordered_map<const CFGNode*, bool> reachable;
+  auto is_reachable_from = [&](const CFGNode* node) {
+    auto it = reachable.find(node);
+    if (it == reachable.end()) {
+      it = reachable.emplace(node, is_reachable(node, viewpoint)).first;
+    }
+    return it->second;
+  };
+  std::unordered_map<const Variable*, std::size_t> seen;
+  std::vector<std::vector<Binding*>> result;
+  result.reserve(variables.size());
+  for (const Variable* variable : variables) {
+    auto it = seen.find(variable);
+    if (it != seen.end()) {
+      result.push_back(result[it->second]);
+      continue;
+    }
+    seen.emplace(variable, result.size());
+    const auto size = variable->size();
+    std::vector<Binding*> filtered;
+    filtered.reserve(size);
+    for (const auto& binding : variable->bindings()) {
+      // Optimization: when only one binding exists, assume it is visible.
+      if (!strict && size == 1) {
+        filtered.push_back(binding.get());
+        continue;
+      }
+      // A binding can only be visible if one of its origins can reach the
+      // viewpoint, which is much cheaper to check than running the solver.
+      bool any_reachable = false;
+      for (const auto& origin : binding->origins()) {
+        if (!origin->where || is_reachable_from(origin->where)) {
+          any_reachable = true;
+          break;
+        }
+      }
+      if (any_reachable && s->Solve({binding.get()}, viewpoint)) {
+        filtered.push_back(binding.get());
+      }
+    }
+    result.push_back(std::move(filtered));
+  }
+  return result;
+}
+
 Metrics Program::CalculateMetrics() {
   auto binding_count = next_binding_id();
 
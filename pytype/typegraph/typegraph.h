@@ -110,6 +110,14 @@ class Program {
 
   bool is_reachable(const CFGNode* src, const CFGNode* dst);
 
+  // Filters the bindings of several variables at once. Equivalent to calling
+  // Variable::Filter(viewpoint, strict) on each variable, but reuses a single
+  // solver and remembers which origin nodes can reach the viewpoint, so that
+  // bindings whose origins are all unreachable skip the solver entirely.
+  std::vector<std::vector<Binding*>> FilterVariables(
+      const std::vector<const Variable*>& variables, const CFGNode* viewpoint,
+      bool strict = true);
+
   Metrics CalculateMetrics();
 
  private:
@@ -1,6 +1,7 @@
 #include "typegraph.h"
 
 #include <string>
+#include <vector>
 
 #include "gmock/gmock.h"  // for UnorderedElementsAre
 #include "gtest/gtest.h"
@@ -130,6 +131,19 @@ TEST_F(TypeGraphTest, TestVariable) {
   EXPECT_EQ(1, x_->Filter(n_[5]).size());
 }
 
+TEST_F(TypeGraphTest, TestFilterVariables) {
+  std::vector<const Variable*> variables = {x_, a_, b_, c_, x_};
+  for (int i = 0; i < p_.CountCFGNodes(); ++i) {
+    for (bool strict : {true, false}) {
+      auto filtered = p_.FilterVariables(variables, n_[i], strict);
+      ASSERT_EQ(variables.size(), filtered.size());
+      for (int j = 0; j < variables.size(); ++j) {
+        EXPECT_EQ(variables[j]->Filter(n_[i], strict), filtered[j]);
+      }
+    }
+  }
+}
+
 TEST_F(TypeGraphTest, TestBinding) {
   EXPECT_EQ(3, n_[0]->bindings().size());
   EXPECT_EQ(1, n_[1]->bindings().size());
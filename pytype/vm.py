@@ -587,6 +587,8 @@ class VirtualMachine:
     # This modifies the errorlog passed to the constructor.  Kind of ugly,
     # but there isn't a better way to wire both pieces together.
     self.ctx.errorlog.set_error_filter(director.filter_error)
+    # Unreported errors are never printed, so they need not be created.
+    self.ctx.errorlog.set_discard_errors(not self.ctx.options.report_errors)
     self._director = director
     self.ctx.options.set_feature_flags(director.features)
     self._branch_tracker = pattern_matching.BranchTracker(